@@ -0,0 +1,125 @@
+"""
+Content-addressed cache of resume extraction results.
+
+Entries are keyed by the SHA-256 of the uploaded file plus the ontology
+version (the skill matcher fingerprint), so re-uploading the same resume
+skips parsing and NLP. A bounded in-memory LRU holds recent entries; an
+optional Mongo collection (ANALYSIS_CACHE_MONGO=1) acts as a second tier
+shared by every worker.
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+ANALYSIS_CACHE_ENTRIES = int(os.environ.get('ANALYSIS_CACHE_ENTRIES', 512))
+ANALYSIS_CACHE_MAX_CHARS = int(os.environ.get('ANALYSIS_CACHE_MAX_CHARS', 32 * 1024 * 1024))
+ANALYSIS_CACHE_MONGO = os.environ.get('ANALYSIS_CACHE_MONGO', '').lower() in ('1', 'true', 'yes')
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+CACHE_COLLECTION = "resume_analysis_cache"
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+class AnalysisCache:
+    def __init__(
+        self,
+        max_entries: int = ANALYSIS_CACHE_ENTRIES,
+        max_chars: int = ANALYSIS_CACHE_MAX_CHARS,
+        collection=None,
+    ):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self.collection = collection  # Optional Mongo second tier
+        self.version: Optional[str] = None
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._chars = 0
+        self.counters = {"memory_hits": 0, "mongo_hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def invalidate(self, version: str) -> None:
+        """
+        Drop every in-memory entry if the skills fingerprint changed. Role-only
+        publishes keep it, and the cache with it. Mongo entries are keyed by
+        version, so old ones just stop matching.
+        """
+        if version == self.version:
+            return
+        self.version = version
+        self._entries.clear()
+        self._chars = 0
+        self.counters["invalidations"] += 1
+
+    def _store(self, digest: str, entry: Dict) -> None:
+        if digest in self._entries:
+            self._chars -= len(self._entries.pop(digest)["text"])
+        self._entries[digest] = entry
+        self._chars += len(entry["text"])
+        while self._entries and (len(self._entries) > self.max_entries or self._chars > self.max_chars):
+            _, evicted = self._entries.popitem(last=False)
+            self._chars -= len(evicted["text"])
+            self.counters["evictions"] += 1
+
+    async def get(self, digest: str) -> Optional[Dict]:
+        entry = self._entries.get(digest)
+        if entry is not None:
+            self._entries.move_to_end(digest)
+            self.counters["memory_hits"] += 1
+            return entry
+
+        if self.collection is not None and self.version is not None:
+            try:
+                doc = await self.collection.find_one({"_id": f"{self.version}:{digest}"}, {"text": 1, "user_skills": 1})
+            except Exception as e:
+                logger.warning(f"Analysis cache lookup failed: {e}")
+                doc = None
+            if doc is not None:
+                entry = {"text": doc["text"], "user_skills": doc["user_skills"]}
+                self._store(digest, entry)
+                self.counters["mongo_hits"] += 1
+                return entry
+
+        self.counters["misses"] += 1
+        return None
+
+    async def put(self, digest: str, text: str, user_skills: List[str], version: Optional[str] = None) -> None:
+        """``version`` is the one the result was computed under; stale results are dropped"""
+        if version is not None and version != self.version:
+            return
+        self._store(digest, {"text": text, "user_skills": user_skills})
+
+        if self.collection is not None and self.version is not None:
+            try:
+                await self.collection.replace_one(
+                    {"_id": f"{self.version}:{digest}"},
+                    {
+                        "version": self.version,
+                        "text": text,
+                        "user_skills": user_skills,
+                        "created_at": datetime.now(timezone.utc)
+                    },
+                    upsert=True
+                )
+            except Exception as e:
+                logger.warning(f"Analysis cache write failed: {e}")
+
+    async def ensure_indexes(self) -> None:
+        if self.collection is not None:
+            await self.collection.create_index("created_at", expireAfterSeconds=ANALYSIS_CACHE_TTL_SECONDS)
+
+    def stats(self) -> Dict:
+        lookups = self.counters["memory_hits"] + self.counters["mongo_hits"] + self.counters["misses"]
+        hits = lookups - self.counters["misses"]
+        return {
+            **self.counters,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "entries": len(self._entries),
+            "chars": self._chars,
+            "mongo_tier": self.collection is not None,
+            "version": self.version,
+        }
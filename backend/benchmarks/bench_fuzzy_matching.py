@@ -0,0 +1,118 @@
+"""
+Cost and benefit of the typo-tolerant second-stage matcher.
+
+Plants misspelled, re-spaced and OCR-mangled skill names into synthetic
+resumes, then reports for exact matching alone and exact + fuzzy:
+- CPU ms per resume;
+- recall on the planted variants;
+- skills the fuzzy stage adds to clean resumes (candidate false positives).
+
+    cd backend
+    python benchmarks/bench_fuzzy_matching.py --resumes 200 --scale 10
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+import spacy
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from extraction import build_skill_matcher, load_nlp, match_skills, skill_terms  # noqa: E402
+from fuzzy_matcher import FuzzyMatcher, FuzzySkillIndex, edit_budget, normalize  # noqa: E402
+from synthetic import scaled_ontology, synthetic_resumes  # noqa: E402
+
+OCR_CONFUSIONS = {"o": "0", "l": "1", "i": "1", "s": "5", "e": "c", "rn": "m"}
+
+
+def variant(name: str, rng: random.Random) -> str:
+    """One plausible way a resume (or its PDF extraction) gets ``name`` wrong"""
+    kind = rng.choice(["typo", "swap", "ocr", "space"])
+    if kind == "space" and " " in name:
+        return name.replace(" ", "", 1)
+    if kind == "space" and len(name) >= 6:
+        middle = len(name) // 2
+        return f"{name[:middle]} {name[middle:]}"
+    if kind == "ocr":
+        for source, target in OCR_CONFUSIONS.items():
+            if source in name[1:]:
+                return name[0] + name[1:].replace(source, target, 1)
+    position = rng.randrange(1, len(name) - 1)
+    if kind == "swap":
+        return name[:position] + name[position + 1] + name[position] + name[position + 2:]
+    return name[:position] + name[position + 1:]  # Dropped letter
+
+
+def planted_resumes(nlp, exact, skills, count, rng):
+    """
+    (texts, expected skill per text). Each planted name is long enough to
+    get an edit budget and not already mentioned correctly in its resume.
+    """
+    names = [name for name in skills if edit_budget(len(normalize(name))) or " " in name]
+    texts, expected = [], []
+    for text in synthetic_resumes(skills, count):
+        present = set(match_skills(nlp, exact, text, mode="tokenizer"))
+        name = rng.choice([name for name in names if name not in present])
+        texts.append(f"{text}\nAlso experienced with {variant(name.lower(), rng)}, day to day.")
+        expected.append(name)
+    return texts, expected
+
+
+def timed_matches(nlp, matcher, texts):
+    start = time.process_time()
+    results = [set(match_skills(nlp, matcher, text, mode="tokenizer")) for text in texts]
+    return results, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1, help="Copies of the ontology (10 ~ a large catalog)")
+    parser.add_argument("--ontology", default=str(BACKEND_DIR / 'ontology.json'))
+    args = parser.parse_args()
+
+    with open(args.ontology, 'r', encoding='utf-8') as f:
+        skills = scaled_ontology(json.load(f), args.scale)['skills']
+    terms = skill_terms(skills)
+    try:
+        nlp = load_nlp("tokenizer")
+    except OSError:
+        print("! en_core_web_sm is not installed; using a blank English tokenizer")
+        nlp = spacy.blank("en")
+    exact = build_skill_matcher(nlp, terms)
+
+    start = time.perf_counter()
+    index = FuzzySkillIndex(terms)
+    build_seconds = time.perf_counter() - start
+    fuzzy = FuzzyMatcher(exact, index)
+    keys = sum(len(layer.keys) for layer in index.layers)
+    deletes = sum(len(layer.deletes) for layer in index.layers)
+    print(f"{len(skills)} skills, {keys} keys, {deletes} delete entries; index built in {build_seconds * 1000:.0f} ms\n")
+
+    rng = random.Random(7)
+    planted, expected = planted_resumes(nlp, exact, skills, args.resumes, rng)
+    clean = synthetic_resumes(skills, args.resumes, seed=11)
+
+    print(f"{'matcher':<16}{'cpu ms/resume':>15}{'planted recall':>16}")
+    baseline = None
+    for label, matcher in [("exact", exact), ("exact + fuzzy", fuzzy)]:
+        results, elapsed = timed_matches(nlp, matcher, planted)
+        recall = sum(name in found for name, found in zip(expected, results)) / len(expected)
+        print(f"{label:<16}{elapsed / len(planted) * 1000:>15.3f}{recall:>15.1%}")
+        if baseline is None:
+            baseline = timed_matches(nlp, exact, clean)[0]
+
+    fuzzy_clean = timed_matches(nlp, fuzzy, clean)[0]
+    added = [found - base for found, base in zip(fuzzy_clean, baseline)]
+    extra = sum(len(skills_added) for skills_added in added)
+    print(f"\nOn {len(clean)} clean resumes the fuzzy stage added {extra} skills", end="")
+    examples = sorted({skill for skills_added in added for skill in skills_added})[:10]
+    print(f" (e.g. {', '.join(examples)})" if examples else "")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Microbenchmarks for the resume-analysis hot paths, fully offline.
+
+Times text extraction (PDF and DOCX), skill extraction, ontology loading and
+role scoring against synthetic ontologies at several multiples of
+ontology.json. Mongo is replaced by mongomock-motor, and the matcher cache
+lives in a temporary directory, so nothing outside this process is touched.
+
+    cd backend
+    pip install -r requirements-dev.txt
+    python benchmarks/bench_hot_paths.py --scales 1,10,100,1000 --resumes 50
+    python benchmarks/bench_hot_paths.py --compare benchmarks/results/<earlier run>.json
+
+Every run is written to benchmarks/results/ as JSON. With --compare the p50
+of each benchmark is checked against an earlier run and anything slower by
+more than --threshold is reported (exit status 1 with --fail-on-regression).
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+sys.path.insert(0, str(BACKEND_DIR))
+
+# server.py reads these at import; the stand-in never connects anywhere
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'nextstep_bench')
+os.environ.setdefault('MATCHER_CACHE_DIR', tempfile.mkdtemp(prefix='bench-matcher-cache-'))
+
+import mongomock_motor  # noqa: E402
+import spacy  # noqa: E402
+
+import server  # noqa: E402
+from extraction import extract_text_from_docx, extract_text_from_pdf, load_nlp  # noqa: E402
+from synthetic import make_docx, make_pdf, scaled_ontology, synthetic_resumes  # noqa: E402
+
+
+def summarize(name, scale, samples, unit_count=1):
+    """Throughput and latency percentiles for one benchmark (samples in seconds)"""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    total = sum(samples)
+    return {
+        "name": name,
+        "scale": scale,
+        "samples": len(samples),
+        "ops_per_sec": round(len(samples) * unit_count / total, 2) if total else None,
+        "mean_ms": round(statistics.fmean(samples) * 1000, 4),
+        "p50_ms": round(percentile(50), 4),
+        "p90_ms": round(percentile(90), 4),
+        "p99_ms": round(percentile(99), 4),
+        "max_ms": round(ordered[-1] * 1000, 4),
+    }
+
+
+def timed(fn, inputs):
+    samples = []
+    for item in inputs:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def timed_async(fn, repeats):
+    samples = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):  # load_ontology_from_db prints progress
+            started = time.perf_counter()
+            await fn()
+            samples.append(time.perf_counter() - started)
+    return samples
+
+
+def bench_text_extraction(texts):
+    pdfs = [make_pdf(text) for text in texts]
+    docxs = [make_docx(text) for text in texts]
+    return [
+        summarize("extract_text_from_pdf", None, timed(extract_text_from_pdf, pdfs)),
+        summarize("extract_text_from_docx", None, timed(extract_text_from_docx, docxs)),
+    ]
+
+
+async def seed(db, ontology):
+    for name in (server.SKILLS_COLLECTION, server.JOBS_COLLECTION, server.META_COLLECTION):
+        await db[name].delete_many({})
+    await db[server.SKILLS_COLLECTION].insert_many([dict(data, _id=name) for name, data in ontology['skills'].items()])
+    await db[server.JOBS_COLLECTION].insert_many([dict(role) for role in ontology['job_roles']])
+
+
+async def bench_scale(base_ontology, scale, resume_count, load_repeats):
+    ontology = scaled_ontology(base_ontology, scale)
+    await seed(server.db, ontology)
+    results = []
+
+    # The first load tokenizes every pattern; later ones hit the matcher cache
+    cold = await timed_async(server.load_ontology_from_db, 1)
+    warm = await timed_async(server.load_ontology_from_db, load_repeats)
+    results.append(summarize("load_ontology_from_db (matcher built)", scale, cold))
+    results.append(summarize("load_ontology_from_db (matcher cached)", scale, warm))
+
+    texts = synthetic_resumes(ontology['skills'], resume_count, seed=scale)
+    results.append(summarize("extract_skills_from_text", scale, timed(server.extract_skills_from_text, texts)))
+    started = time.perf_counter()
+    user_skills = server.extract_skills_from_texts(texts)
+    results.append(summarize("extract_skills_from_texts (nlp.pipe, per resume)", scale,
+                             [(time.perf_counter() - started) / len(texts)] * len(texts)))
+
+    job_roles = server.snapshot.job_roles
+    catalog = server.snapshot.skills
+
+    def score_all_roles(skills):
+        for role in job_roles:
+            server.calculate_weighted_match(skills, role, catalog)
+
+    def rank_top_roles(skills):
+        engine = server.snapshot.engine
+        for role_idx in engine.rank(skills, limit=10):
+            server.calculate_weighted_match(skills, engine.job_roles[role_idx], catalog)
+
+    results.append(summarize("calculate_weighted_match (every role)", scale,
+                             timed(score_all_roles, user_skills), unit_count=len(job_roles)))
+    results.append(summarize("rank + calculate_weighted_match (top 10)", scale, timed(rank_top_roles, user_skills)))
+    return results
+
+
+def load_benchmark_nlp():
+    try:
+        return load_nlp(), "model"
+    except OSError:
+        print("! en_core_web_sm is not installed; timing skill extraction with a blank English tokenizer")
+        return spacy.blank("en"), "blank"
+
+
+def compare(results, previous_path, threshold):
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<52}{'scale':>6}{'p50 before':>12}{'p50 now':>10}{'change':>9}")
+    for result in results:
+        before = previous.get((result["name"], result["scale"]))
+        if before is None or not before["p50_ms"]:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1
+        flag = " !" if change > threshold else ""
+        print(f"{result['name']:<52}{str(result['scale'] or '-'):>6}{before['p50_ms']:>12.3f}"
+              f"{result['p50_ms']:>10.3f}{change:>+8.0%}{flag}")
+        if change > threshold:
+            regressions.append(result["name"])
+    return regressions
+
+
+async def run(args):
+    with open(args.ontology, 'r', encoding='utf-8') as f:
+        base_ontology = json.load(f)
+
+    server.db = mongomock_motor.AsyncMongoMockClient()[os.environ['DB_NAME']]
+    server.ontology_sync.collection = server.db[server.META_COLLECTION]
+    server.nlp, nlp_kind = load_benchmark_nlp()
+
+    results = bench_text_extraction(synthetic_resumes(base_ontology['skills'], args.resumes))
+    for scale in args.scales:
+        print(f"... {scale}x: {len(base_ontology['skills']) * scale} skills, {len(base_ontology['job_roles']) * scale} roles")
+        results += await bench_scale(base_ontology, scale, args.resumes, args.load_repeats)
+    server.extraction_pool.shutdown()
+    return results, nlp_kind
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="1,10,100,1000", help="Comma-separated ontology multiples")
+    parser.add_argument("--resumes", type=int, default=50)
+    parser.add_argument("--load-repeats", type=int, default=3)
+    parser.add_argument("--ontology", default=str(BACKEND_DIR / 'ontology.json'))
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result file to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown reported as a regression (0.2 = 20%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    args.scales = [int(scale) for scale in args.scales.split(",")]
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results, nlp_kind = asyncio.run(run(args))
+
+    print(f"\n{'benchmark':<52}{'scale':>6}{'ops/s':>12}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['name']:<52}{str(r['scale'] or '-'):>6}{r['ops_per_sec'] or 0:>12.2f}"
+              f"{r['p50_ms']:>10.3f}{r['p90_ms']:>10.3f}{r['p99_ms']:>10.3f}")
+
+    timestamp = datetime.now(timezone.utc)
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{timestamp:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            "meta": {
+                "timestamp": timestamp.isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "spacy": spacy.__version__,
+                "nlp": nlp_kind,
+                "resumes": args.resumes,
+                "scales": args.scales,
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\n✓ Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} benchmark(s) slower than {args.threshold:.0%}: {', '.join(sorted(set(regressions)))}")
+            if args.fail_on_regression:
+                sys.exit(1)
+        else:
+            print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
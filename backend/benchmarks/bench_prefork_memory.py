@@ -0,0 +1,112 @@
+"""
+Memory per web worker, with and without preload-before-fork (prefork.py).
+
+Starts --workers worker processes twice:
+- "spawn": every worker loads the spaCy model and builds the ontology
+  snapshot itself, like `uvicorn --workers N`;
+- "prefork": the parent loads both once, freezes the garbage collector and
+  forks the workers, like `python prefork.py --workers N`.
+Each worker then matches and ranks --resumes synthetic resumes, so the pages
+it touches are counted, and reports its RSS, PSS and private bytes while all
+workers are still alive. No Mongo is needed: the ontology is ontology.json
+scaled by --scale.
+
+    cd backend
+    python benchmarks/bench_prefork_memory.py --workers 4 --scale 100
+"""
+import argparse
+import gc
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault('MATCHER_CACHE_DIR', tempfile.mkdtemp(prefix='bench-matcher-cache-'))
+
+from extraction import load_nlp, match_skills  # noqa: E402
+from ontology_state import OntologySnapshot  # noqa: E402
+from prefork import process_memory  # noqa: E402
+from synthetic import scaled_ontology, synthetic_resumes  # noqa: E402
+
+preloaded = None  # (nlp, snapshot), set in the parent before forking
+
+
+def load(ontology_path: str, scale: int):
+    with open(ontology_path, 'r', encoding='utf-8') as f:
+        ontology = scaled_ontology(json.load(f), scale)
+    nlp = load_nlp()
+    return nlp, OntologySnapshot.build(1, nlp, ontology['skills'], ontology['job_roles'])
+
+
+def worker(ontology_path, scale, resumes, results, all_reported):
+    nlp, snapshot = preloaded or load(ontology_path, scale)
+    gc.enable()
+    for text in synthetic_resumes(snapshot.skills, resumes):
+        user_skills = match_skills(nlp, snapshot.matcher, text)
+        for role_idx in snapshot.engine.rank(user_skills, limit=10):
+            snapshot.role_graph.nearest(snapshot.job_roles[role_idx]['title'])
+    results.put(process_memory())
+    all_reported.wait()  # Shared pages are only shared while the other workers are alive
+
+
+def measure(mode: str, args) -> list:
+    context = multiprocessing.get_context("spawn" if mode == "spawn" else "fork")
+    results, all_reported = context.Queue(), context.Event()
+    processes = [
+        context.Process(target=worker, args=(args.ontology, args.scale, args.resumes, results, all_reported))
+        for _ in range(args.workers)
+    ]
+    for process in processes:
+        process.start()
+    memory = []
+    while len(memory) < len(processes):
+        try:
+            memory.append(results.get(timeout=1))
+        except queue.Empty:
+            if any(process.exitcode for process in processes):
+                raise RuntimeError(f"A {mode} worker failed")
+    memory.append({**process_memory(), "parent": True})
+    all_reported.set()
+    for process in processes:
+        process.join()
+    return memory
+
+
+def mb(value: int) -> str:
+    return f"{value / 2**20:>10.1f}"
+
+
+def main():
+    global preloaded
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--scale", type=int, default=100, help="Copies of the ontology (100 ~ 4k skills)")
+    parser.add_argument("--resumes", type=int, default=50, help="Resumes each worker analyzes")
+    parser.add_argument("--ontology", default=str(BACKEND_DIR / 'ontology.json'))
+    args = parser.parse_args()
+
+    runs = {"spawn": measure("spawn", args)}
+    gc.disable()
+    preloaded = load(args.ontology, args.scale)
+    gc.freeze()
+    runs["prefork"] = measure("prefork", args)
+
+    print(f"{args.workers} workers, ontology x{args.scale}, {args.resumes} resumes per worker (MB)\n")
+    print(f"{'mode':<10}{'rss/worker':>12}{'private/worker':>16}{'pss/worker':>12}{'total pss':>12}")
+    for mode, memory in runs.items():
+        workers = [entry for entry in memory if not entry.get("parent")]
+        average = {key: sum(entry[key] for entry in workers) / len(workers) for key in ("rss_bytes", "private_bytes", "pss_bytes")}
+        total = sum(entry["pss_bytes"] for entry in memory)  # Workers plus the parent holding the preload
+        print(
+            f"{mode:<10}{mb(average['rss_bytes']):>12}{mb(average['private_bytes']):>16}"
+            f"{mb(average['pss_bytes']):>12}{mb(total):>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Build and query cost of the role-similarity graph on catalogs where roles
+share skills.
+
+scaled_ontology's replicas share no skills, so they never exercise the
+inverted index. Here every role lists "Communication", and its other skills
+are drawn from a long-tailed pool, so a few skills are in thousands of roles.
+Reports, per catalog size: full build, one role approval (RoleGraph.extended),
+and nearest / path query latency.
+
+    cd backend
+    python benchmarks/bench_role_graph.py --roles 5000,20000,100000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from role_graph import RoleGraph  # noqa: E402
+from scoring_engine import ScoringEngine  # noqa: E402
+
+
+def shared_skill_roles(count: int, skills: int, rng: random.Random, start: int = 0):
+    roles = []
+    for n in range(start, start + count):
+        picked = {f"Skill {int(rng.paretovariate(1.0)) % skills}" for _ in range(12)} | {"Communication"}
+        roles.append({
+            "title": f"Role {n}",
+            "skill_weights": [
+                {"skill": skill, "weight": rng.choice([0.5, 1.0, 1.5]), "is_core": rng.random() < 0.3}
+                for skill in sorted(picked)
+            ],
+        })
+    return roles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", default="5000,20000,100000", help="Comma-separated catalog sizes")
+    parser.add_argument("--queries", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'roles':>8}{'build s':>10}{'approve ms':>12}{'nearest us':>12}{'path us':>10}{'common skills':>15}")
+    for count in (int(value) for value in args.roles.split(",")):
+        rng = random.Random(7)
+        engine = ScoringEngine(shared_skill_roles(count, count, rng))
+        started = time.perf_counter()
+        graph = RoleGraph(engine)
+        build = time.perf_counter() - started
+
+        grown = engine.extended(shared_skill_roles(1, count, rng, start=count))
+        started = time.perf_counter()
+        graph.extended(grown)
+        approve = time.perf_counter() - started
+
+        titles = [f"Role {rng.randrange(count)}" for _ in range(args.queries + 1)]
+        started = time.perf_counter()
+        for title in titles[1:]:
+            graph.nearest(title)
+        nearest = (time.perf_counter() - started) / args.queries
+        started = time.perf_counter()
+        for from_title, to_title in zip(titles, titles[1:]):
+            graph.path(from_title, to_title)
+        path = (time.perf_counter() - started) / args.queries
+
+        print(
+            f"{count:>8}{build:>10.2f}{approve * 1000:>12.1f}{nearest * 1e6:>12.1f}{path * 1e6:>10.1f}"
+            f"{graph.stats()['common_skills']:>15}"
+        )
+
+
+if __name__ == "__main__":
+    main()
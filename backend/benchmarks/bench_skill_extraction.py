@@ -0,0 +1,69 @@
+"""
+Compares the "full" and "tokenizer" skill extraction modes.
+
+Builds synthetic resumes from ontology.json, runs every mode over the same
+texts, checks that they all find exactly the same skills and reports the
+CPU time per resume.
+
+    cd backend
+    python benchmarks/bench_skill_extraction.py --resumes 200
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from extraction import build_skill_matcher, load_nlp, match_skills, match_skills_batch, skill_terms  # noqa: E402
+from synthetic import synthetic_resumes  # noqa: E402
+
+
+def run_mode(mode, terms, texts, batched):
+    nlp = load_nlp(mode)
+    matcher = build_skill_matcher(nlp, terms)
+    start = time.process_time()
+    if batched:
+        results = match_skills_batch(nlp, matcher, texts, mode=mode)
+    else:
+        results = [match_skills(nlp, matcher, text, mode=mode) for text in texts]
+    elapsed = time.process_time() - start
+    return [set(skills) for skills in results], elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--ontology", default=str(BACKEND_DIR / 'ontology.json'))
+    args = parser.parse_args()
+
+    with open(args.ontology, 'r', encoding='utf-8') as f:
+        skills = json.load(f)['skills']
+    terms = skill_terms(skills)
+    texts = synthetic_resumes(skills, args.resumes)
+
+    runs = [
+        ("full", False),
+        ("tokenizer", False),
+        ("tokenizer", True),
+    ]
+    baseline, baseline_time = None, None
+    print(f"{'mode':<22}{'cpu ms/resume':>15}{'speedup':>10}")
+    for mode, batched in runs:
+        results, elapsed = run_mode(mode, terms, texts, batched)
+        if baseline is None:
+            baseline, baseline_time = results, elapsed
+        elif results != baseline:
+            mismatches = sum(1 for a, b in zip(results, baseline) if a != b)
+            print(f"✗ {mode} (batched={batched}) disagrees with full mode on {mismatches} resumes")
+            sys.exit(1)
+        label = f"{mode}{' + nlp.pipe' if batched else ''}"
+        print(f"{label:<22}{elapsed / len(texts) * 1000:>15.3f}{baseline_time / elapsed:>9.1f}x")
+
+    print(f"\n✓ All modes found identical skill sets for {len(texts)} resumes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Synthetic inputs shared by the benchmarks: scaled copies of ontology.json,
+resume texts that mention its skills, and those texts rendered as PDF and
+DOCX files.
+"""
+import io
+import random
+from typing import Dict, List
+
+FILLER_SENTENCES = [
+    "Collaborated with cross-functional teams to deliver features on schedule.",
+    "Graduated with honours and led the university coding club for two years.",
+    "Responsible for maintaining internal dashboards used by the sales team.",
+    "Mentored three interns and ran weekly knowledge sharing sessions.",
+    "Improved onboarding documentation, cutting ramp-up time by 30%.",
+    "Worked closely with product managers, designers and QA engineers.",
+    "Volunteered at local hackathons, judging student projects.",
+    "Presented quarterly results to senior leadership, Jan. through Dec.",
+]
+PDF_PAGE_CHARS = 2500  # Roughly what fits in one text box on a letter page
+
+
+def _replica_name(name: str, replica: int) -> str:
+    return name if replica == 0 else f"{name} {replica}"
+
+
+def scaled_ontology(ontology: Dict, factor: int) -> Dict:
+    """
+    ``factor`` copies of every skill and role. Copy k > 0 of "Python" is
+    "Python k" (aliases get the same suffix), and copy k of a role weights
+    copy k of its skills, so larger catalogs keep the same shape.
+    """
+    skills, job_roles = {}, []
+    for replica in range(factor):
+        for name, data in ontology['skills'].items():
+            copy = dict(data)
+            copy['aliases'] = [_replica_name(alias, replica) for alias in data.get('aliases', [])]
+            skills[_replica_name(name, replica)] = copy
+        for role in ontology['job_roles']:
+            copy = dict(role)
+            copy['title'] = _replica_name(role['title'], replica)
+            copy['skill_weights'] = [
+                dict(weight, skill=_replica_name(weight['skill'], replica))
+                for weight in role.get('skill_weights', [])
+            ]
+            job_roles.append(copy)
+    return {"skills": skills, "job_roles": job_roles}
+
+
+def synthetic_resumes(skills: Dict[str, Dict], count: int, seed: int = 42) -> List[str]:
+    """Filler text with skill names and aliases sprinkled in mixed case."""
+    rng = random.Random(seed)
+    phrases = [name for name in skills] + [alias for data in skills.values() for alias in data.get('aliases', [])]
+    casings = [str, str.lower, str.upper, str.title]
+    resumes = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(20, 40)):
+            parts.append(rng.choice(FILLER_SENTENCES))
+            mentioned = rng.sample(phrases, rng.randint(0, 3))
+            if mentioned:
+                parts.append("Used " + ", ".join(rng.choice(casings)(p) for p in mentioned) + " daily.")
+        resumes.append(" ".join(parts))
+    return resumes
+
+
+def make_pdf(text: str) -> bytes:
+    import fitz  # PyMuPDF
+
+    doc = fitz.open()
+    for start in range(0, max(len(text), 1), PDF_PAGE_CHARS):
+        page = doc.new_page()
+        page.insert_textbox(fitz.Rect(50, 50, 562, 742), text[start:start + PDF_PAGE_CHARS], fontsize=9)
+    return doc.tobytes()
+
+
+def make_docx(text: str) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for sentence in text.split(". "):
+        doc.add_paragraph(sentence)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,215 @@
+"""
+In-memory index of stored resume analyses, for ranking past candidates
+against a job role.
+
+Every skill gets a permanent bit position (its skill id). The id list
+lives in ontology_meta/_id "skill_ids" and only grows: workers add unseen
+skill names with $addToSet, which appends, so every worker and every
+restart agrees on the ids. Each analysis stores its skills as a
+little-endian bitset over those ids (``skill_bits``; 40 skills fit in 8
+bytes). The index keeps them word-major, as one contiguous uint64 array
+per 64 skill ids, so scoring a word scans memory sequentially.
+
+A role is scored against every row without looking at skill names. Its
+skill_weights are grouped by (weight, is_core) into one bit mask per
+group, and each group adds weight * popcount(row & mask) to the row's
+score. The result is the same core/total blend that
+calculate_weighted_match gives a single resume, computed for every row in
+a few vectorized passes. New analyses are appended as they are written,
+and the arrays double when they fill.
+"""
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+from pymongo import ReturnDocument
+
+from scoring_engine import CORE_BLEND_WEIGHT, DEFAULT_SKILL_WEIGHT, TOTAL_BLEND_WEIGHT
+
+SKILL_IDS_DOC_ID = "skill_ids"
+CANDIDATE_INDEX_LOAD_BATCH_SIZE = 10000
+INITIAL_CAPACITY = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class SkillIds:
+    """Skill name <-> permanent bit position, mirrored from ontology_meta"""
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def _set(self, names: List[str]) -> None:
+        # The stored list only ever grows, so existing ids never move
+        for name in names[len(self.names):]:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+
+    async def sync(self, collection, skill_names: Iterable[str]) -> None:
+        """Give every skill in ``skill_names`` an id (one round trip, only if some are new)"""
+        unseen = [name for name in skill_names if name not in self.ids]
+        if not unseen and self.names:
+            return
+        doc = await collection.find_one_and_update(
+            {"_id": SKILL_IDS_DOC_ID},
+            {"$addToSet": {"names": {"$each": unseen}}},
+            projection={"names": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self._set(doc.get("names", []))
+
+    @property
+    def words(self) -> int:
+        """uint64 words per bitset"""
+        return max(1, math.ceil(len(self.names) / 64))
+
+    def encode(self, skills: Iterable[str]) -> bytes:
+        """Bitset of ``skills``; skills without an id yet are left out"""
+        value = 0
+        for skill in skills:
+            skill_id = self.ids.get(skill)
+            if skill_id is not None:
+                value |= 1 << skill_id
+        return value.to_bytes(8 * self.words, 'little')
+
+
+class CandidateIndex:
+    def __init__(self, skill_ids: SkillIds, capacity: int = INITIAL_CAPACITY):
+        self.skill_ids = skill_ids
+        self._bits = np.zeros((1, capacity), dtype=np.uint64)  # words x analyses
+        self._analysis_ids: List[str] = []
+        # Until load() has run, analyses added live are remembered so the
+        # load does not index them twice
+        self.loading = True
+        self._added_while_loading: Set[str] = set()
+        self.load_stats: Dict = {}
+
+    def __len__(self) -> int:
+        return len(self._analysis_ids)
+
+    def _row(self, skill_bits: bytes) -> np.ndarray:
+        padded = bytes(skill_bits) + b"\0" * (-len(skill_bits) % 8)
+        return np.frombuffer(padded, dtype='<u8')
+
+    def _reserve(self, rows: int, words: int) -> None:
+        width, capacity = self._bits.shape
+        if rows <= capacity and words <= width:
+            return
+        grown = np.zeros((max(width, words), max(capacity * 2, rows) if rows > capacity else capacity), dtype=np.uint64)
+        grown[:width, :len(self)] = self._bits[:, :len(self)]
+        self._bits = grown  # Searches already running keep the old array
+
+    def add(self, analysis_id: str, skill_bits: bytes) -> None:
+        row = self._row(skill_bits)
+        count = len(self)
+        self._reserve(count + 1, len(row))
+        self._bits[:len(row), count] = row
+        self._analysis_ids.append(analysis_id)
+        if self.loading:
+            self._added_while_loading.add(analysis_id)
+
+    async def load(self, collection, batch_size: int = CANDIDATE_INDEX_LOAD_BATCH_SIZE) -> None:
+        """
+        Index every stored analysis. Analyses saved before skill_bits existed
+        are encoded from their user_skills.
+        """
+        loaded = encoded = 0
+        projection = {"_id": 0, "id": 1, "skill_bits": 1, "user_skills": 1}
+        async for doc in collection.find({}, projection, batch_size=batch_size):
+            if "id" not in doc or doc["id"] in self._added_while_loading:
+                continue
+            skill_bits = doc.get("skill_bits")
+            if skill_bits is None:
+                skill_bits = self.skill_ids.encode(doc.get("user_skills", []))
+                encoded += 1
+            self.add(doc["id"], skill_bits)
+            loaded += 1
+        self.loading = False
+        self._added_while_loading.clear()
+        self.load_stats = {"loaded": loaded, "encoded_from_skills": encoded}
+        logger.info(f"Candidate index loaded {loaded} analyses ({encoded} encoded from user_skills)")
+
+    def _role_groups(self, job_role: Dict, width: int) -> Tuple[List[Tuple[float, bool, np.ndarray]], float, float]:
+        """(weight, is_core, word mask) groups for a role, plus its max total and core weight"""
+        masks: Dict[Tuple[float, bool], np.ndarray] = defaultdict(lambda: np.zeros(width, dtype=np.uint64))
+        max_total = max_core = 0.0
+        for skill_weight in job_role.get('skill_weights', []):
+            weight = skill_weight.get('weight', DEFAULT_SKILL_WEIGHT)
+            is_core = bool(skill_weight.get('is_core', False))
+            max_total += weight
+            if is_core:
+                max_core += weight
+            skill_id = self.skill_ids.ids.get(skill_weight['skill'])
+            if skill_id is None or skill_id >= 64 * width:
+                continue  # No stored analysis can have it
+            masks[(weight, is_core)][skill_id >> 6] |= np.uint64(1) << np.uint64(skill_id & 63)
+        return [(weight, is_core, mask) for (weight, is_core), mask in masks.items()], max_total, max_core
+
+    def search(self, job_role: Dict, limit: int = 20, min_score: float = 0.0) -> List[Dict]:
+        """
+        The ``limit`` best analyses for ``job_role``, best first (newest
+        first among equal scores). The returned scores are recomputed per
+        row with calculate_weighted_match's formulas.
+        """
+        # Count first: add() grows the array before appending the id, so this array holds every counted row
+        count = len(self)
+        bits, analysis_ids = self._bits, self._analysis_ids
+        groups, max_total, max_core = self._role_groups(job_role, bits.shape[0])
+        if not count or not groups:
+            return []
+        # Each group's blended contribution per matched skill, so ranking
+        # needs one multiply-add per mask word
+        total_scale = 100 / max_total if max_total > 0 else 0.0
+        core_scale = 100 / max_core if max_core > 0 else 0.0
+        scores = np.zeros(count)
+        matched = np.zeros(count, dtype=np.uint16)
+        for weight, is_core, mask in groups:
+            coefficient = weight * (TOTAL_BLEND_WEIGHT * total_scale + (CORE_BLEND_WEIGHT * core_scale if is_core else 0.0))
+            for word in np.flatnonzero(mask):
+                hits = np.bitwise_count(bits[word, :count] & mask[word])
+                matched += hits
+                scores += coefficient * hits
+        if max_core == 0:
+            scores += CORE_BLEND_WEIGHT * 100  # calculate_weighted_match counts "no core skills" as 100%
+        scores[matched == 0] = 0.0  # ...but an analysis matching none of the role's skills is no candidate
+
+        candidates = np.flatnonzero(scores > min_score)
+        if len(candidates) > limit:
+            # Everything above the limit-th best score, then the newest of those tied with it
+            cutoff = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+            above = candidates[scores[candidates] > cutoff]
+            tied = candidates[scores[candidates] == cutoff][::-1][:limit - len(above)]
+            candidates = np.concatenate([above, tied])
+        order = np.lexsort((-candidates, -scores[candidates]))
+        results = []
+        for row in candidates[order]:
+            total = core = 0.0
+            for weight, is_core, mask in groups:
+                hits = int(np.bitwise_count(bits[:, row] & mask).sum())
+                total += weight * hits
+                core += weight * hits if is_core else 0.0
+            total_pct = total / max_total * 100 if max_total > 0 else 0.0
+            core_pct = core / max_core * 100 if max_core > 0 else 100.0
+            results.append({
+                "analysis_id": analysis_ids[row],
+                "match_score": round(core_pct * CORE_BLEND_WEIGHT + total_pct * TOTAL_BLEND_WEIGHT, 1),
+                "core_match_score": round(core_pct, 1),
+                "total_match_score": round(total_pct, 1),
+                "matched_skills": int(matched[row]),
+            })
+        return results
+
+    def stats(self) -> Dict:
+        return {
+            "analyses": len(self),
+            "loading": self.loading,
+            "skill_ids": len(self.skill_ids.names),
+            "words_per_analysis": int(self._bits.shape[0]),
+            "capacity": int(self._bits.shape[1]),
+            "bytes": int(self._bits.nbytes),
+            **self.load_stats,
+        }
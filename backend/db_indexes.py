@@ -0,0 +1,84 @@
+"""
+Index definitions for every collection the backend queries, and the
+bootstrap that creates them (server startup and the updater both run it).
+
+create_index is a no-op when an identical index exists, so running this on
+every start is cheap. An index that cannot be built (for example a unique
+index over existing duplicates) is logged and skipped rather than stopping
+the server.
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+PENDING_UPDATE_INDEXES = [
+    {"keys": [("id", ASCENDING)], "name": "id_unique", "unique": True},
+    # At most one pending entry per (type, name) and per (type, title): makes
+    # updater re-runs and concurrent runs idempotent even if they race past
+    # the existence checks.
+    {
+        "keys": [("type", ASCENDING), ("data.name", ASCENDING)],
+        "name": "pending_name_unique",
+        "unique": True,
+        "partialFilterExpression": {"status": "pending", "data.name": {"$exists": True}},
+    },
+    {
+        "keys": [("type", ASCENDING), ("data.title", ASCENDING)],
+        "name": "pending_title_unique",
+        "unique": True,
+        "partialFilterExpression": {"status": "pending", "data.title": {"$exists": True}},
+    },
+    # Keyset pagination of the admin listing, with and without a type filter
+    {"keys": [("status", ASCENDING), ("discovered_at", ASCENDING), ("id", ASCENDING)], "name": "status_discovered"},
+    {
+        "keys": [("status", ASCENDING), ("type", ASCENDING), ("discovered_at", ASCENDING), ("id", ASCENDING)],
+        "name": "status_type_discovered",
+    },
+]
+
+COLLECTION_INDEXES: Dict[str, List[Dict]] = {
+    "pending_ontology_updates": PENDING_UPDATE_INDEXES,
+    "resume_analyses": [
+        {"keys": [("id", ASCENDING)], "name": "id_unique", "unique": True},
+        {"keys": [("timestamp", DESCENDING)], "name": "timestamp"},
+    ],
+    "ontology_skills": [
+        # Obsolete-skill checks filter on these
+        {"keys": [("mention_frequency", ASCENDING)], "name": "mention_frequency"},
+        {"keys": [("last_seen_in_market", ASCENDING)], "name": "last_seen_in_market"},
+    ],
+    "ontology_job_roles": [
+        {"keys": [("title", ASCENDING)], "name": "title"},
+        {"keys": [("experience_level", ASCENDING)], "name": "experience_level"},
+    ],
+    "ontology_update_jobs": [
+        {"keys": [("started_at", DESCENDING)], "name": "started_at"},
+    ],
+}
+
+
+async def ensure_collection_indexes(collection, indexes: List[Dict]) -> List[str]:
+    """Create ``indexes`` on one collection; returns the names that could not be built"""
+    failed = []
+    for index in indexes:
+        options = {key: value for key, value in index.items() if key != "keys"}
+        try:
+            await collection.create_index(index["keys"], **options)
+        except OperationFailure as e:
+            logger.warning(f"Could not create index {collection.name}.{index['name']}: {e}")
+            failed.append(index["name"])
+    return failed
+
+
+async def ensure_indexes(db) -> Dict:
+    """Bootstrap every index in COLLECTION_INDEXES; returns {"created": n, "failed": [...]}"""
+    created, failed = 0, []
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        missing = await ensure_collection_indexes(db[collection_name], indexes)
+        created += len(indexes) - len(missing)
+        failed += [f"{collection_name}.{name}" for name in missing]
+    return {"created": created, "failed": failed}
@@ -0,0 +1,197 @@
+"""
+Resume text extraction and skill matching.
+
+Kept free of FastAPI/Mongo imports so the extraction pool's worker
+processes can import it without pulling in the web app.
+"""
+import io
+import os
+import zipfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import spacy
+from docx import Document
+from spacy.matcher import PhraseMatcher
+
+from pdf_text import extract_pdf
+
+SPACY_MODEL = "en_core_web_sm"
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# "tokenizer": the PhraseMatcher matches on LOWER, which only needs tokens,
+#              so load the model without any trained component.
+# "full":      run the whole en_core_web_sm pipeline (the original
+#              behaviour, kept for comparison).
+# Both modes still lowercase the text: the tokenizer's infix rules are
+# case-sensitive ("Node.Js" splits into three tokens, "node.js" doesn't),
+# so skipping it would change which skills match.
+SKILL_EXTRACTION_MODE = os.environ.get('SKILL_EXTRACTION_MODE', 'tokenizer')
+UNUSED_PIPELINE_COMPONENTS = ["tok2vec", "tagger", "parser", "senter", "attribute_ruler", "lemmatizer", "ner"]
+NLP_BATCH_SIZE = 32
+BATCH_UPLOAD_MAX_FILES = int(os.environ.get('BATCH_UPLOAD_MAX_FILES', 500))
+BATCH_UPLOAD_MAX_FILE_BYTES = int(os.environ.get('BATCH_UPLOAD_MAX_FILE_BYTES', 10 * 1024 * 1024))
+BATCH_UPLOAD_MAX_EXPANDED_BYTES = int(os.environ.get('BATCH_UPLOAD_MAX_EXPANDED_BYTES', 200 * 1024 * 1024))  # Decompressed, per batch
+
+
+def load_nlp(mode: str = SKILL_EXTRACTION_MODE):
+    if mode == "tokenizer":
+        return spacy.load(SPACY_MODEL, exclude=UNUSED_PIPELINE_COMPONENTS)
+    if mode == "full":
+        return spacy.load(SPACY_MODEL)
+    raise ValueError(f"Unknown SKILL_EXTRACTION_MODE: {mode}")
+
+
+def extract_text_from_pdf(file_bytes):
+    return extract_pdf(file_bytes)[0]
+
+
+def extract_text_from_docx(file_bytes):
+    doc = Document(io.BytesIO(file_bytes))
+    return "".join(paragraph.text + "\n" for paragraph in doc.paragraphs)
+
+
+def extract_text_with_info(filename: str, file_bytes: bytes) -> Tuple[str, Optional[Dict]]:
+    """Like extract_text; info is extract_pdf's report for PDFs and None otherwise"""
+    if filename.endswith('.pdf'):
+        return extract_pdf(file_bytes)
+    return extract_text(filename, file_bytes), None
+
+
+def extract_text(filename: str, file_bytes: bytes) -> str:
+    """Dispatch on file extension. Callers check SUPPORTED_EXTENSIONS first."""
+    if filename.endswith('.pdf'):
+        return extract_text_from_pdf(file_bytes)
+    if filename.endswith('.docx'):
+        return extract_text_from_docx(file_bytes)
+    raise ValueError(f"Unsupported file type: {filename}")
+
+
+def _resume_members(archive: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    return [
+        info for info in archive.infolist()
+        if not info.is_dir()
+        and not info.filename.startswith('__MACOSX/')
+        and info.filename.endswith(SUPPORTED_EXTENSIONS)
+    ]
+
+
+def zip_resume_bytes(file) -> int:
+    """
+    Declared uncompressed size of the resumes in a zip, read from its
+    central directory without decompressing anything (0 if it is no zip).
+    ``file`` is a seekable file object, left where it was found.
+    """
+    position = file.tell()
+    try:
+        with zipfile.ZipFile(file) as archive:
+            return sum(info.file_size for info in _resume_members(archive))
+    except zipfile.BadZipFile:
+        return 0
+    finally:
+        file.seek(position)
+
+
+def expand_zip(file_bytes: bytes, max_files: int = BATCH_UPLOAD_MAX_FILES,
+               max_file_bytes: int = BATCH_UPLOAD_MAX_FILE_BYTES,
+               max_total_bytes: int = BATCH_UPLOAD_MAX_EXPANDED_BYTES) -> List[Tuple[str, bytes]]:
+    """
+    (filename, bytes) for every PDF/DOCX in a zip archive. Folders, macOS
+    metadata and other file types are skipped; limits are checked against
+    the declared sizes before anything is decompressed. A running total of
+    the bytes actually decompressed is capped at ``max_total_bytes`` too,
+    so many small, highly compressible members cannot expand to gigabytes.
+    """
+    with zipfile.ZipFile(io.BytesIO(file_bytes)) as archive:
+        members = _resume_members(archive)
+        if len(members) > max_files:
+            raise ValueError(f"Archive holds {len(members)} resumes; the limit is {max_files}")
+        for info in members:
+            if info.file_size > max_file_bytes:
+                raise ValueError(f"{info.filename} is larger than {max_file_bytes} bytes")
+        if sum(info.file_size for info in members) > max_total_bytes:
+            raise ValueError(f"Archive expands to more than {max_total_bytes} bytes")
+
+        resumes, total = [], 0
+        for info in members:
+            with archive.open(info) as member:
+                data = member.read(max_file_bytes + 1)  # Never trust the declared size alone
+            total += len(data)
+            if len(data) > max_file_bytes:
+                raise ValueError(f"{info.filename} is larger than {max_file_bytes} bytes")
+            if total > max_total_bytes:
+                raise ValueError(f"Archive expands to more than {max_total_bytes} bytes")
+            resumes.append((info.filename, data))
+        return resumes
+
+
+def skill_terms(skills: Dict[str, Dict]) -> List[Tuple[str, List[str]]]:
+    """
+    Lowercased (skill_name, [name, *aliases]) pairs. This is all a worker
+    needs to rebuild the matcher, so it is what gets shipped to processes.
+    """
+    return [
+        (skill_name, [skill_name.lower()] + [alias.lower() for alias in skill_data.get('aliases', [])])
+        for skill_name, skill_data in skills.items()
+    ]
+
+
+def tokenize_skill_terms(nlp, terms: List[Tuple[str, List[str]]], batch_size: int = 1000):
+    """Flatten terms to (labels, pattern docs), tokenized in batches"""
+    labels = [skill_name for skill_name, phrases in terms for _ in phrases]
+    phrases = [phrase for _, skill_phrases in terms for phrase in skill_phrases]
+    return labels, list(nlp.tokenizer.pipe(phrases, batch_size=batch_size))
+
+
+def matcher_from_docs(nlp, labels: List[str], docs) -> PhraseMatcher:
+    patterns: Dict[str, list] = {}
+    for skill_name, doc in zip(labels, docs):
+        patterns.setdefault(skill_name, []).append(doc)
+    matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+    for skill_name, skill_patterns in patterns.items():
+        matcher.add(skill_name, skill_patterns)
+    return matcher
+
+
+def build_skill_matcher(nlp, terms: List[Tuple[str, List[str]]]) -> PhraseMatcher:
+    labels, docs = tokenize_skill_terms(nlp, terms)
+    return matcher_from_docs(nlp, labels, docs)
+
+
+class CombinedMatcher:
+    """Runs a base matcher and a small delta matcher as if they were one"""
+
+    def __init__(self, *matchers: PhraseMatcher):
+        self.matchers = matchers
+
+    def __call__(self, doc):
+        return [match for matcher in self.matchers for match in matcher(doc)]
+
+    def __len__(self):
+        return sum(len(matcher) for matcher in self.matchers)
+
+
+def _skills_in_doc(nlp, matcher: PhraseMatcher, doc) -> List[str]:
+    found_skills = set()
+    for match_id, start, end in matcher(doc):
+        found_skills.add(nlp.vocab.strings[match_id])
+    return list(found_skills)
+
+
+def match_skills(nlp, matcher: PhraseMatcher, text: str, mode: str = SKILL_EXTRACTION_MODE) -> List[str]:
+    if mode == "tokenizer":
+        doc = nlp.make_doc(text.lower())
+    else:
+        doc = nlp(text.lower())
+    return _skills_in_doc(nlp, matcher, doc)
+
+
+def match_skills_batch(
+    nlp,
+    matcher: PhraseMatcher,
+    texts: Iterable[str],
+    mode: str = SKILL_EXTRACTION_MODE,
+    batch_size: int = NLP_BATCH_SIZE,
+) -> List[List[str]]:
+    """Same as match_skills for many texts, streamed through nlp.pipe"""
+    docs = nlp.pipe((text.lower() for text in texts), batch_size=batch_size)
+    return [_skills_in_doc(nlp, matcher, doc) for doc in docs]
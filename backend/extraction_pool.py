@@ -0,0 +1,279 @@
+"""
+Runs resume parsing and skill extraction off the event loop.
+
+Two execution paths:
+- "thread": a small thread pool sharing the server's nlp and skill_matcher.
+- "process": a spawn-based process pool whose workers each hold a warm
+  spaCy model and their own copy of the skill matcher. Files smaller than
+  EXTRACTION_PROCESS_MIN_BYTES still go to the thread pool, since shipping
+  them to another process costs more than parsing them.
+
+The process pool is rebuilt by refresh() whenever the base matcher
+changes. Skills approved since then (the snapshot's delta terms) are small
+and travel with each task instead; workers cache the delta matcher per
+snapshot fingerprint. Workers build their own fuzzy index (fuzzy_matcher.py)
+from the same terms, so both paths match identically.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from extraction import CombinedMatcher, build_skill_matcher, extract_text_with_info, load_nlp, match_skills
+from fuzzy_matcher import build_fuzzy_index, with_fuzzy
+from matcher_cache import load_skill_matcher
+from pdf_text import shutdown_page_pool
+
+EXTRACTION_MODE = os.environ.get('EXTRACTION_MODE', 'thread')  # "thread" or "process"
+EXTRACTION_PROCESS_WORKERS = int(os.environ.get('EXTRACTION_PROCESS_WORKERS', os.cpu_count() or 2))
+EXTRACTION_THREAD_WORKERS = int(os.environ.get('EXTRACTION_THREAD_WORKERS', 4))
+EXTRACTION_PROCESS_MIN_BYTES = int(os.environ.get('EXTRACTION_PROCESS_MIN_BYTES', 256 * 1024))
+
+logger = logging.getLogger(__name__)
+
+# --- Worker-process state (only populated inside pool processes) ---
+_worker_nlp = None
+_worker_matcher = None
+_worker_fuzzy = None
+_worker_delta = (None, None)  # (fingerprint, matcher including the delta)
+
+
+def _init_worker(terms):
+    global _worker_nlp, _worker_matcher, _worker_fuzzy
+    _worker_nlp = load_nlp()
+    _worker_matcher, _ = load_skill_matcher(_worker_nlp, terms)  # Usually a cache hit
+    _worker_fuzzy = build_fuzzy_index(terms)
+
+
+def _warm_up():
+    return os.getpid()
+
+
+def _reset_peak_rss() -> bool:
+    """Restart this process's peak RSS (VmHWM) from its current RSS; False where Linux's clear_refs is missing"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_kb() -> Optional[int]:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _extract_in_worker(filename: str, file_bytes: bytes) -> Tuple[str, Optional[Dict]]:
+    """
+    extract_text_with_info, plus the worker's peak RSS while parsing a PDF.
+    A worker parses one document at a time, so that peak is this document's
+    (page-pool processes, when PDF_PARALLEL_MIN_PAGES is set, not included).
+    """
+    measured = _reset_peak_rss()
+    text, info = extract_text_with_info(filename, file_bytes)
+    if info is not None:
+        info["peak_rss_kb"] = _peak_rss_kb() if measured else None
+    return text, info
+
+
+def _analyze_in_worker(filename: str, file_bytes: bytes, delta_key=None, delta_terms=None):
+    global _worker_delta
+    started = time.perf_counter()
+    text, info = _extract_in_worker(filename, file_bytes)
+    parsed = time.perf_counter()
+    if not text.strip():
+        return text, [], info, {"parse": parsed - started, "match": 0.0}
+
+    matcher = with_fuzzy(_worker_matcher, _worker_fuzzy)
+    if delta_terms:
+        if _worker_delta[0] != delta_key:
+            exact = CombinedMatcher(_worker_matcher, build_skill_matcher(_worker_nlp, delta_terms))
+            fuzzy = _worker_fuzzy.extended(delta_terms) if _worker_fuzzy is not None else None
+            _worker_delta = (delta_key, with_fuzzy(exact, fuzzy))
+        matcher = _worker_delta[1]
+    skills = match_skills(_worker_nlp, matcher, text)
+    return text, skills, info, {"parse": parsed - started, "match": time.perf_counter() - parsed}
+
+
+class _Gauge:
+    """In-flight counter for one executor, used for the saturation metric."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+
+    def snapshot(self):
+        return {
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "saturation": round(self.in_flight / self.capacity, 3) if self.capacity else 0.0,
+            "completed": self.completed,
+        }
+
+
+class _DocumentStats:
+    """
+    Worst-case cost of the PDFs parsed so far, from extract_pdf's reports.
+    Peak memory is only known for PDFs parsed in the process pool: threads
+    share one process, so no thread can tell its own peak apart.
+    """
+
+    def __init__(self):
+        self.documents = 0
+        self.pages_read = 0
+        self.truncated = 0
+        self.seconds = 0.0
+        self.max_pages_read = 0
+        self.max_seconds = 0.0
+        self.max_seconds_per_page = 0.0
+        self.max_chars = 0
+        self.peak_rss_kb = 0
+
+    def record(self, info: Optional[Dict]) -> None:
+        if not info:
+            return
+        self.documents += 1
+        self.pages_read += info["pages_read"]
+        self.truncated += info["truncated"]
+        self.seconds += info["seconds"]
+        self.max_pages_read = max(self.max_pages_read, info["pages_read"])
+        self.max_seconds = max(self.max_seconds, info["seconds"])
+        self.max_seconds_per_page = max(self.max_seconds_per_page, info["seconds_per_page"])
+        self.max_chars = max(self.max_chars, info["chars"])
+        self.peak_rss_kb = max(self.peak_rss_kb, info.get("peak_rss_kb") or 0)
+
+    def snapshot(self):
+        return {
+            "documents": self.documents,
+            "pages_read": self.pages_read,
+            "truncated": self.truncated,
+            "avg_seconds_per_page": round(self.seconds / self.pages_read, 5) if self.pages_read else 0.0,
+            "max_pages_read": self.max_pages_read,
+            "max_seconds": round(self.max_seconds, 4),
+            "max_seconds_per_page": round(self.max_seconds_per_page, 5),
+            "max_chars": self.max_chars,
+            "peak_rss_kb": self.peak_rss_kb,  # Highest worker RSS while parsing one PDF (process pool only)
+        }
+
+
+class ExtractionPool:
+    def __init__(
+        self,
+        mode: str = EXTRACTION_MODE,
+        process_workers: int = EXTRACTION_PROCESS_WORKERS,
+        thread_workers: int = EXTRACTION_THREAD_WORKERS,
+        process_min_bytes: int = EXTRACTION_PROCESS_MIN_BYTES,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown EXTRACTION_MODE: {mode}")
+        self.mode = mode
+        self.process_workers = process_workers
+        self.process_min_bytes = process_min_bytes
+        self.generation = 0
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="extract")
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self._thread_gauge = _Gauge(thread_workers)
+        self._process_gauge = _Gauge(process_workers if mode == "process" else 0)
+        self.pdf_stats = _DocumentStats()
+
+    def refresh(self, terms):
+        """
+        Swap in a fresh process pool built from the current matcher terms.
+        Tasks already queued on the old pool finish there.
+        """
+        self.generation += 1
+        if self.mode != "process":
+            return
+
+        old_pool = self._processes
+        self._processes = ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(terms,),
+        )
+        # Start every worker now so the model is warm before the first upload
+        for _ in range(self.process_workers):
+            self._processes.submit(_warm_up)
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+        logger.info(f"Extraction process pool refreshed (generation {self.generation}, {self.process_workers} workers)")
+
+    async def analyze(
+        self,
+        filename: str,
+        file_bytes: bytes,
+        local_analyze: Callable[[str, bytes], Tuple[str, List[str], Optional[Dict], Dict[str, float]]],
+        delta_key: Optional[str] = None,
+        delta_terms=None,
+    ) -> Tuple[str, List[str], Dict[str, float]]:
+        """
+        Returns (text, skills, timings). ``local_analyze`` is the in-process
+        implementation used on the thread path and returns (text, skills,
+        pdf info, timings) like the worker does; ``delta_key``/``delta_terms``
+        describe skills added since the last refresh().
+
+        timings holds the seconds spent in "parse" and "match", plus "queue":
+        the rest of the round trip (waiting for a free worker, pickling).
+        """
+        started = time.perf_counter()
+        if self._processes is not None and len(file_bytes) >= self.process_min_bytes:
+            text, skills, info, timings = await self._run(
+                self._processes, self._process_gauge,
+                _analyze_in_worker, filename, file_bytes, delta_key, delta_terms
+            )
+        else:
+            text, skills, info, timings = await self._run(self._threads, self._thread_gauge, local_analyze, filename, file_bytes)
+        self.pdf_stats.record(info)
+        timings["queue"] = max(0.0, time.perf_counter() - started - timings["parse"] - timings["match"])
+        return text, skills, timings
+
+    async def extract(self, filename: str, file_bytes: bytes) -> str:
+        """Text only, for callers that batch the skill matching themselves"""
+        if self._processes is not None and len(file_bytes) >= self.process_min_bytes:
+            call = (self._processes, self._process_gauge, _extract_in_worker)
+        else:
+            call = (self._threads, self._thread_gauge, extract_text_with_info)
+        text, info = await self._run(*call, filename, file_bytes)
+        self.pdf_stats.record(info)
+        return text
+
+    async def _run(self, executor, gauge: _Gauge, *call):
+        loop = asyncio.get_running_loop()
+        gauge.in_flight += 1
+        gauge.peak_in_flight = max(gauge.peak_in_flight, gauge.in_flight)
+        try:
+            return await loop.run_in_executor(executor, *call)
+        finally:
+            gauge.in_flight -= 1
+            gauge.completed += 1
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "generation": self.generation,
+            "process_min_bytes": self.process_min_bytes,
+            "process_pool": self._process_gauge.snapshot(),
+            "thread_pool": self._thread_gauge.snapshot(),
+            "pdf": self.pdf_stats.snapshot(),
+        }
+
+    def shutdown(self):
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        shutdown_page_pool()
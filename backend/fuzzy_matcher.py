@@ -0,0 +1,260 @@
+"""
+Second-stage, typo- and variant-tolerant skill matching.
+
+The PhraseMatcher only finds exact lowercase names and aliases. After it
+has run, FuzzyMatcher looks at the runs of tokens it left uncovered. Up
+to FUZZY_MAX_TOKENS tokens are joined without separators or punctuation
+and looked up within an edit budget, so "postgre sql", "Node JS",
+"pyhton", OCR's "p0stgresql" and "kubernetse" all find their skill. The
+longest hit wins.
+
+The lookup never compares a candidate against every alias. It uses a
+SymSpell-style index of every pattern's deletes, built once per ontology
+snapshot. A candidate's own deletes are probed in that dict, and only the
+few keys found are checked with a real edit distance. Deletes come from
+the first FUZZY_PREFIX_LENGTH characters, which bounds the index at
+roughly 30 entries per pattern. Results are cached per candidate, since
+resumes repeat most of their words.
+
+The edit budget depends on length, capped by FUZZY_MAX_EDIT_DISTANCE
+(0 keeps only the joined exact lookups). Shorter candidates get none
+("react" must not match "reach"); from FUZZY_MIN_LENGTH characters they
+get 1 edit, and from FUZZY_TWO_EDIT_LENGTH they get 2. Six-letter words
+are too often another English word one edit away ("docket", "docked" for
+Docker), so between FUZZY_SWAP_MIN_LENGTH and FUZZY_MIN_LENGTH only a
+swap of two adjacent letters is forgiven ("pyhton"). A fuzzy hit must
+also keep the pattern's first character.
+"""
+import os
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+FUZZY_MAX_EDIT_DISTANCE = int(os.environ.get('FUZZY_MAX_EDIT_DISTANCE', 2))
+FUZZY_MIN_LENGTH = int(os.environ.get('FUZZY_MIN_LENGTH', 7))
+FUZZY_SWAP_MIN_LENGTH = int(os.environ.get('FUZZY_SWAP_MIN_LENGTH', 6))
+FUZZY_TWO_EDIT_LENGTH = int(os.environ.get('FUZZY_TWO_EDIT_LENGTH', 10))
+FUZZY_MAX_TOKENS = int(os.environ.get('FUZZY_MAX_TOKENS', 3))
+FUZZY_PREFIX_LENGTH = 7
+FUZZY_CACHE_SIZE = 50000  # Candidate lookups remembered per index
+
+JOINERS = frozenset("-./")  # Kept inside a run ("scikit - learn"), dropped from the key
+_KEY_CHARS = re.compile(r"[^0-9a-z+#]")
+_WORD_SPLIT = re.compile(r"[\s\-./]+")
+
+Terms = List[Tuple[str, List[str]]]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, keeping only letters, digits, '+' and '#' ("Node.js" -> "nodejs")"""
+    return _KEY_CHARS.sub("", text.lower())
+
+
+def edit_budget(length: int, max_distance: int = FUZZY_MAX_EDIT_DISTANCE) -> int:
+    if length >= FUZZY_TWO_EDIT_LENGTH:
+        budget = 2
+    elif length >= FUZZY_MIN_LENGTH:
+        budget = 1
+    else:
+        budget = 0
+    return min(budget, max_distance)
+
+
+def fuzzy_signature() -> str:
+    """Settings that change what matches; part of the snapshot fingerprint"""
+    return (
+        f"fuzzy:{FUZZY_MAX_EDIT_DISTANCE}:{FUZZY_MIN_LENGTH}:{FUZZY_SWAP_MIN_LENGTH}:"
+        f"{FUZZY_TWO_EDIT_LENGTH}:{FUZZY_MAX_TOKENS}"
+    )
+
+
+def _deletes(word: str, distance: int) -> Set[str]:
+    results = {word}
+    frontier = {word}
+    for _ in range(distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        results |= frontier
+    return results
+
+
+def osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment distance (adjacent swaps count once), or limit + 1 if above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+            row_min = min(row_min, current[j])
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class _Layer:
+    """Exact keys and prefix deletes for one set of terms"""
+
+    def __init__(self, terms: Terms, max_distance: int):
+        self.keys: Dict[str, List[str]] = {}
+        self.deletes: Dict[str, List[str]] = {}
+        self.max_tokens = 1
+        for label, phrases in terms:
+            for phrase in phrases:
+                key = normalize(phrase)
+                if not key:
+                    continue
+                labels = self.keys.setdefault(key, [])
+                if label not in labels:
+                    labels.append(label)
+                self.max_tokens = max(self.max_tokens, len([w for w in _WORD_SPLIT.split(phrase) if w]))
+        for key in self.keys:
+            budget = edit_budget(len(key), max_distance)
+            if budget:
+                for variant in _deletes(key[:FUZZY_PREFIX_LENGTH], budget):
+                    self.deletes.setdefault(variant, []).append(key)
+
+
+class FuzzySkillIndex:
+    def __init__(self, terms: Terms = (), max_distance: int = FUZZY_MAX_EDIT_DISTANCE, layers: Optional[List[_Layer]] = None):
+        self.max_distance = max_distance
+        self.layers = layers if layers is not None else [_Layer(terms, max_distance)]
+        self.max_tokens = min(FUZZY_MAX_TOKENS, max(layer.max_tokens for layer in self.layers))
+        self._cache: Dict[str, Optional[List[str]]] = {}
+
+    def extended(self, terms: Terms) -> "FuzzySkillIndex":
+        """New index with ``terms`` added; the existing layers are shared, not rebuilt"""
+        return FuzzySkillIndex(max_distance=self.max_distance, layers=self.layers + [_Layer(terms, self.max_distance)])
+
+    def lookup(self, key: str) -> Optional[List[str]]:
+        """Skill labels for a normalized candidate, or None"""
+        cached = self._cache.get(key, False)
+        if cached is not False:
+            return cached
+        result = self._lookup(key)
+        if len(self._cache) >= FUZZY_CACHE_SIZE:
+            self._cache.clear()
+        self._cache[key] = result
+        return result
+
+    def _lookup(self, key: str) -> Optional[List[str]]:
+        for layer in self.layers:
+            if key in layer.keys:
+                return layer.keys[key]
+        budget = edit_budget(len(key), self.max_distance)
+        if not budget:
+            return self._swapped(key)
+
+        best, best_distance = None, budget + 1
+        variants = _deletes(key[:FUZZY_PREFIX_LENGTH], budget)
+        for layer in self.layers:
+            for variant in variants:
+                for candidate in layer.deletes.get(variant, ()):
+                    if candidate[0] != key[0]:
+                        continue
+                    limit = min(budget, edit_budget(len(candidate), self.max_distance), best_distance - 1)
+                    if limit < 1:
+                        continue
+                    distance = osa_distance(key, candidate, limit)
+                    if distance <= limit and (distance, candidate) < (best_distance, best or "~"):
+                        best, best_distance = candidate, distance
+                        labels = layer.keys[candidate]
+        return labels if best is not None else None
+
+    def _swapped(self, key: str) -> Optional[List[str]]:
+        """Labels of a pattern that is ``key`` with two adjacent letters swapped back"""
+        if self.max_distance < 1 or len(key) < FUZZY_SWAP_MIN_LENGTH:
+            return None
+        for i in range(1, len(key) - 1):  # Never the first letter
+            if key[i] == key[i + 1]:
+                continue
+            swapped = key[:i] + key[i + 1] + key[i] + key[i + 2:]
+            for layer in self.layers:
+                if swapped in layer.keys:
+                    return layer.keys[swapped]
+        return None
+
+    def find(self, doc, covered: Set[int]) -> List[Tuple[str, int, int]]:
+        """(label, start, end) for fuzzy hits among the tokens not in ``covered``, longest first"""
+        # One pass over the Doc; creating Token objects dominates otherwise
+        keys, words, stops = [], [], []
+        for token in doc:
+            text = token.text
+            if token.i in covered or token.is_space:
+                keys.append(None)
+            elif text in JOINERS:
+                keys.append("")
+            else:
+                key = normalize(text)
+                keys.append(key or None)
+            words.append(text not in JOINERS)
+            stops.append(token.is_stop)
+
+        found = []
+        i, length = 0, len(keys)
+        while i < length:
+            if not keys[i] or stops[i]:
+                i += 1  # Runs start at a content word
+                continue
+            candidates = []
+            j, joined, count = i, "", 0
+            while j < length and count < self.max_tokens and keys[j] is not None:
+                joined += keys[j]
+                if words[j]:
+                    count += 1
+                    candidates.append((joined, j + 1))
+                j += 1
+            hit = None
+            for key, end in reversed(candidates):
+                if len(key) < 2:
+                    continue
+                labels = self.lookup(key)
+                if labels:
+                    hit = (labels, end)
+                    break
+            if hit is None:
+                i += 1
+                continue
+            labels, end = hit
+            found += [(label, i, end) for label in labels]
+            i = end
+        return found
+
+
+class FuzzyMatcher:
+    """
+    A PhraseMatcher (or CombinedMatcher) followed by a FuzzySkillIndex pass
+    over what it left uncovered. Returns (match_id, start, end) like
+    PhraseMatcher, so every caller works unchanged.
+    """
+
+    def __init__(self, exact, index: FuzzySkillIndex):
+        self.exact = exact
+        self.index = index
+
+    def __call__(self, doc):
+        matches = list(self.exact(doc))
+        covered = set()
+        for _, start, end in matches:
+            covered.update(range(start, end))
+        strings = doc.vocab.strings
+        matches += [(strings.add(label), start, end) for label, start, end in self.index.find(doc, covered)]
+        return matches
+
+    def __len__(self):
+        return len(self.exact)
+
+
+def build_fuzzy_index(terms: Terms) -> Optional[FuzzySkillIndex]:
+    """The index for ``terms``, or None when fuzzy matching is off"""
+    if FUZZY_MAX_EDIT_DISTANCE <= 0 and FUZZY_MAX_TOKENS <= 1:
+        return None
+    return FuzzySkillIndex(terms)
+
+
+def with_fuzzy(exact, index: Optional[FuzzySkillIndex]):
+    return FuzzyMatcher(exact, index) if index is not None else exact
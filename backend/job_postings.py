@@ -0,0 +1,210 @@
+"""
+Counts skill mentions in a local corpus of job postings, for the weekly
+ontology updater.
+
+The corpus is JSONL (one posting object per line) or CSV with a header
+row, optionally gzip-compressed (.jsonl.gz, .csv.gz). A posting's text is
+the POSTING_TEXT_FIELDS it has, joined. Each posting is matched with the
+same matcher the server uses (PhraseMatcher plus the fuzzy second stage),
+and a skill is counted once per posting that mentions it.
+
+Memory does not grow with the corpus. Postings are read lazily and cut
+into chunks of JOB_POSTINGS_CHUNK_SIZE, and at most two chunks per worker
+are in flight. The workers are spawned processes, like the extraction
+pool's, and each loads the model and matcher once. A worker streams its
+chunk through nlp.pipe and returns only a Counter, so no Doc objects cross
+process boundaries (unlike nlp.pipe(n_process=...)).
+
+With a SkillDiscovery, the same pass also mines n-grams the matcher does
+not know (see skill_sketch.py); workers then also return the chunk's
+n-gram Counter, and only the parent holds a sketch.
+"""
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from extraction import NLP_BATCH_SIZE, load_nlp
+from fuzzy_matcher import build_fuzzy_index, with_fuzzy
+from matcher_cache import load_skill_matcher
+from skill_sketch import SkillDiscovery, candidate_ngrams
+
+JOB_POSTINGS_WORKERS = int(os.environ.get('JOB_POSTINGS_WORKERS', os.cpu_count() or 2))
+JOB_POSTINGS_CHUNK_SIZE = int(os.environ.get('JOB_POSTINGS_CHUNK_SIZE', 1000))
+JOB_POSTINGS_PROGRESS_SECONDS = float(os.environ.get('JOB_POSTINGS_PROGRESS_SECONDS', 10))
+POSTING_TEXT_FIELDS = ("title", "description", "requirements", "skills", "text")
+CSV_FIELD_SIZE_LIMIT = 16 * 1024 * 1024  # Descriptions can exceed csv's 128 KB default
+
+logger = logging.getLogger(__name__)
+
+Terms = List[Tuple[str, List[str]]]
+
+# --- Worker-process state (only populated inside pool processes) ---
+_worker_nlp = None
+_worker_matcher = None
+_worker_discover = False  # Also count candidate n-grams
+
+
+def posting_text(posting: Dict) -> str:
+    parts = []
+    for field in POSTING_TEXT_FIELDS:
+        value = posting.get(field)
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        if value:
+            parts.append(str(value))
+    return "\n".join(parts)
+
+
+def iter_postings(path: Path, counts: Optional[Dict] = None) -> Iterator[str]:
+    """
+    Yield the text of each posting in ``path``. Blank or malformed lines are
+    skipped and tallied in counts["skipped"].
+    """
+    path = Path(path)
+    counts = counts if counts is not None else {}
+    counts.setdefault("skipped", 0)
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    compressed = suffixes[-1:] == [".gz"]
+    kind = suffixes[-2] if compressed and len(suffixes) > 1 else suffixes[-1] if suffixes else ""
+    opener = gzip.open if compressed else open
+
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        if kind == ".csv":
+            csv.field_size_limit(max(csv.field_size_limit(), CSV_FIELD_SIZE_LIMIT))
+            records = csv.DictReader(f)
+        elif kind in (".jsonl", ".ndjson", ".json"):
+            records = _json_lines(f, counts)
+        else:
+            raise ValueError(f"Unsupported job postings file {path.name}: expected .jsonl or .csv (optionally .gz)")
+        for record in records:
+            text = posting_text(record)
+            if text.strip():
+                yield text
+            else:
+                counts["skipped"] += 1
+
+
+def _json_lines(f, counts: Dict) -> Iterator[Dict]:
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            counts["skipped"] += 1
+            continue
+        if isinstance(record, dict):
+            yield record
+        else:
+            counts["skipped"] += 1
+
+
+def _chunks(texts: Iterable[str], size: int) -> Iterator[List[str]]:
+    texts = iter(texts)
+    while True:
+        chunk = list(islice(texts, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def count_chunk(nlp, matcher, texts: List[str], discover: bool = False) -> Tuple[Counter, Optional[Counter]]:
+    """
+    (skill mentions, candidate n-gram counts) for one chunk. The n-gram
+    counts are None unless ``discover`` is set.
+    """
+    counts = Counter()
+    ngrams = Counter() if discover else None
+    # Lowercased like match_skills_batch, since the patterns are lowercase
+    for doc in nlp.pipe((text.lower() for text in texts), batch_size=NLP_BATCH_SIZE):
+        matches = matcher(doc)
+        counts.update({nlp.vocab.strings[match_id] for match_id, _, _ in matches})  # Once per posting
+        if ngrams is not None:
+            ngrams.update(set(candidate_ngrams(doc, matches)))
+    return counts, ngrams
+
+
+def _init_worker(terms: Terms, discover: bool = False):
+    global _worker_nlp, _worker_matcher, _worker_discover
+    _worker_nlp = load_nlp()
+    matcher, _ = load_skill_matcher(_worker_nlp, terms)  # The parent already cached it
+    _worker_matcher = with_fuzzy(matcher, build_fuzzy_index(terms))
+    _worker_discover = discover
+
+
+def _count_in_worker(texts: List[str]):
+    counts, ngrams = count_chunk(_worker_nlp, _worker_matcher, texts, _worker_discover)
+    return counts, ngrams, len(texts)
+
+
+def count_skill_mentions(
+    path: Path,
+    terms: Terms,
+    workers: int = JOB_POSTINGS_WORKERS,
+    chunk_size: int = JOB_POSTINGS_CHUNK_SIZE,
+    nlp=None,
+    progress: Optional[Callable[[Dict], None]] = None,
+    discovery: Optional[SkillDiscovery] = None,
+) -> Tuple[Counter, Dict]:
+    """
+    Returns (skill name -> postings mentioning it, stats). With workers <= 1
+    everything runs in this process (using ``nlp`` if given). ``progress``
+    is called with the running stats every JOB_POSTINGS_PROGRESS_SECONDS.
+    Unknown n-grams are merged into ``discovery`` when one is given.
+    """
+    started = time.perf_counter()
+    stats = {"postings": 0, "chunks": 0, "skipped": 0, "workers": max(1, workers)}
+    mentions = Counter()
+    # Builds the matcher cache once, so workers (or this process) just read it
+    nlp = nlp or load_nlp()
+    matcher, _ = load_skill_matcher(nlp, terms)
+    matcher = with_fuzzy(matcher, build_fuzzy_index(terms))
+    chunks = _chunks(iter_postings(path, stats), chunk_size)
+    last_report = started
+    discover = discovery is not None
+
+    def record(chunk_counts: Counter, ngrams: Optional[Counter], postings: int):
+        nonlocal last_report
+        mentions.update(chunk_counts)
+        if ngrams is not None:
+            discovery.merge_chunk(ngrams)
+        stats["postings"] += postings
+        stats["chunks"] += 1
+        now = time.perf_counter()
+        if progress is not None and now - last_report >= JOB_POSTINGS_PROGRESS_SECONDS:
+            last_report = now
+            progress(_finish(dict(stats), started))
+
+    if workers <= 1:
+        for chunk in chunks:
+            record(*count_chunk(nlp, matcher, chunk, discover), len(chunk))
+        return mentions, _finish(stats, started)
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker, initargs=(terms, discover)) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    record(*future.result())
+            pending.add(pool.submit(_count_in_worker, chunk))
+        for future in pending:
+            record(*future.result())
+    return mentions, _finish(stats, started)
+
+
+def _finish(stats: Dict, started: float) -> Dict:
+    seconds = time.perf_counter() - started
+    stats["seconds"] = round(seconds, 3)
+    stats["postings_per_second"] = round(stats["postings"] / seconds, 1) if seconds else 0.0
+    return stats
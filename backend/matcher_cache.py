@@ -0,0 +1,99 @@
+"""
+On-disk cache of the compiled skill matcher patterns.
+
+Pattern docs are tokenized in batches with nlp.tokenizer.pipe and saved as a
+DocBin, keyed by a hash of the matcher terms plus the spaCy and model
+versions. A restart with an unchanged ontology loads the docs from disk
+instead of re-tokenizing every skill name and alias.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import spacy
+import srsly
+from spacy.tokens import DocBin
+
+from extraction import matcher_from_docs, tokenize_skill_terms
+
+ROOT_DIR = Path(__file__).parent
+MATCHER_CACHE_DIR = Path(os.environ.get('MATCHER_CACHE_DIR', ROOT_DIR / '.matcher_cache'))
+CACHE_FILE_PREFIX = "skill_matcher-"
+
+logger = logging.getLogger(__name__)
+
+
+def terms_fingerprint(nlp, terms: List[Tuple[str, List[str]]]) -> str:
+    """Changes whenever the patterns, spaCy or the model would tokenize differently"""
+    payload = {
+        "terms": terms,
+        "spacy": spacy.__version__,
+        "model": [nlp.meta.get('name'), nlp.meta.get('version')],
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _cache_path(cache_dir: Path, fingerprint: str) -> Path:
+    return cache_dir / f"{CACHE_FILE_PREFIX}{fingerprint[:32]}.msgpack"
+
+
+def _read_cache(nlp, path: Path, fingerprint: str):
+    data = srsly.read_msgpack(path)
+    if data.get("fingerprint") != fingerprint:
+        return None
+    docs = DocBin().from_bytes(data["docs"]).get_docs(nlp.vocab)
+    return matcher_from_docs(nlp, data["labels"], docs), len(data["labels"])
+
+
+def _write_cache(path: Path, fingerprint: str, labels: List[str], docs) -> None:
+    doc_bin = DocBin(attrs=["ORTH"], docs=docs)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    srsly.write_msgpack(tmp_path, {"fingerprint": fingerprint, "labels": labels, "docs": doc_bin.to_bytes()})
+    os.replace(tmp_path, path)  # Atomic, so concurrent workers never read half a file
+    for stale in path.parent.glob(f"{CACHE_FILE_PREFIX}*.msgpack"):
+        if stale != path:
+            stale.unlink(missing_ok=True)
+
+
+def load_skill_matcher(nlp, terms: List[Tuple[str, List[str]]], cache_dir: Path = MATCHER_CACHE_DIR):
+    """
+    Returns (matcher, info). info["source"] is "cache" when the patterns came
+    from disk and "built" when they had to be tokenized.
+    """
+    started = time.perf_counter()
+    fingerprint = terms_fingerprint(nlp, terms)
+    path = _cache_path(cache_dir, fingerprint)
+
+    cached = None
+    if path.exists():
+        try:
+            cached = _read_cache(nlp, path, fingerprint)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable matcher cache {path}: {e}")
+
+    if cached is not None:
+        matcher, pattern_count = cached
+        source = "cache"
+    else:
+        labels, docs = tokenize_skill_terms(nlp, terms)
+        matcher = matcher_from_docs(nlp, labels, docs)
+        pattern_count = len(labels)
+        source = "built"
+        try:
+            _write_cache(path, fingerprint, labels, docs)
+        except OSError as e:
+            logger.warning(f"Could not write matcher cache {path}: {e}")
+
+    info: Dict = {
+        "fingerprint": fingerprint,
+        "source": source,
+        "patterns": pattern_count,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+    return matcher, info
@@ -0,0 +1,152 @@
+"""
+Precomputed /api/ontology response bodies.
+
+The ontology only changes when a new snapshot is published, so each view of
+it (full, names only, a page of a large catalog) is serialized once per
+snapshot, hashed for its ETag and compressed at most once per encoding.
+Requests then just pick the cached bytes, or answer 304 when the client
+already holds them.
+"""
+import gzip
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional; gzip is always available
+    brotli = None
+
+ONTOLOGY_FIELDS = ("full", "names")
+MAX_CACHED_VIEWS = 64
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+ViewKey = Tuple[str, int, Optional[int]]
+
+
+def _compress(encoding: str, body: bytes) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)  # mtime=0 keeps the bytes deterministic
+
+
+def pick_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Best encoding the client accepts, ignoring q-values other than q=0"""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(name.lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    base = etag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        candidate = candidate.removeprefix("W/").strip('"')
+        # Encoded variants carry a suffix; any of them validates the same content
+        if candidate == base or candidate.split("-", 1)[0] == base:
+            return True
+    return False
+
+
+class _View:
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.encoded: Dict[str, bytes] = {}
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+    def encode(self, encoding: Optional[str]) -> Tuple[bytes, str]:
+        """(bytes, ETag) for one encoding; compresses on first use only"""
+        if encoding is None:
+            return self.body, self.etag_for(None)
+        if encoding not in self.encoded:
+            self.encoded[encoding] = _compress(encoding, self.body)
+        return self.encoded[encoding], self.etag_for(encoding)
+
+
+def build_view(ontology: Dict, fields: str, offset: int, limit: Optional[int]) -> Dict:
+    skill_names = list(ontology['skills'])
+    job_roles = ontology['job_roles']
+    paged = offset > 0 or limit is not None
+    if paged:
+        end = None if limit is None else offset + limit
+        skill_names = skill_names[offset:end]
+        job_roles = job_roles[offset:end]
+
+    if fields == "names":
+        view = {"skills": skill_names, "job_roles": [role.get('title') for role in job_roles]}
+    elif paged:
+        view = {"skills": {name: ontology['skills'][name] for name in skill_names}, "job_roles": job_roles}
+    else:
+        view = ontology
+
+    if paged:
+        view = dict(view, page={
+            "offset": offset,
+            "limit": limit,
+            "total_skills": len(ontology['skills']),
+            "total_job_roles": len(ontology['job_roles']),
+        })
+    return view
+
+
+def render_view(ontology: Dict, key: ViewKey) -> _View:
+    """Serialize one view (blocking; json.dumps of the whole catalog for "full")"""
+    view = build_view(ontology, *key)
+    return _View(json.dumps(view, ensure_ascii=False, separators=(",", ":"), default=str).encode('utf-8'))
+
+
+class OntologyResponseCache:
+    """
+    Rendered views of the current snapshot. Views of an older snapshot are
+    dropped the first time a newer snapshot is looked up.
+    """
+
+    def __init__(self, max_views: int = MAX_CACHED_VIEWS):
+        self.max_views = max_views
+        self._snapshot = None
+        self._views: "OrderedDict[ViewKey, _View]" = OrderedDict()
+        self.counters = {"builds": 0, "hits": 0, "not_modified": 0, "resets": 0}
+
+    def get(self, snapshot, key: ViewKey) -> Optional[_View]:
+        if snapshot is not self._snapshot:
+            self._snapshot = snapshot
+            self._views.clear()
+            self.counters["resets"] += 1
+            return None
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+            self.counters["hits"] += 1
+        return view
+
+    def put(self, snapshot, key: ViewKey, view: _View) -> None:
+        if snapshot is not self._snapshot:
+            return  # Rendered from a snapshot that has since been replaced
+        self._views[key] = view
+        while len(self._views) > self.max_views:
+            self._views.popitem(last=False)
+        self.counters["builds"] += 1
+
+    def stats(self) -> Dict:
+        return {
+            **self.counters,
+            "views": len(self._views),
+            "bytes": sum(len(view.body) + sum(map(len, view.encoded.values())) for view in self._views.values()),
+            "brotli": brotli is not None,
+        }
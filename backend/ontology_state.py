@@ -0,0 +1,149 @@
+"""
+Versioned, immutable ontology snapshots.
+
+Everything derived from the ontology (skills, job roles, the skill matcher
+and the scoring engine) lives on one OntologySnapshot. Requests read the
+current snapshot once and use it throughout; a reload or an admin approval
+builds a new snapshot and publishes it with a single assignment, so
+in-flight requests never see a half-built ontology.
+
+Approvals are applied as deltas instead of full reloads:
+- a new skill's patterns go into a small delta matcher that runs next to
+  the untouched base matcher;
+- a new role is compiled on its own and appended to the scoring engine.
+Once the delta reaches ONTOLOGY_DELTA_COMPACT_AT skills it is folded into
+a fresh base matcher.
+
+The matcher is wrapped with the typo-tolerant second stage
+(fuzzy_matcher.py). Its index is built alongside the base matcher, and
+delta skills are layered on top of it the same way.
+
+The role-similarity graph (role_graph.py) depends only on the job roles:
+skill approvals reuse it, and role approvals extend it.
+"""
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+from extraction import CombinedMatcher, build_skill_matcher, skill_terms
+from fuzzy_matcher import FuzzySkillIndex, build_fuzzy_index, fuzzy_signature, with_fuzzy
+from matcher_cache import load_skill_matcher
+from role_graph import RoleGraph
+from scoring_engine import ScoringEngine
+
+ONTOLOGY_DELTA_COMPACT_AT = int(os.environ.get('ONTOLOGY_DELTA_COMPACT_AT', 50))
+
+Terms = List[Tuple[str, List[str]]]
+
+
+class OntologySnapshot:
+    def __init__(
+        self,
+        version: int,
+        skills: Dict[str, Dict],
+        job_roles: List[Dict],
+        engine: ScoringEngine,
+        base_matcher=None,
+        base_terms: Optional[Terms] = None,
+        matcher_info: Optional[Dict] = None,
+        delta_terms: Optional[Terms] = None,
+        delta_matcher=None,
+        base_fuzzy: Optional[FuzzySkillIndex] = None,
+        role_graph: Optional[RoleGraph] = None,
+    ):
+        self.version = version
+        self.ontology = {"skills": skills, "job_roles": job_roles}
+        self.engine = engine
+        self.base_matcher = base_matcher
+        self.base_terms = base_terms or []
+        self.matcher_info = matcher_info or {}
+        self.delta_terms = delta_terms or []
+        self.delta_matcher = delta_matcher
+        self.base_fuzzy = base_fuzzy
+        self.role_graph = role_graph
+
+        if delta_matcher is not None:
+            exact = CombinedMatcher(base_matcher, delta_matcher)
+        else:
+            exact = base_matcher
+        fuzzy = base_fuzzy.extended(self.delta_terms) if base_fuzzy is not None and self.delta_terms else base_fuzzy
+        self.matcher = with_fuzzy(exact, fuzzy) if exact is not None else None
+
+        # Content key for extraction results: changes whenever the matcher would
+        base_fingerprint = self.matcher_info.get('fingerprint', '')
+        if self.delta_terms or base_fuzzy is not None:
+            signature = fuzzy_signature() if base_fuzzy is not None else None
+            encoded = json.dumps([base_fingerprint, self.delta_terms, signature], ensure_ascii=False).encode('utf-8')
+            self.fingerprint = hashlib.sha256(encoded).hexdigest()
+        else:
+            self.fingerprint = base_fingerprint
+
+    @classmethod
+    def empty(cls) -> "OntologySnapshot":
+        return cls(0, {}, [], ScoringEngine([]))
+
+    @classmethod
+    def build(cls, version: int, nlp, skills: Dict[str, Dict], job_roles: List[Dict]) -> "OntologySnapshot":
+        """Full build (blocking; run it in a thread). The matcher comes from the disk cache when possible."""
+        terms = skill_terms(skills)
+        matcher, matcher_info = load_skill_matcher(nlp, terms)
+        engine = ScoringEngine(job_roles)
+        return cls(
+            version, skills, job_roles, engine, matcher, terms, matcher_info,
+            base_fuzzy=build_fuzzy_index(terms), role_graph=RoleGraph(engine),
+        )
+
+    @property
+    def skills(self) -> Dict[str, Dict]:
+        return self.ontology['skills']
+
+    @property
+    def job_roles(self) -> List[Dict]:
+        return self.ontology['job_roles']
+
+    @property
+    def is_ready(self) -> bool:
+        return self.matcher is not None
+
+    def with_skill(self, nlp, skill_name: str, skill_data: Dict) -> "OntologySnapshot":
+        """New snapshot with one skill added (or replaced). Blocking; run it in a thread."""
+        skills = dict(self.skills)
+        skills[skill_name] = skill_data
+        if len(self.delta_terms) + 1 >= ONTOLOGY_DELTA_COMPACT_AT:
+            return OntologySnapshot.build(self.version + 1, nlp, skills, self.job_roles)
+
+        delta_terms = [entry for entry in self.delta_terms if entry[0] != skill_name]
+        delta_terms += skill_terms({skill_name: skill_data})
+        return OntologySnapshot(
+            self.version + 1, skills, self.job_roles, self.engine,
+            self.base_matcher, self.base_terms, self.matcher_info,
+            delta_terms, build_skill_matcher(nlp, delta_terms), self.base_fuzzy, self.role_graph,
+        )
+
+    def with_role(self, job_role: Dict) -> "OntologySnapshot":
+        """
+        New snapshot with one role appended; only that role is compiled and
+        added to the role graph. Blocking; run it in a thread.
+        """
+        engine = self.engine.extended([job_role])
+        snapshot = OntologySnapshot(
+            self.version + 1, self.skills, engine.job_roles, engine,
+            self.base_matcher, self.base_terms, self.matcher_info,
+            self.delta_terms, self.delta_matcher, self.base_fuzzy,
+            self.role_graph.extended(engine) if self.role_graph is not None else RoleGraph(engine),
+        )
+        snapshot.matcher = self.matcher  # Same patterns; keeps the fuzzy lookup cache warm
+        return snapshot
+
+    def stats(self) -> Dict:
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "skills": len(self.skills),
+            "job_roles": len(self.job_roles),
+            "delta_skills": len(self.delta_terms),
+            "matcher": self.matcher_info,
+            "fuzzy": fuzzy_signature() if self.base_fuzzy is not None else None,
+            "role_graph": self.role_graph.stats() if self.role_graph is not None else None,
+        }
@@ -0,0 +1,137 @@
+"""
+Keeps every uvicorn worker on the same ontology version.
+
+Every ontology mutation bumps a version document in Mongo
+(ontology_meta/_id "ontology"). Each worker follows that document with a
+change stream where the deployment supports one (replica sets, Atlas) and
+otherwise polls it with a cheap find_one on _id. When the stored version
+is ahead of the one this worker loaded, the worker is marked stale and
+reloads lazily, on the next request that reads the ontology.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument
+
+META_COLLECTION = "ontology_meta"
+VERSION_DOC_ID = "ontology"
+ONTOLOGY_SYNC_INTERVAL = float(os.environ.get('ONTOLOGY_SYNC_INTERVAL', 5.0))  # Seconds between polls
+ONTOLOGY_SYNC_MODE = os.environ.get('ONTOLOGY_SYNC_MODE', 'auto')  # "auto" (watch, else poll), "poll" or "off"
+
+logger = logging.getLogger(__name__)
+
+
+async def bump_ontology_version(collection) -> int:
+    """Record an ontology mutation; returns the new version"""
+    doc = await collection.find_one_and_update(
+        {"_id": VERSION_DOC_ID},
+        {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return doc["version"]
+
+
+async def read_ontology_version(collection) -> int:
+    doc = await collection.find_one({"_id": VERSION_DOC_ID}, {"version": 1})
+    return doc["version"] if doc else 0
+
+
+class OntologyVersionSync:
+    def __init__(self, collection, interval: float = ONTOLOGY_SYNC_INTERVAL, mode: str = ONTOLOGY_SYNC_MODE):
+        self.collection = collection
+        self.interval = interval
+        self.mode = mode
+        self.loaded_version: Optional[int] = None  # DB version this worker's ontology reflects
+        self.latest_version: Optional[int] = None  # Newest DB version this worker has seen
+        self.checks = 0
+        self.last_checked_at: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def stale(self) -> bool:
+        if self.latest_version is None or self.loaded_version is None:
+            return False
+        return self.latest_version > self.loaded_version
+
+    def _observe(self, version: Optional[int]) -> None:
+        if version is not None and (self.latest_version is None or version > self.latest_version):
+            self.latest_version = version
+
+    def mark_loaded(self, version: int) -> None:
+        """The ontology now reflects at least ``version`` (read before the load started)"""
+        self.loaded_version = version
+        self._observe(version)
+
+    async def record_local_change(self) -> int:
+        """
+        Bump the DB version after this worker applied a mutation itself. If no
+        other worker changed anything in between, this worker stays current;
+        otherwise it goes stale and reloads.
+        """
+        version = await bump_ontology_version(self.collection)
+        if self.loaded_version is not None and version == self.loaded_version + 1:
+            self.loaded_version = version
+        self._observe(version)
+        return version
+
+    async def read_version(self) -> int:
+        return await read_ontology_version(self.collection)
+
+    async def check(self) -> bool:
+        """One poll; returns True when this worker is behind"""
+        self._observe(await self.read_version())
+        self.checks += 1
+        self.last_checked_at = datetime.now(timezone.utc).isoformat()
+        return self.stale
+
+    async def _watch(self) -> None:
+        pipeline = [{"$match": {"documentKey._id": VERSION_DOC_ID}}]
+        async with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+            self.mode = "watch"
+            logger.info("Following ontology version with a change stream")
+            async for change in stream:
+                self._observe((change.get("fullDocument") or {}).get("version"))
+
+    async def _run(self) -> None:
+        if self.mode == "auto":
+            try:
+                await self.check()  # Anything that changed before the stream opened
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.info(f"Change streams unavailable ({e}); polling ontology version every {self.interval}s")
+        self.mode = "poll"
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.warning(f"Ontology version check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self.mode != "off" and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict:
+        return {
+            "mode": self.mode,
+            "loaded_version": self.loaded_version,
+            "latest_version": self.latest_version,
+            "stale": self.stale,
+            "checks": self.checks,
+            "last_checked_at": self.last_checked_at,
+        }
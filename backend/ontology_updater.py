@@ -1,4 +1,4 @@
-import json
+import argparse
 import random
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -7,6 +7,13 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 import uuid # Import uuid at the top
+from pymongo import InsertOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError
+from db_indexes import PENDING_UPDATE_INDEXES, ensure_collection_indexes
+from extraction import skill_terms
+from job_postings import count_skill_mentions
+from skill_sketch import SKILL_DISCOVERY_MAX_CANDIDATES, SkillDiscovery
+from ontology_sync import META_COLLECTION, bump_ontology_version
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -15,32 +22,60 @@ load_dotenv(ROOT_DIR / '.env')
 SKILL_DEPRECIATION_RATE = 10  # How much to lower frequency if not seen
 SKILL_FLAG_THRESHOLD = 100   # Frequency below which a skill is flagged for review
 DATE_FLAG_THRESHOLD_DAYS = 180 # Days old after which a skill is flagged
+DEFAULT_SEEN_FREQUENCY = 900   # Starting frequency for a seen skill that has none
+DEFAULT_UNSEEN_FREQUENCY = 100 # ... and for an unseen one
+
+# Local job-postings corpus (.jsonl/.csv, optionally .gz). Without one the
+# market data is simulated.
+JOB_POSTINGS_PATH = os.environ.get('JOB_POSTINGS_PATH')
+# Mine the corpus for unknown terms and propose them as skills (see skill_sketch.py)
+SKILL_DISCOVERY = os.environ.get('SKILL_DISCOVERY', '1').lower() in ('1', 'true', 'yes')
+
+SKILLS_COLLECTION = "ontology_skills"
+JOBS_COLLECTION = "ontology_job_roles"
+
+DUPLICATE_KEY_ERROR = 11000
+
+async def ensure_pending_update_indexes(collection):
+    # Unique indexes make re-runs and racing runs idempotent
+    for name in await ensure_collection_indexes(collection, PENDING_UPDATE_INDEXES):
+        print(f"! Could not create index {name} on pending updates")
 
 class OntologyUpdater:
-    def __init__(self):
-        self.ontology_path = ROOT_DIR / 'ontology.json'
-        # MongoDB connection for pending updates
+    def __init__(self, postings_path=JOB_POSTINGS_PATH, discover=SKILL_DISCOVERY):
+        self.postings_path = postings_path
+        self.discover = discover
+        # MongoDB connection: the ontology collections and pending updates
         mongo_url = os.environ.get('MONGO_URL', "mongodb://localhost:27017")
         db_name = os.environ.get('DB_NAME', "test_database")
         self.client = AsyncIOMotorClient(mongo_url)
         self.db = self.client[db_name]
+        self.pending_ops = [] # Inserts queued for one bulk_write per run
+        self.stats = {
+            "candidates": 0,     # Skills, roles and obsolete flags considered
+            "queries": 0,        # Existence-check round trips
+            "queued_inserts": 0,
+            "bulk_writes": 0,
+            "inserted": 0,
+            "duplicates": 0,     # Rejected by the unique indexes (raced another run)
+            "skills_seen": 0,    # Frequency raised, last_seen_in_market set to today
+            "skills_depreciated": 0,
+            "postings": 0,       # Job postings ingested
+        }
         
-    def load_ontology(self):
-        """Load current ontology"""
-        with open(self.ontology_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    
-    def save_ontology(self, ontology):
-        """Save updated ontology"""
-        with open(self.ontology_path, 'w', encoding='utf-8') as f:
-            json.dump(ontology, f, indent=2, ensure_ascii=False)
+    async def load_ontology(self):
+        """Skill names and role titles from MongoDB (all the existence checks need)"""
+        skill_names, role_titles = await asyncio.gather(
+            self.db[SKILLS_COLLECTION].distinct("_id"),
+            self.db[JOBS_COLLECTION].distinct("title"),
+        )
+        return {"skills": set(skill_names), "job_roles": [{"title": title} for title in role_titles]}
     
     async def simulate_job_market_scraping(self, current_ontology):
         """
         Simulates scraping job portals.
         - Discovers new skills/roles.
-        - Updates frequencies of existing skills.
-        - Reduces frequency of unseen skills.
+        - Reports which existing skills were seen, and how often.
         """
         print("[SIMULATED] Scraping LinkedIn, Indeed for 'Junior', 'Entry-Level' roles...")
         
@@ -84,20 +119,10 @@ class OntologyUpdater:
         ]
         
         # We deliberately "don't see" our obsolete test skill: "Angular"
-        
-        print("\n--- Updating Skill Frequencies ---")
-        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        updated_skills = current_ontology['skills']
-        
-        for skill_name, skill_data in updated_skills.items():
-            if skill_name in simulated_seen_skills:
-                # Skill was seen, increase frequency and update date
-                skill_data["mention_frequency"] = skill_data.get("mention_frequency", 900) + random.randint(50, 150)
-                skill_data["last_seen_in_market"] = today
-            else:
-                # Skill was NOT seen, depreciate its frequency
-                skill_data["mention_frequency"] = max(0, skill_data.get("mention_frequency", 100) - SKILL_DEPRECIATION_RATE)
-                print(f"-> Depreciating unseen skill: {skill_name}")
+        mentions = {
+            skill_name: random.randint(50, 150)
+            for skill_name in simulated_seen_skills if skill_name in current_ontology['skills']
+        }
 
         # --- 3. DECIDE WHAT NEW ITEMS TO PROPOSE ---
         selected_skills = random.sample(potential_skills, 1)
@@ -106,100 +131,212 @@ class OntologyUpdater:
         return {
             "new_skills": selected_skills,
             "new_roles": selected_roles,
-            "updated_skills_ontology": updated_skills # Return the entire updated skills block
+            "seen_skills": mentions # skill name -> new mentions this week
         }
+
+    async def ingest_job_postings(self, path):
+        """
+        Count skill mentions over the corpus at 'path'. Returns (skill name ->
+        postings mentioning it, discovered skill candidates or None).
+        """
+        print(f"\n--- Ingesting Job Postings from {path} ---")
+        skills = {doc["_id"]: doc async for doc in self.db[SKILLS_COLLECTION].find({}, {"aliases": 1})}
+        discovery = SkillDiscovery() if self.discover else None
+
+        def report(stats):
+            print(f"... {stats['postings']} postings ({stats['postings_per_second']} postings/s)", flush=True)
+
+        mentions, stats = await asyncio.to_thread(
+            count_skill_mentions, path, skill_terms(skills), progress=report, discovery=discovery
+        )
+        self.stats["postings"] = stats["postings"]
+        print(
+            f"-> {stats['postings']} postings in {stats['seconds']}s ({stats['postings_per_second']} postings/s, "
+            f"{stats['workers']} workers), {stats['skipped']} skipped, {len(mentions)} skills mentioned"
+        )
+        if discovery is None:
+            return dict(mentions), None
+        return dict(mentions), await self.discovered_skills(discovery, stats["postings"])
+
+    async def discovered_skills(self, discovery, postings):
+        """
+        Sketch candidates above the threshold, as pending-skill data. Names
+        already proposed (pending, approved or rejected) are skipped before
+        the per-run limit, so a rejected term does not come back every week.
+        """
+        candidates = discovery.candidates(postings, limit=None)
+        proposed = await self.existing_pending_values("data.name", {candidate["name"] for candidate in candidates})
+        candidates = [candidate for candidate in candidates if candidate["name"] not in proposed][:SKILL_DISCOVERY_MAX_CANDIDATES]
+        print(f"-> {len(candidates)} emerging skill candidate(s) (sketch {discovery.memory_bytes() // 1024} KB)")
+        return [
+            {
+                "name": candidate["name"],
+                "type": "Discovered",
+                "aliases": [],
+                "learning_resources": [],
+                "discovery_reason": (
+                    f"Found in ~{candidate['estimated_postings']} of {postings} job postings "
+                    f"({candidate['share']:.1%}) without matching any current skill"
+                ),
+                "confidence": candidate["confidence"],
+            }
+            for candidate in candidates
+        ]
+
+    async def update_skill_frequencies(self, seen_skills):
+        """
+        Apply this week's market data to ontology_skills in one ordered
+        bulk_write: seen skills get $inc'd and today's last_seen_in_market,
+        every other skill is depreciated by SKILL_DEPRECIATION_RATE (not
+        below 0). Skills without a frequency start from the defaults.
+        """
+        print("\n--- Updating Skill Frequencies ---")
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        seen = list(seen_skills)
+        no_frequency = {"mention_frequency": {"$exists": False}}
+        ops = [
+            UpdateMany({"_id": {"$in": seen}, **no_frequency}, {"$set": {"mention_frequency": DEFAULT_SEEN_FREQUENCY}}),
+            UpdateMany({"_id": {"$nin": seen}, **no_frequency}, {"$set": {"mention_frequency": DEFAULT_UNSEEN_FREQUENCY}}),
+        ]
+        ops += [
+            UpdateOne({"_id": skill_name}, {"$inc": {"mention_frequency": mentions}, "$set": {"last_seen_in_market": today}})
+            for skill_name, mentions in seen_skills.items()
+        ]
+        ops += [
+            UpdateMany({"_id": {"$nin": seen}}, {"$inc": {"mention_frequency": -SKILL_DEPRECIATION_RATE}}),
+            UpdateMany({"mention_frequency": {"$lt": 0}}, {"$set": {"mention_frequency": 0}}),
+        ]
+        result = await self.db[SKILLS_COLLECTION].bulk_write(ops, ordered=True)
+        self.stats["bulk_writes"] += 1
+
+        depreciated = len(self.current_ontology['skills']) - len(seen_skills) # seen_skills only names existing ones
+        self.stats["skills_seen"] = len(seen_skills)
+        self.stats["skills_depreciated"] = depreciated
+        print(f"-> {len(seen_skills)} skills seen, {depreciated} unseen skills depreciated ({result.modified_count} updates)")
     
+    async def existing_pending_values(self, field, values, extra_filter=None):
+        """Which of 'values' already appear in 'field' of a pending_ontology_updates doc (one $in query)"""
+        if not values:
+            return set()
+        query = {field: {"$in": list(values)}, **(extra_filter or {})}
+        self.stats["queries"] += 1
+        docs = await self.db.pending_ontology_updates.find(query, {"_id": 0, field: 1}).to_list(None)
+        key = field.split(".")[-1]
+        return {doc["data"][key] for doc in docs}
+
+    def queue_pending_update(self, update_type, data, timestamp, **extra):
+        self.pending_ops.append(InsertOne({
+            "id": str(uuid.uuid4()),
+            "type": update_type,
+            "data": data,
+            "status": "pending",
+            **extra,
+            "discovered_at": timestamp,
+            "reviewed_at": None,
+            "reviewed_by": None
+        }))
+        self.stats["queued_inserts"] += 1
+
     async def store_pending_updates(self, discoveries):
         """
-        Store discovered skills/roles in DB as pending (awaiting admin approval)
+        Store discovered skills/roles in DB as pending (awaiting admin approval).
+        Existence is checked with one query per type; the inserts are queued
+        for write_pending_updates().
         """
         timestamp = datetime.now(timezone.utc).isoformat()
+        new_skills, new_roles = discoveries['new_skills'], discoveries['new_roles']
+        self.stats["candidates"] += len(new_skills) + len(new_roles)
         
-        for skill in discoveries['new_skills']:
-            # Check if skill already exists or is pending
-            existing = await self.db.pending_ontology_updates.find_one({"data.name": skill['name']})
-            if not existing and skill['name'] not in self.current_ontology['skills']:
-                await self.db.pending_ontology_updates.insert_one({
-                    "id": str(uuid.uuid4()),
-                    "type": "skill",
-                    "data": skill,
-                    "status": "pending",
-                    "discovered_at": timestamp,
-                    "reviewed_at": None,
-                    "reviewed_by": None
-                })
+        # Check if skills already exist or are pending
+        pending_names = await self.existing_pending_values("data.name", {skill['name'] for skill in new_skills})
+        for skill in new_skills:
+            if skill['name'] not in pending_names and skill['name'] not in self.current_ontology['skills']:
+                self.queue_pending_update("skill", skill, timestamp)
+                pending_names.add(skill['name']) # Same name twice in one run
                 print(f"✓ Added pending skill: {skill['name']}")
             else:
                 print(f"i Skill '{skill['name']}' already exists or is pending review.")
 
-        
-        for role in discoveries['new_roles']:
-            # Check if role already exists or is pending
-            existing = await self.db.pending_ontology_updates.find_one({"data.title": role['title']})
-            existing_in_ontology = any(r['title'] == role['title'] for r in self.current_ontology['job_roles'])
-            
-            if not existing and not existing_in_ontology:
-                await self.db.pending_ontology_updates.insert_one({
-                    "id": str(uuid.uuid4()),
-                    "type": "role",
-                    "data": role,
-                    "status": "pending",
-                    "discovered_at": timestamp,
-                    "reviewed_at": None,
-                    "reviewed_by": None
-                })
+        # Check if roles already exist or are pending
+        pending_titles = await self.existing_pending_values("data.title", {role['title'] for role in new_roles})
+        pending_titles.update(r['title'] for r in self.current_ontology['job_roles'])
+        for role in new_roles:
+            if role['title'] not in pending_titles:
+                self.queue_pending_update("role", role, timestamp)
+                pending_titles.add(role['title'])
                 print(f"✓ Added pending role: {role['title']}")
             else:
                 print(f"i Role '{role['title']}' already exists or is pending review.")
 
-    async def check_for_obsolete_skills(self, updated_skills_ontology):
+    async def check_for_obsolete_skills(self):
         """
         Check for obsolete skills and flag them for review in MongoDB.
+        One aggregation returns only the skills that fail a check; both
+        fields are indexed, and YYYY-MM-DD dates compare as strings.
         """
         print("\n--- Checking for Obsolete Skills ---")
         today = datetime.now(timezone.utc)
-        
-        for skill_name, skill_data in updated_skills_ontology.items():
+        cutoff = (today - timedelta(days=DATE_FLAG_THRESHOLD_DAYS)).strftime("%Y-%m-%d")
+        self.stats["queries"] += 1
+        obsolete = await self.db[SKILLS_COLLECTION].aggregate([
+            {"$match": {"$or": [
+                {"mention_frequency": {"$lt": SKILL_FLAG_THRESHOLD}},
+                {"last_seen_in_market": {"$lt": cutoff}},
+            ]}},
+            {"$project": {"mention_frequency": 1, "last_seen_in_market": 1}},
+        ]).to_list(None)
+
+        flags = {} # skill name -> first reason it was flagged for
+        for skill in obsolete:
+            skill_name, frequency = skill["_id"], skill.get("mention_frequency")
             # Check 1: Low mention frequency
-            if skill_data.get("mention_frequency", 1000) < SKILL_FLAG_THRESHOLD:
-                flag_reason = f"Mention frequency ({skill_data.get('mention_frequency')}) is below threshold ({SKILL_FLAG_THRESHOLD})."
+            if frequency is not None and frequency < SKILL_FLAG_THRESHOLD:
                 print(f"! FLAGGING Obsolete Skill (Frequency): {skill_name}")
-                await self.flag_skill_for_review(skill_name, flag_reason)
-
+                flags[skill_name] = f"Mention frequency ({frequency}) is below threshold ({SKILL_FLAG_THRESHOLD})."
             # Check 2: Not seen recently
-            last_seen_str = skill_data.get("last_seen_in_market", today.strftime("%Y-%m-%d"))
-            last_seen_date = datetime.strptime(last_seen_str, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-            days_since_seen = (today - last_seen_date).days
-            
-            if days_since_seen > DATE_FLAG_THRESHOLD_DAYS:
-                flag_reason = f"Not seen in market for {days_since_seen} days (Threshold: {DATE_FLAG_THRESHOLD_DAYS})."
+            else:
+                last_seen_date = datetime.strptime(skill["last_seen_in_market"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+                days_since_seen = (today - last_seen_date).days
                 print(f"! FLAGGING Obsolete Skill (Date): {skill_name}")
-                await self.flag_skill_for_review(skill_name, flag_reason)
+                flags[skill_name] = f"Not seen in market for {days_since_seen} days (Threshold: {DATE_FLAG_THRESHOLD_DAYS})."
+
+        await self.flag_skills_for_review(flags)
 
     async def flag_skill_for_review(self, skill_name, reason):
         """
         Adds a skill to the pending updates list for 'review_obsolete'
         """
+        await self.flag_skills_for_review({skill_name: reason})
+
+    async def flag_skills_for_review(self, flags):
+        """flag_skill_for_review for many skills: one existence query, inserts queued"""
+        self.stats["candidates"] += len(flags)
         timestamp = datetime.now(timezone.utc).isoformat()
         
-        # Check if already pending review
-        existing = await self.db.pending_ontology_updates.find_one({
-            "type": "review_obsolete",
-            "data.name": skill_name,
-            "status": "pending"
-        })
-        
-        if not existing:
-            await self.db.pending_ontology_updates.insert_one({
-                "id": str(uuid.uuid4()),
-                "type": "review_obsolete",
-                "data": {"name": skill_name},
-                "status": "pending",
-                "discovery_reason": reason,
-                "discovered_at": timestamp,
-                "reviewed_at": None,
-                "reviewed_by": None
-            })
+        # Check which are already pending review
+        already_pending = await self.existing_pending_values(
+            "data.name", flags.keys(), {"type": "review_obsolete", "status": "pending"}
+        )
+        for skill_name, reason in flags.items():
+            if skill_name not in already_pending:
+                self.queue_pending_update("review_obsolete", {"name": skill_name}, timestamp, discovery_reason=reason)
+
+    async def write_pending_updates(self):
+        """Write every queued insert in one unordered bulk_write"""
+        if not self.pending_ops:
+            return
+        ops, self.pending_ops = self.pending_ops, []
+        self.stats["bulk_writes"] += 1
+        try:
+            result = await self.db.pending_ontology_updates.bulk_write(ops, ordered=False)
+            self.stats["inserted"] += result.inserted_count
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            duplicates = sum(1 for error in errors if error.get("code") == DUPLICATE_KEY_ERROR)
+            self.stats["inserted"] += e.details.get("nInserted", 0)
+            self.stats["duplicates"] += duplicates
+            if duplicates != len(errors):
+                raise
     
     async def run_weekly_update(self):
         """
@@ -212,31 +349,50 @@ class OntologyUpdater:
         
         try:
             # Load current ontology
-            self.current_ontology = self.load_ontology()
+            self.current_ontology = await self.load_ontology()
             
-            # Simulate scraping
-            discoveries = await self.simulate_job_market_scraping(self.current_ontology)
+            if self.postings_path:
+                # A real corpus: its mention counts and mined candidates only, so
+                # no invented skills or roles reach admin review
+                seen_skills, new_skills = await self.ingest_job_postings(self.postings_path)
+                discoveries = {"seen_skills": seen_skills, "new_skills": new_skills or [], "new_roles": []}
+            else:
+                # Simulate scraping
+                discoveries = await self.simulate_job_market_scraping(self.current_ontology)
             
-            # Save the updated skill frequencies back to the file
-            self.current_ontology['skills'] = discoveries['updated_skills_ontology']
-            self.save_ontology(self.current_ontology)
-            print("\n✓ Updated skill frequencies saved to ontology.json.")
+            # Apply the new frequencies in MongoDB, then tell the servers to reload
+            await self.update_skill_frequencies(discoveries['seen_skills'])
+            db_version = await bump_ontology_version(self.db[META_COLLECTION])
+            print(f"\n✓ Updated skill frequencies in MongoDB (ontology version {db_version}).")
             
             # Store NEWLY discovered items for admin review
             await self.store_pending_updates(discoveries)
             
             # Check for any skills that are now obsolete
-            await self.check_for_obsolete_skills(discoveries['updated_skills_ontology'])
+            await self.check_for_obsolete_skills()
+            
+            # One round trip for every insert above
+            await ensure_pending_update_indexes(self.db.pending_ontology_updates)
+            await self.write_pending_updates()
             
             print("\n" + "="*60)
             print("✓ Update complete! Pending admin review in dashboard.")
+            print(
+                f"  {self.stats['candidates']} candidates, {self.stats['queries']} queries, "
+                f"{self.stats['bulk_writes']} bulk write(s): {self.stats['inserted']} inserted, "
+                f"{self.stats['duplicates']} duplicates skipped"
+            )
             print("="*60 + "\n")
             
         except Exception as e:
             print(f"\n✗ Error during update: {str(e)}")
+            raise  # A non-zero exit marks the update job as failed
         finally:
             self.client.close()
 
 if __name__ == "__main__":
-    updater = OntologyUpdater()
+    parser = argparse.ArgumentParser(description="Weekly ontology update")
+    parser.add_argument("--postings", default=JOB_POSTINGS_PATH, help="Job postings corpus (.jsonl/.csv, optionally .gz)")
+    args = parser.parse_args()
+    updater = OntologyUpdater(postings_path=args.postings)
     asyncio.run(updater.run_weekly_update())
\ No newline at end of file
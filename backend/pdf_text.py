@@ -0,0 +1,106 @@
+"""
+Page-by-page PDF text extraction with caps on pages and characters.
+
+Only depends on PyMuPDF, so the processes used for parallel page
+extraction start without importing spaCy.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+# Caps on how much of one PDF is read. Skills show up in the first pages of
+# a resume; a 300-page portfolio should not cost 300 pages of parsing.
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 50))
+PDF_MAX_TEXT_CHARS = int(os.environ.get('PDF_MAX_TEXT_CHARS', 500_000))
+# PDFs with at least this many pages are split across processes (0 = never).
+# PyMuPDF is not thread-safe, so parallel pages need separate processes.
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 0))
+PDF_PARALLEL_WORKERS = int(os.environ.get('PDF_PARALLEL_WORKERS', 4))
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()  # extract_pdf runs on several threads at once
+
+
+def iter_pdf_pages(doc, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+    """Text of each page in [start, stop), one page in memory at a time"""
+    stop = doc.page_count if stop is None else min(stop, doc.page_count)
+    for page_number in range(start, stop):
+        yield doc.load_page(page_number).get_text()
+
+
+def _read_pages(pages: Iterable[str], max_chars: int) -> Tuple[List[str], int, bool]:
+    """Collect page texts until max_chars; returns (chunks, pages read, truncated)"""
+    chunks, chars, pages_read = [], 0, 0
+    for page_text in pages:
+        pages_read += 1
+        if chars + len(page_text) > max_chars:
+            chunks.append(page_text[:max_chars - chars])
+            return chunks, pages_read, True
+        chunks.append(page_text)
+        chars += len(page_text)
+    return chunks, pages_read, False
+
+
+def _extract_page_range(file_bytes: bytes, start: int, stop: int, max_chars: int) -> Tuple[List[str], int, bool]:
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        return _read_pages(iter_pdf_pages(doc, start, stop), max_chars)
+
+
+def _parallel_pages(file_bytes: bytes, page_count: int, max_chars: int, workers: int):
+    global _page_pool
+    with _page_pool_lock:
+        if _page_pool is None:
+            _page_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        pool = _page_pool
+    step = -(-page_count // workers)
+    futures = [
+        pool.submit(_extract_page_range, file_bytes, start, min(start + step, page_count), max_chars)
+        for start in range(0, page_count, step)
+    ]
+    # Ranges come back in page order; the char cap is applied across them
+    return _read_pages((page for future in futures for page in future.result()[0]), max_chars)
+
+
+def extract_pdf(
+    file_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    max_chars: int = PDF_MAX_TEXT_CHARS,
+    parallel_min_pages: int = PDF_PARALLEL_MIN_PAGES,
+    parallel_workers: int = PDF_PARALLEL_WORKERS,
+) -> Tuple[str, Dict]:
+    """
+    Returns (text, info). Pages are read one at a time and stop at
+    ``max_pages`` pages or ``max_chars`` characters, whichever comes first.
+    """
+    started = time.perf_counter()
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        pages_to_read = min(page_count, max_pages)
+        if parallel_min_pages and pages_to_read >= parallel_min_pages and parallel_workers > 1:
+            chunks, pages_read, truncated = _parallel_pages(file_bytes, pages_to_read, max_chars, parallel_workers)
+        else:
+            chunks, pages_read, truncated = _read_pages(iter_pdf_pages(doc, 0, pages_to_read), max_chars)
+
+    text = "".join(chunks)
+    seconds = time.perf_counter() - started
+    return text, {
+        "pages": page_count,
+        "pages_read": pages_read,
+        "truncated": truncated or pages_read < page_count,
+        "chars": len(text),
+        "seconds": seconds,
+        "seconds_per_page": seconds / pages_read if pages_read else 0.0,
+    }
+
+
+def shutdown_page_pool() -> None:
+    global _page_pool
+    with _page_pool_lock:
+        pool, _page_pool = _page_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+"""
+Preload-before-fork serving. One master process loads the spaCy model and
+builds the ontology snapshot, then forks the web workers. The workers share
+those pages copy-on-write instead of each loading its own copy.
+
+    cd backend
+    python prefork.py --workers 4 --port 8000
+
+The master reads the ontology with pymongo before any event loop exists. It
+imports server.py so that FastAPI, the routes and their models are shared
+too. It freezes the garbage collector before forking, so collections in the
+workers never write to the preloaded objects. Each worker runs uvicorn on
+the master's listening socket. Its warm-up adopts the preloaded model and
+snapshot, unless the ontology version moved on after the master read it.
+In that case the worker loads normally.
+
+A worker's private memory is the state it builds itself (caches, the
+candidate index, snapshots from later ontology changes) plus the pages its
+reference counting writes to. numpy arrays such as the scoring engine and
+role graph are never written, so they stay shared. process_memory() reads
+RSS, PSS and private bytes from /proc, and /api/diagnostics reports it for
+each worker.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Union
+
+PREFORK_WORKERS = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))
+WORKER_MIN_UPTIME = 5.0  # Seconds; a worker dying sooner means it cannot start, so do not respawn it
+SMAPS_FIELDS = {
+    "Rss": "rss_bytes",
+    "Pss": "pss_bytes",
+    "Private_Clean": "private_bytes",
+    "Private_Dirty": "private_bytes",
+    "Shared_Clean": "shared_bytes",
+    "Shared_Dirty": "shared_bytes",
+}
+
+logger = logging.getLogger(__name__)
+
+
+def process_memory(pid: Union[int, str] = "self") -> Dict[str, int]:
+    """
+    Resident bytes of a process, split into shared and private pages. PSS
+    charges each shared page to its sharers in equal parts. Empty where
+    /proc/<pid>/smaps_rollup does not exist (non-Linux).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            lines = f.readlines()
+    except OSError:
+        return {}
+    memory = dict.fromkeys(SMAPS_FIELDS.values(), 0)
+    for line in lines:
+        parts = line.split()
+        field = SMAPS_FIELDS.get(parts[0].rstrip(":")) if parts else None
+        if field is not None:
+            memory[field] += int(parts[1]) * 1024  # Reported in kB
+    return memory
+
+
+def preload():
+    """Import server.py and hand it a model and snapshot built in this process"""
+    from pymongo import MongoClient
+
+    import server
+    from extraction import load_nlp
+    from ontology_state import OntologySnapshot
+    from ontology_sync import META_COLLECTION, VERSION_DOC_ID
+
+    started = time.perf_counter()
+    client = MongoClient(server.mongo_url)
+    try:
+        db = client[os.environ['DB_NAME']]
+        version_doc = db[META_COLLECTION].find_one({"_id": VERSION_DOC_ID}, {"version": 1})
+        skills = {
+            doc.pop('_id'): doc
+            for doc in db[server.SKILLS_COLLECTION].find({}, batch_size=server.ONTOLOGY_LOAD_BATCH_SIZE)
+        }
+        job_roles = list(db[server.JOBS_COLLECTION].find({}, {"_id": 0}, batch_size=server.ONTOLOGY_LOAD_BATCH_SIZE))
+    finally:
+        client.close()  # No sockets or monitor threads may cross the fork
+
+    server.nlp = load_nlp()
+    snapshot = OntologySnapshot.build(1, server.nlp, skills, job_roles)
+    server.preloaded = (version_doc["version"] if version_doc else 0, snapshot)
+    logger.info(
+        f"Preloaded {len(skills)} skills and {len(job_roles)} job roles in {time.perf_counter() - started:.2f}s "
+        f"({process_memory().get('rss_bytes', 0) / 2**20:.0f} MB resident)"
+    )
+    return server.app
+
+
+def listen(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, log_level: str) -> None:
+    import uvicorn
+
+    gc.enable()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level)).run(sockets=[sock])
+
+
+def serve(app, sock: socket.socket, workers: int, log_level: str) -> int:
+    """Fork ``workers`` workers and keep that many running until SIGTERM/SIGINT"""
+    gc.freeze()  # Everything allocated so far is left alone by the workers' collections
+    children: Dict[int, float] = {}  # pid -> start time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                run_worker(app, sock, log_level)
+                status = 0
+            finally:
+                os._exit(status)
+        children[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(workers):
+        spawn()
+    logger.info(f"Started {workers} workers: {', '.join(map(str, children))}")
+
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        if time.monotonic() - started < WORKER_MIN_UPTIME:
+            logger.error(f"Worker {pid} exited during startup (status {status}); shutting down")
+            exit_code = 1
+            stop(signal.SIGTERM, None)
+        else:
+            logger.warning(f"Worker {pid} exited (status {status}); starting a replacement")
+            spawn()
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get('PORT', 8000)))
+    parser.add_argument("--workers", type=int, default=PREFORK_WORKERS)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    gc.disable()  # Until the fork, so no collection reshuffles the objects being preloaded
+    app = preload()
+    sys.exit(serve(app, listen(args.host, args.port), args.workers, args.log_level))
+
+
+if __name__ == "__main__":
+    main()
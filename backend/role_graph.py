@@ -0,0 +1,320 @@
+"""
+Precomputed role-to-role transition graph, for "next step" career advice.
+
+Moving from role A to role B means learning B's skills that A does not
+use. The cost of that edge is their total weight in B's skill_weights
+(B's max total minus the weight A already covers), and its similarity is
+the covered share of B. Pair weights come from the scoring engine's COO
+entries through an inverted skill -> roles index, so only roles that
+share a skill are ever compared.
+
+A skill listed by more than ROLE_GRAPH_MAX_SKILL_ROLES roles ("Git",
+"Communication") links too many roles to tell any of them apart, and
+walking its postings for every role would make the build quadratic. Such
+skills do not make two roles candidates on their own, but they still count
+towards the covered weight of candidates found through other skills.
+
+Each role keeps its ROLE_GRAPH_NEIGHBORS most similar roles, stored
+CSR-style: one offsets array plus flat neighbor, similarity and cost
+arrays. Nearest-role queries are a slice of those arrays. A role approval
+goes through extended(), which computes the new role's row and merges the
+new role into the rows of the roles it shares skills with.
+
+Path queries run Dijkstra over the edges with at least
+ROLE_GRAPH_MIN_SIMILARITY. What a path adds is a route between roles too
+far apart for one realistic move, through stepping-stone roles. When no
+such route exists, the direct move is returned and flagged. Results are
+cached, since a graph never changes once built.
+
+Edge costs are not a metric: a skill is charged at the weight of the step
+that adds it, and never again. If a stepping stone weights a skill lower
+than the target does (B={x: 0.1} on the way to C={x: 1.0}), the path costs
+less than the direct move. So a path's total_missing_weight is the weight
+of what each move adds, measured in the role that move leads to. It can be
+below direct_missing_weight, the gap of moving straight to the target.
+"""
+import copy
+import heapq
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scoring_engine import ScoringEngine
+
+ROLE_GRAPH_NEIGHBORS = int(os.environ.get('ROLE_GRAPH_NEIGHBORS', 10))
+ROLE_GRAPH_MIN_SIMILARITY = float(os.environ.get('ROLE_GRAPH_MIN_SIMILARITY', 0.3))  # Share of the target already covered
+ROLE_GRAPH_MAX_SKILL_ROLES = int(os.environ.get('ROLE_GRAPH_MAX_SKILL_ROLES', 256))  # Commoner skills link no roles
+ROLE_PATH_CACHE_SIZE = 4096
+ROLE_SHIFT = 32  # (role, skill) pair key: role << ROLE_SHIFT | skill column
+
+
+def _pair_keys(roles: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return (roles.astype(np.int64) << ROLE_SHIFT) | cols.astype(np.int64)
+
+
+class RoleGraph:
+    def __init__(
+        self,
+        engine: ScoringEngine,
+        neighbors: int = ROLE_GRAPH_NEIGHBORS,
+        min_similarity: float = ROLE_GRAPH_MIN_SIMILARITY,
+        max_skill_roles: int = ROLE_GRAPH_MAX_SKILL_ROLES,
+    ):
+        self.neighbors_per_role = neighbors
+        self.min_similarity = min_similarity
+        self.max_skill_roles = max_skill_roles
+        self._paths: Dict[Tuple[int, int], Dict] = {}
+        self.role_ids: Dict[str, int] = {}
+        self._set_roles(engine, 0)
+
+        self._keys = np.empty(0, dtype=np.int64)  # Sorted, unique (role, skill) keys
+        self._key_weights = np.empty(0)
+        self._skill_ptr = np.zeros(len(self.skill_names) + 1, dtype=np.int64)
+        self._skill_roles = np.empty(0, dtype=np.int64)  # Inverted index, grouped by skill
+        self._skill_weights = np.empty(0)
+        self._add_entries(engine.rows, engine.cols, engine.weights)
+
+        self._set_rows([self._top(*self._edges(*self._candidates(role_idx))) for role_idx in range(engine.num_roles)])
+
+    def _set_roles(self, engine: ScoringEngine, first_new: int) -> None:
+        """Take the engine's roles; those from ``first_new`` on are not in role_ids yet"""
+        self.job_roles = engine.job_roles
+        self.max_total = engine.max_total
+        self.skill_names = [None] * len(engine.skill_index)
+        for name, col in engine.skill_index.items():
+            self.skill_names[col] = name
+        self.role_ids = dict(self.role_ids)
+        for role_idx in range(first_new, len(engine.job_roles)):
+            self.role_ids.setdefault(engine.job_roles[role_idx]['title'].lower(), role_idx)
+
+    def _add_entries(self, rows: np.ndarray, cols: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Index COO entries of roles after every role indexed so far. Both
+        arrays grow by appending or inserting, never by re-sorting everything.
+        """
+        keys, inverse = np.unique(_pair_keys(rows, cols), return_inverse=True)
+        summed = np.bincount(inverse.ravel(), weights=weights, minlength=keys.size)  # Duplicate skills add up
+        self._keys = np.concatenate([self._keys, keys])
+        self._key_weights = np.concatenate([self._key_weights, summed])
+
+        new_rows, new_cols = keys >> ROLE_SHIFT, keys & ((1 << ROLE_SHIFT) - 1)
+        num_skills = len(self.skill_names)
+        ptr = np.concatenate([self._skill_ptr, np.full(num_skills + 1 - self._skill_ptr.size, self._skill_ptr[-1])])
+        # New roles come after every indexed role, so each entry goes at the end of its skill's run
+        by_skill = np.argsort(new_cols, kind='stable')
+        positions = ptr[new_cols[by_skill] + 1]
+        self._skill_roles = np.insert(self._skill_roles, positions, new_rows[by_skill])
+        self._skill_weights = np.insert(self._skill_weights, positions, summed[by_skill])
+        added = np.bincount(new_cols, minlength=num_skills)
+        self._skill_ptr = ptr + np.concatenate([[0], np.cumsum(added)])
+
+    def _entries(self, role_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """A role's skill columns and weights"""
+        start, end = np.searchsorted(self._keys, [role_idx << ROLE_SHIFT, (role_idx + 1) << ROLE_SHIFT])
+        return self._keys[start:end] & ((1 << ROLE_SHIFT) - 1), self._key_weights[start:end]
+
+    def _has(self, roles: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """roles x cols: whether each role lists each skill"""
+        keys = _pair_keys(roles[:, None], cols[None, :])
+        positions = np.minimum(np.searchsorted(self._keys, keys), self._keys.size - 1)
+        return self._keys[positions] == keys
+
+    def _candidates(self, role_idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Roles sharing a linking skill with role_idx, and how much of each one's weight it covers"""
+        own_cols, _ = self._entries(role_idx)
+        counts = self._skill_ptr[own_cols + 1] - self._skill_ptr[own_cols]
+        linking, common = own_cols[counts <= self.max_skill_roles], own_cols[counts > self.max_skill_roles]
+        lengths = counts[counts <= self.max_skill_roles]
+        if not lengths.sum():
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Every posting of the linking skills, without a Python loop over them
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        postings = np.arange(lengths.sum()) + np.repeat(self._skill_ptr[linking] - offsets, lengths)
+        others, inverse = np.unique(self._skill_roles[postings], return_inverse=True)
+        covered = np.bincount(inverse, weights=self._skill_weights[postings], minlength=others.size)
+        for col in common:
+            start = self._skill_ptr[col]
+            holders = self._skill_roles[start:self._skill_ptr[col + 1]]
+            found = np.searchsorted(holders, others)  # Postings of a skill are in role order
+            found_in = found < holders.size
+            found_in[found_in] &= holders[found[found_in]] == others[found_in]
+            covered[found_in] += self._skill_weights[start + found[found_in]]
+        keep = (others != role_idx) & (self.max_total[others] > 0)
+        return others[keep], covered[keep]
+
+    def _edges(self, targets: np.ndarray, covered: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(targets, similarity, cost) of edges to ``targets``, given the weight of each one already covered"""
+        similarity = covered / self.max_total[targets] if targets.size else np.empty(0)
+        return targets, similarity, np.maximum(self.max_total[targets] - covered, 0.0)
+
+    def _top(self, targets: np.ndarray, similarity: np.ndarray, cost: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """The best ``neighbors_per_role`` of these edges"""
+        order = np.lexsort((targets, cost, -similarity))[:self.neighbors_per_role]
+        return targets[order], similarity[order], cost[order]
+
+    def _set_rows(self, rows: List[Tuple[np.ndarray, np.ndarray, np.ndarray]], lengths: Optional[np.ndarray] = None) -> None:
+        """CSR arrays from per-role rows, or from runs of rows with ``lengths`` giving each role's length"""
+        if lengths is None:
+            lengths = np.asarray([len(row[0]) for row in rows], dtype=np.int64)
+        self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        self.neighbors = np.concatenate([row[0] for row in rows]).astype(np.int64) if rows else np.empty(0, dtype=np.int64)
+        self.similarity = np.concatenate([row[1] for row in rows]) if rows else np.empty(0)
+        self.cost = np.concatenate([row[2] for row in rows]) if rows else np.empty(0)
+
+    def _rows(self, first: int, last: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Edges of roles first..last-1, concatenated"""
+        start, end = self.indptr[first], self.indptr[last]
+        return self.neighbors[start:end], self.similarity[start:end], self.cost[start:end]
+
+    def _row(self, role_idx: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._rows(role_idx, role_idx + 1)
+
+    def extended(self, engine: ScoringEngine) -> "RoleGraph":
+        """
+        Graph for ``engine``, which must be this graph's engine with roles
+        appended (ScoringEngine.extended). Only the new roles' rows are
+        computed; existing rows change only where a new role makes their top
+        neighbors.
+        """
+        first = len(self.job_roles)
+        graph = copy.copy(self)
+        graph._paths = {}
+        graph._set_roles(engine, first)
+        start = np.searchsorted(engine.rows, first)
+        graph._add_entries(engine.rows[start:], engine.cols[start:], engine.weights[start:])
+
+        changed: Dict[int, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}  # Existing rows a new role entered
+        new_rows = []
+        for role_idx in range(first, engine.num_roles):
+            others, covered = graph._candidates(role_idx)
+            new_rows.append(graph._top(*graph._edges(others, covered)))
+            if graph.max_total[role_idx] <= 0:
+                continue
+            # The reverse edges: how much of the new role each existing neighbor covers
+            sources = others[others < first]
+            new_cols, new_weights = graph._entries(role_idx)
+            reverse_covered = graph._has(sources, new_cols).astype(np.float64) @ new_weights
+            new_edges = graph._edges(np.full(sources.size, role_idx), reverse_covered)
+            for position, source in enumerate(sources.tolist()):
+                changed[source] = graph._top(*(
+                    np.append(existing, added[position])
+                    for existing, added in zip(changed.get(source) or self._row(source), new_edges)
+                ))
+
+        # Unchanged runs of rows are copied as whole slices
+        runs, previous = [], 0
+        lengths = np.diff(self.indptr)
+        for source in sorted(changed):
+            runs += [self._rows(previous, source), changed[source]]
+            lengths[source] = len(changed[source][0])
+            previous = source + 1
+        runs.append(self._rows(previous, first))
+        lengths = np.concatenate([lengths, [len(row[0]) for row in new_rows]]).astype(np.int64)
+        graph._set_rows(runs + new_rows, lengths)
+        return graph
+
+    @property
+    def num_edges(self) -> int:
+        return int(self.neighbors.size)
+
+    def role_id(self, title: str) -> int:
+        """Role position for a title (case-insensitive); KeyError if unknown"""
+        return self.role_ids[title.lower()]
+
+    def _missing(self, from_idx: int, to_idx: int) -> Tuple[float, List[str]]:
+        """Weight and names of to_idx's skills that from_idx lacks"""
+        have = set(self._entries(from_idx)[0].tolist())
+        weight, names = 0.0, []
+        for col, skill_weight in zip(*(part.tolist() for part in self._entries(to_idx))):
+            if col not in have:
+                weight += skill_weight
+                names.append(self.skill_names[col])
+        return weight, names
+
+    def nearest(self, title: str, limit: int = ROLE_GRAPH_NEIGHBORS) -> List[Dict]:
+        neighbors, similarities, costs = self._row(self.role_id(title))
+        return [
+            {
+                "title": self.job_roles[neighbor]['title'],
+                "similarity": round(similarity * 100, 1),
+                "missing_weight": round(cost, 3),
+            }
+            for neighbor, similarity, cost in zip(
+                neighbors[:limit].tolist(), similarities[:limit].tolist(), costs[:limit].tolist()
+            )
+        ]
+
+    def _shortest(self, source: int, target: int) -> Tuple[float, Optional[List[int]]]:
+        distances = {source: 0.0}
+        previous: Dict[int, int] = {}
+        heap = [(0.0, source)]
+        while heap:
+            distance, node = heapq.heappop(heap)
+            if node == target:
+                path = [target]
+                while path[-1] != source:
+                    path.append(previous[path[-1]])
+                return distance, path[::-1]
+            if distance > distances[node]:
+                continue
+            for neighbor, similarity, cost in zip(*(part.tolist() for part in self._row(node))):
+                if similarity < self.min_similarity:
+                    continue
+                candidate = distance + cost
+                if candidate < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = candidate
+                    previous[neighbor] = node
+                    heapq.heappush(heap, (candidate, neighbor))
+        return float('inf'), None
+
+    def path(self, from_title: str, to_title: str) -> Dict:
+        """
+        The cheapest sequence of realistic moves from one role to another,
+        with the missing-skill weight (and skills) of every step. Without
+        one, the direct move is returned with "direct": True.
+        direct_missing_weight is always the gap of the one-step move.
+        """
+        key = (self.role_id(from_title), self.role_id(to_title))
+        cached = self._paths.get(key)
+        if cached is not None:
+            return cached
+
+        source, target = key
+        _, hops = self._shortest(source, target)
+        direct = hops is None
+        if direct:
+            hops = [source, target]
+
+        direct_weight, _ = self._missing(source, target)
+        steps, total = [], 0.0
+        for from_idx, to_idx in zip(hops[:-1], hops[1:]):
+            weight, skills = self._missing(from_idx, to_idx)
+            total += weight
+            steps.append({
+                "from": self.job_roles[from_idx]['title'],
+                "to": self.job_roles[to_idx]['title'],
+                "missing_weight": round(weight, 3),
+                "missing_skills": skills,
+            })
+        result = {
+            "path": [self.job_roles[idx]['title'] for idx in hops],
+            "steps": steps,
+            "total_missing_weight": round(total, 3),
+            "direct_missing_weight": round(direct_weight, 3),
+            "direct": direct,
+        }
+        if len(self._paths) >= ROLE_PATH_CACHE_SIZE:
+            self._paths.clear()
+        self._paths[key] = result
+        return result
+
+    def stats(self) -> Dict:
+        counts = np.diff(self._skill_ptr)
+        return {
+            "roles": len(self.job_roles),
+            "edges": self.num_edges,
+            "common_skills": int((counts > self.max_skill_roles).sum()),
+            "cached_paths": len(self._paths),
+        }
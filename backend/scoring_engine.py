@@ -0,0 +1,144 @@
+"""
+Compiled role-scoring engine.
+
+Flattens every job role's ``skill_weights`` into a sparse role x skill weight
+matrix (COO layout: one entry per role/skill pair) plus a core mask, so a
+resume can be scored against the whole catalog in a single NumPy pass instead
+of calling ``calculate_weighted_match`` once per role.
+
+The per-role sums are accumulated with ``np.bincount`` in the same order as
+``skill_weights``, so the raw scores are bit-for-bit what the Python loop
+produces.
+
+Engines are never mutated once built: ``extended`` compiles only the new
+roles and returns a new engine, so readers can keep using the old one.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_SKILL_WEIGHT = 0.5  # Same default as calculate_weighted_match
+CORE_BLEND_WEIGHT = 0.7
+TOTAL_BLEND_WEIGHT = 0.3
+
+
+class _CompiledRoles:
+    """COO entries for a run of roles starting at row ``offset``"""
+
+    def __init__(self, job_roles: List[Dict], skill_index: Dict[str, int], offset: int):
+        rows, cols, weights, core = [], [], [], []
+        experience_rows: Dict[Optional[str], List[int]] = {}
+
+        for role_idx, role in enumerate(job_roles, start=offset):
+            experience_rows.setdefault(role.get('experience_level'), []).append(role_idx)
+            for skill_weight in role.get('skill_weights', []):
+                col = skill_index.setdefault(skill_weight['skill'], len(skill_index))
+                rows.append(role_idx)
+                cols.append(col)
+                weights.append(skill_weight.get('weight', DEFAULT_SKILL_WEIGHT))
+                core.append(bool(skill_weight.get('is_core', False)))
+
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.core_mask = np.asarray(core, dtype=bool)
+        self.core_weights = np.where(self.core_mask, self.weights, 0.0)
+
+        local_rows, count = self.rows - offset, len(job_roles)
+        self.max_total = np.bincount(local_rows, weights=self.weights, minlength=count)
+        self.max_core = np.bincount(local_rows, weights=self.core_weights, minlength=count)
+        self.experience_rows = {
+            level: np.asarray(indices, dtype=np.int64)
+            for level, indices in experience_rows.items()
+        }
+
+
+class ScoringEngine:
+    def __init__(self, job_roles: List[Dict]):
+        self.job_roles = job_roles
+        self.skill_index: Dict[str, int] = {}
+        self._set_compiled(_CompiledRoles(job_roles, self.skill_index, 0))
+
+    def _set_compiled(self, compiled: _CompiledRoles) -> None:
+        self.num_roles = len(self.job_roles)
+        self.rows = compiled.rows
+        self.cols = compiled.cols
+        self.weights = compiled.weights
+        self.core_mask = compiled.core_mask
+        self.core_weights = compiled.core_weights
+        self.max_total = compiled.max_total
+        self.max_core = compiled.max_core
+        self.experience_rows = compiled.experience_rows
+
+    def extended(self, new_roles: List[Dict]) -> "ScoringEngine":
+        """A new engine with ``new_roles`` appended; only those roles are compiled"""
+        engine = ScoringEngine.__new__(ScoringEngine)
+        engine.job_roles = self.job_roles + list(new_roles)
+        engine.skill_index = dict(self.skill_index)
+        added = _CompiledRoles(new_roles, engine.skill_index, self.num_roles)
+
+        merged = _CompiledRoles([], {}, 0)
+        for attr in ("rows", "cols", "weights", "core_mask", "core_weights", "max_total", "max_core"):
+            setattr(merged, attr, np.concatenate([getattr(self, attr), getattr(added, attr)]))
+        merged.experience_rows = dict(self.experience_rows)
+        for level, indices in added.experience_rows.items():
+            existing = merged.experience_rows.get(level)
+            merged.experience_rows[level] = indices if existing is None else np.concatenate([existing, indices])
+
+        engine._set_compiled(merged)
+        return engine
+
+    @property
+    def num_entries(self) -> int:
+        return int(self.weights.shape[0])
+
+    def user_vector(self, user_skills: Sequence[str]) -> np.ndarray:
+        """Boolean vector over the engine's skill columns."""
+        vector = np.zeros(len(self.skill_index), dtype=bool)
+        for skill_name in user_skills:
+            col = self.skill_index.get(skill_name)
+            if col is not None:
+                vector[col] = True
+        return vector
+
+    def score(self, user_skills: Sequence[str]) -> Dict[str, np.ndarray]:
+        """
+        Score every role at once. Returns unrounded percentage arrays indexed
+        by role position, using the same formulas as calculate_weighted_match.
+        """
+        hits = self.user_vector(user_skills)[self.cols]
+        total_score = np.bincount(self.rows, weights=np.where(hits, self.weights, 0.0), minlength=self.num_roles)
+        core_score = np.bincount(self.rows, weights=np.where(hits, self.core_weights, 0.0), minlength=self.num_roles)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            total_pct = np.where(self.max_total > 0, total_score / self.max_total * 100, 0.0)
+            core_pct = np.where(self.max_core > 0, core_score / self.max_core * 100, 100.0)
+
+        return {
+            "match_score": (core_pct * CORE_BLEND_WEIGHT) + (total_pct * TOTAL_BLEND_WEIGHT),
+            "core_match_score": core_pct,
+            "total_match_score": total_pct,
+        }
+
+    def rank(self, user_skills: Sequence[str], experience: Optional[str] = None, limit: int = 10) -> List[int]:
+        """
+        Indices of the best ``limit`` roles, ordered like the old
+        sort-by-rounded-match_score (ties keep catalog order).
+        """
+        if experience:
+            candidates = self.experience_rows.get(experience, np.empty(0, dtype=np.int64))
+        else:
+            candidates = np.arange(self.num_roles, dtype=np.int64)
+        if limit <= 0 or candidates.size == 0:
+            return []
+
+        match = np.round(self.score(user_skills)["match_score"], 1)[candidates]
+
+        if candidates.size > limit:
+            top = np.argpartition(-match, limit - 1)[:limit]
+            # Keep everything tied with the cutoff so catalog order decides
+            keep = match >= match[top].min()
+            candidates, match = candidates[keep], match[keep]
+
+        order = np.lexsort((candidates, -match))[:limit]
+        return candidates[order].tolist()
@@ -1,5 +1,6 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Form
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Form, Query, Request, Response
 from dotenv import load_dotenv
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
@@ -8,14 +9,34 @@ from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Dict, Optional
 import uuid
+import asyncio
+import time
 from datetime import datetime, timezone
 import json
-import fitz  # PyMuPDF
-from docx import Document
-import spacy
-from spacy.matcher import PhraseMatcher
-import io
-import subprocess
+import zipfile
+import base64
+from functools import partial
+from contextlib import asynccontextmanager
+from extraction import (
+    BATCH_UPLOAD_MAX_EXPANDED_BYTES, BATCH_UPLOAD_MAX_FILE_BYTES, BATCH_UPLOAD_MAX_FILES, SUPPORTED_EXTENSIONS,
+    expand_zip, zip_resume_bytes, extract_text_with_info, load_nlp, match_skills, match_skills_batch,
+)
+from extraction_pool import ExtractionPool
+from ontology_state import OntologySnapshot
+from ontology_sync import META_COLLECTION, OntologyVersionSync
+from ontology_response import ONTOLOGY_FIELDS, OntologyResponseCache, etag_matches, pick_encoding, render_view
+from write_behind import WriteBehindQueue
+from db_indexes import ensure_indexes
+from update_jobs import UPDATE_JOBS_COLLECTION, JobAlreadyRunning, UpdateJobRunner
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Counter, Gauge, Histogram, Registry, StageTimer
+from analysis_cache import ANALYSIS_CACHE_MONGO, CACHE_COLLECTION, AnalysisCache, content_key
+from candidate_index import CandidateIndex, SkillIds
+from role_graph import ROLE_GRAPH_NEIGHBORS, RoleGraph
+from prefork import process_memory
+from upload_limits import (
+    UPLOAD_BATCH_MAX_BYTES, UPLOAD_MAX_BYTES, AdmissionGate, BudgetedStreamingResponse, ByteBudget, Overloaded,
+    UploadTooLarge, declared_too_large, read_limited,
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -26,21 +47,63 @@ JOBS_COLLECTION = "ontology_job_roles"
 PENDING_COLLECTION = "pending_ontology_updates"
 ANALYSIS_COLLECTION = "resume_analyses"
 
+# Documents per cursor batch when streaming the ontology collections
+ONTOLOGY_LOAD_BATCH_SIZE = int(os.environ.get('ONTOLOGY_LOAD_BATCH_SIZE', 5000))
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_sm")
-
 # Create the main app
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
-# Global variables for ontology
-ontology = {"skills": {}, "job_roles": []} # Will be populated from DB
-skill_matcher = PhraseMatcher(nlp.vocab, attr="LOWER") # Will be populated from DB
+# spaCy model, loaded at startup rather than on import
+# (tokenizer-only unless SKILL_EXTRACTION_MODE=full)
+nlp = None
+nlp_lock = asyncio.Lock()
+
+# Global variables for ontology. 'snapshot' holds everything derived from
+# the ontology (matcher, scoring engine) and is only ever replaced whole, by
+# publish_snapshot(); 'ontology' is the snapshot's skills/job_roles dict.
+snapshot = OntologySnapshot.empty() # Will be populated from DB
+ontology = snapshot.ontology
+ontology_write_lock = asyncio.Lock() # Serializes reloads and deltas
+ontology_sync = OntologyVersionSync(db[META_COLLECTION]) # Cross-worker version tracking
+reload_task = None
+warmup_task = None
+warmup_error = None
+extraction_pool = ExtractionPool() # Parses resumes off the event loop
+analysis_cache = AnalysisCache(collection=db[CACHE_COLLECTION] if ANALYSIS_CACHE_MONGO else None)
+ontology_load_stats = {} # Timings and counts from the last load_ontology_from_db
+ontology_responses = OntologyResponseCache() # Serialized /api/ontology bodies for the live snapshot
+analysis_writer = WriteBehindQueue(db[ANALYSIS_COLLECTION]) # Batches resume_analyses inserts off the request path
+update_jobs = UpdateJobRunner(db[UPDATE_JOBS_COLLECTION], db[META_COLLECTION], ROOT_DIR / 'ontology_updater.py')
+upload_gate = AdmissionGate() # Caps how many uploads are read and parsed at once
+batch_budget = ByteBudget() # Caps the batch upload bytes this worker holds in memory
+skill_ids = SkillIds() # Permanent skill -> bit positions for stored analyses
+candidate_index = CandidateIndex(skill_ids) # Stored analyses as skill bitsets, for role searches
+candidate_index_task = None
+preloaded = None # (DB version, snapshot) built by prefork.py before forking this worker
+
+# Prometheus metrics for this worker, served on /metrics
+metrics = Registry()
+stage_seconds = metrics.register(Histogram(
+    "nextstep_stage_seconds", "Seconds spent in each stage of an operation", ("operation", "stage")
+))
+uploads_in_flight = metrics.register(Gauge("nextstep_uploads_in_flight", "Resume upload requests being processed"))
+metrics.register(Gauge("nextstep_ontology_skills", "Skills in the live ontology", lambda: len(snapshot.skills)))
+metrics.register(Gauge("nextstep_ontology_job_roles", "Job roles in the live ontology", lambda: len(snapshot.job_roles)))
+metrics.register(Gauge("nextstep_matcher_patterns", "Phrase patterns in the live skill matcher", lambda: matcher_pattern_count(snapshot)))
+metrics.register(Gauge("nextstep_analysis_writer_depth", "Analyses queued for the write-behind insert", lambda: analysis_writer.depth))
+metrics.register(Gauge("nextstep_candidate_index_analyses", "Stored analyses in the candidate index", lambda: len(candidate_index)))
+metrics.register(Gauge("nextstep_upload_slots_in_use", "Uploads holding a parse slot", lambda: upload_gate.in_use))
+metrics.register(Gauge("nextstep_upload_slots_waiting", "Uploads waiting for a parse slot", lambda: upload_gate.waiting))
+metrics.register(Gauge("nextstep_batch_upload_bytes", "Batch upload bytes held in memory", lambda: batch_budget.in_use))
+upload_rejections = metrics.register(Counter(
+    "nextstep_upload_rejections_total", "Uploads turned away before parsing", ("reason",)
+))
 
 # --- NEW: Load ontology from MongoDB at startup ---
 async def load_ontology_from_db():
@@ -48,46 +111,161 @@ async def load_ontology_from_db():
     Loads skills and job roles from MongoDB into the global 'ontology' var
     and builds the spaCy PhraseMatcher.
     """
-    global ontology, skill_matcher
+    global ontology_load_stats
     print("Loading ontology from MongoDB Atlas...")
-    
-    # 1. Load Skills
-    skills_cursor = db[SKILLS_COLLECTION].find({}, {"_id": 1}) # _id is the skill name
-    skills_data = {}
-    async for skill_doc in skills_cursor:
-        # The document itself is the skill data, _id is the name
-        skill_name = skill_doc['_id']
-        # Fetch the full skill data (excluding _id)
-        full_skill_data = await db[SKILLS_COLLECTION].find_one({"_id": skill_name}, {"_id": 0})
-        skills_data[skill_name] = full_skill_data
+    timer = StageTimer(stage_seconds, "load_ontology")
+    try:
+        with timer.stage("nlp"):
+            await ensure_nlp()
+        async with ontology_write_lock:
+            started = time.perf_counter()
+            # Read the version first: anything bumped during the load makes us stale again
+            with timer.stage("version_read"):
+                db_version = await ontology_sync.read_version()
+            preloaded_snapshot = take_preloaded(db_version)
         
-    ontology['skills'] = skills_data
-    
-    # 2. Load Job Roles
-    job_roles_cursor = db[JOBS_COLLECTION].find({}, {"_id": 0}) # Exclude mongo _id
-    job_roles_list = await job_roles_cursor.to_list(length=1000)
-    ontology['job_roles'] = job_roles_list
-
-    # 3. Build Phrase Matcher
-    skill_matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
-    patterns = []
-    
-    for skill_name, skill_data in ontology['skills'].items():
-        patterns.append((skill_name, [nlp(skill_name.lower())]))
-        for alias in skill_data.get('aliases', []):
-            patterns.append((skill_name, [nlp(alias.lower())]))
-    
-    for skill_name, skill_patterns in patterns:
-        skill_matcher.add(skill_name, skill_patterns)
-    
-    logging.info(f"Loaded ontology from DB: {len(ontology['skills'])} skills and {len(ontology['job_roles'])} job roles")
+            # 1 + 2. Stream both collections concurrently, one batched cursor each
+            with timer.stage("fetch"):
+                if preloaded_snapshot is not None:
+                    skills_data, job_roles_list = preloaded_snapshot.skills, preloaded_snapshot.job_roles
+                else:
+                    skills_data, job_roles_list = await asyncio.gather(fetch_skills(), fetch_job_roles())
+            fetched = time.perf_counter()
+            with timer.stage("skill_ids"):
+                await skill_ids.sync(db[META_COLLECTION], skills_data)
+        
+            # 3. Build Phrase Matcher (from the on-disk cache when the skills are
+            #    unchanged) and scoring engine, then publish them together
+            with timer.stage("build"):
+                new_snapshot = preloaded_snapshot if preloaded_snapshot is not None else await asyncio.to_thread(
+                    OntologySnapshot.build, snapshot.version + 1, nlp, skills_data, job_roles_list
+                )
+            with timer.stage("publish"):
+                publish_snapshot(new_snapshot)
+                ontology_sync.mark_loaded(db_version)
+        
+            finished = time.perf_counter()
+            ontology_load_stats = {
+                "skills": len(skills_data),
+                "job_roles": len(job_roles_list),
+                "fetch_seconds": round(fetched - started, 4),
+                "build_seconds": round(finished - fetched, 4),
+                "total_seconds": round(finished - started, 4),
+                "preloaded": preloaded_snapshot is not None,
+                "loaded_at": datetime.now(timezone.utc).isoformat()
+            }
+    finally:
+        timer.finish() # Failed loads are timed too
+    matcher_info = new_snapshot.matcher_info
+    logging.info(
+        f"Loaded ontology from DB: {len(ontology['skills'])} skills and {len(ontology['job_roles'])} job roles "
+        f"in {ontology_load_stats['total_seconds']}s (fetch {ontology_load_stats['fetch_seconds']}s, "
+        f"matcher {matcher_info['source']} in {matcher_info['seconds']}s)"
+    )
+
+def publish_snapshot(new_snapshot: OntologySnapshot):
+    """
+    Make new_snapshot the live ontology. No awaits in here, so every request
+    sees either the old snapshot or the new one, never a mix.
+    """
+    global snapshot, ontology
+    previous = snapshot
+    snapshot = new_snapshot
+    ontology = new_snapshot.ontology
+    if new_snapshot.base_matcher is not previous.base_matcher:
+        extraction_pool.refresh(new_snapshot.base_terms)
+    analysis_cache.invalidate(new_snapshot.fingerprint)
+
+async def apply_skill_delta(skill_name: str, skill_data: Dict):
+    """Add one skill to the live ontology without reloading everything"""
+    async with ontology_write_lock:
+        if not is_ready():
+            return # Not warmed up yet; the initial load will read it from the DB
+        await skill_ids.sync(db[META_COLLECTION], [skill_name])
+        publish_snapshot(await asyncio.to_thread(snapshot.with_skill, nlp, skill_name, skill_data))
+
+async def apply_role_delta(job_role: Dict):
+    """Append one role to the live ontology without reloading everything"""
+    async with ontology_write_lock:
+        if not is_ready():
+            return
+        publish_snapshot(await asyncio.to_thread(snapshot.with_role, job_role))
+
+def matcher_pattern_count(snap: OntologySnapshot) -> int:
+    """Base matcher patterns plus the phrases of skills approved since"""
+    return snap.matcher_info.get('patterns', 0) + sum(len(phrases) for _, phrases in snap.delta_terms)
+
+def ensure_fresh_ontology():
+    """
+    If another worker changed the ontology, start a reload in the background
+    (once). The current request keeps using the snapshot it already has.
+    """
+    global reload_task
+    if ontology_sync.stale and is_ready() and (reload_task is None or reload_task.done()):
+        logging.info(f"Ontology version {ontology_sync.latest_version} available, reloading")
+        reload_task = asyncio.create_task(load_ontology_from_db())
+
+async def ensure_nlp():
+    """Load the spaCy model once, off the event loop"""
+    global nlp
+    async with nlp_lock:
+        if nlp is None:
+            nlp = await asyncio.to_thread(load_nlp)
+
+async def fetch_skills() -> Dict[str, Dict]:
+    """All skills in one cursor; the document is the skill data, _id is the name"""
+    skills_data = {}
+    async for skill_doc in db[SKILLS_COLLECTION].find({}, batch_size=ONTOLOGY_LOAD_BATCH_SIZE):
+        skills_data[skill_doc.pop('_id')] = skill_doc
+    return skills_data
+
+async def fetch_job_roles() -> List[Dict]:
+    cursor = db[JOBS_COLLECTION].find({}, {"_id": 0}, batch_size=ONTOLOGY_LOAD_BATCH_SIZE) # Exclude mongo _id
+    return [job_role async for job_role in cursor]
+
+def take_preloaded(db_version: int) -> Optional[OntologySnapshot]:
+    """The master's preloaded snapshot, once, if the DB has not changed since the master read it"""
+    global preloaded
+    if preloaded is None:
+        return None
+    preloaded_version, preloaded_snapshot = preloaded
+    preloaded = None
+    return preloaded_snapshot if preloaded_version == db_version else None
+
+def is_ready() -> bool:
+    return nlp is not None and snapshot.is_ready
+
+async def load_candidate_index():
+    try:
+        await candidate_index.load(db[ANALYSIS_COLLECTION])
+    except Exception as e:
+        logging.error(f"Error loading the candidate index: {str(e)}")
+
+async def warm_up():
+    global warmup_error, candidate_index_task
+    try:
+        index_stats = await ensure_indexes(db)
+        logging.info(f"Index bootstrap: {index_stats['created']} indexes ensured, failed: {index_stats['failed'] or 'none'}")
+        await analysis_cache.ensure_indexes()
+        await load_ontology_from_db()
+        ontology_sync.start()
+        # Needs the skill ids from the ontology load; searches work on whatever is indexed so far
+        candidate_index_task = asyncio.create_task(load_candidate_index())
+        warmup_error = None
+    except Exception as e:
+        warmup_error = str(e)
+        logging.error(f"Error warming up model and ontology: {str(e)}")
 
 @app.on_event("startup")
 async def startup_event():
     """
-    On server startup, load the ontology from MongoDB.
+    On server startup, load the spaCy model and the ontology from MongoDB in
+    the background, so the port opens at once; /api/ready reports when
+    they are warm.
     """
-    await load_ontology_from_db()
+    global warmup_task
+    analysis_writer.start()
+    warmup_task = asyncio.create_task(warm_up())
 
 # Models (No change)
 class SkillAnalysis(BaseModel):
@@ -112,32 +290,26 @@ class ReviewDecision(BaseModel):
     decision: str
     reviewer_name: Optional[str] = "Admin"
 
-# Helper functions (No change)
-def extract_text_from_pdf(file_bytes):
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    text = ""
-    for page in doc:
-        text += page.get_text()
-    return text
-
-def extract_text_from_docx(file_bytes):
-    doc = Document(io.BytesIO(file_bytes))
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
-
-def extract_skills_from_text(text: str) -> List[str]:
-    doc = nlp(text.lower())
-    matches = skill_matcher(doc)
-    found_skills = set()
-    for match_id, start, end in matches:
-        skill_name = nlp.vocab.strings[match_id]
-        found_skills.add(skill_name)
-    return list(found_skills)
-
-# Scoring function (No change)
-def calculate_weighted_match(user_skills: List[str], job_role: Dict) -> Dict:
+# Helper functions (text extraction lives in extraction.py)
+def extract_skills_from_text(text: str, snap: Optional[OntologySnapshot] = None) -> List[str]:
+    return match_skills(nlp, (snap or snapshot).matcher, text)
+
+def extract_skills_from_texts(texts: List[str], snap: Optional[OntologySnapshot] = None) -> List[List[str]]:
+    """Batched extract_skills_from_text through nlp.pipe"""
+    return match_skills_batch(nlp, (snap or snapshot).matcher, texts)
+
+def analyze_resume_bytes(snap: OntologySnapshot, filename: str, file_bytes: bytes):
+    """Parse a resume and match skills in this process (thread-pool path)"""
+    started = time.perf_counter()
+    text, info = extract_text_with_info(filename, file_bytes)
+    parsed = time.perf_counter()
+    if not text.strip():
+        return text, [], info, {"parse": parsed - started, "match": 0.0}
+    user_skills = extract_skills_from_text(text, snap)
+    return text, user_skills, info, {"parse": parsed - started, "match": time.perf_counter() - parsed}
+
+# Scoring function; 'skills' is the snapshot's skill dict, for learning resources
+def calculate_weighted_match(user_skills: List[str], job_role: Dict, skills: Dict) -> Dict:
     user_skills_set = set(user_skills)
     total_score = 0
     max_possible_total_score = 0
@@ -169,7 +341,7 @@ def calculate_weighted_match(user_skills: List[str], job_role: Dict) -> Dict:
                 "skill": skill_name,
                 "weight": weight,
                 "is_core": is_core,
-                "learning_resources": ontology['skills'].get(skill_name, {}).get('learning_resources', [])
+                "learning_resources": skills.get(skill_name, {}).get('learning_resources', [])
             })
     
     total_match_percentage = (total_score / max_possible_total_score * 100) if max_possible_total_score > 0 else 0
@@ -188,62 +360,131 @@ def calculate_weighted_match(user_skills: List[str], job_role: Dict) -> Dict:
         "missing_skills": sorted(missing_skills, key=lambda x: (x['is_core'], x['weight']), reverse=True)
     }
 
+def rank_career_matches(snap: OntologySnapshot, user_skills: List[str], experience: Optional[str]) -> List[Dict]:
+    """
+    Score every role (filtered by experience) in one vectorized pass, then
+    build the detailed breakdown only for the top 10
+    """
+    engine = snap.engine
+    top_roles = engine.rank(user_skills, experience=experience, limit=10)
+    return [
+        calculate_weighted_match(user_skills, engine.job_roles[role_idx], snap.skills)
+        for role_idx in top_roles
+    ]
+
+def new_analysis_doc(filename: str, user_skills: List[str], career_matches: List[Dict]) -> Dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "filename": filename,
+        "user_skills": user_skills,
+        "skill_bits": skill_ids.encode(user_skills), # For the candidate index
+        "career_matches": career_matches,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
+
 # API Routes
 @api_router.get("/")
 async def root():
     return {"message": "NextStepAI API - Your Future, Demystified"}
 
+def overloaded_error(e: Overloaded) -> HTTPException:
+    upload_rejections.inc(e.reason)
+    return HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+@asynccontextmanager
+async def admitted_upload(reject: bool = True):
+    """A parse slot from upload_gate; overload becomes 429/503 with Retry-After"""
+    try:
+        async with upload_gate.slot(reject=reject):
+            yield
+    except Overloaded as e:
+        raise overloaded_error(e)
+
+def batch_bytes_needed(files: List[UploadFile]) -> int:
+    """
+    Most bytes read_batch_upload can hold for these files: each file as
+    uploaded, plus what zips declare they expand to (capped like expand_zip)
+    """
+    uploaded = sum(upload.size or 0 for upload in files)
+    expanded = sum(zip_resume_bytes(upload.file) for upload in files if upload.filename.endswith('.zip'))
+    return uploaded + min(expanded, BATCH_UPLOAD_MAX_EXPANDED_BYTES)
+
+async def reserve_batch_bytes(files: List[UploadFile]) -> int:
+    """Reserve a batch's bytes from batch_budget before any of them is read into memory"""
+    nbytes = batch_bytes_needed(files)
+    try:
+        await batch_budget.reserve(nbytes)
+    except Overloaded as e:
+        raise overloaded_error(e)
+    except UploadTooLarge as e:
+        upload_rejections.inc("too_large")
+        raise HTTPException(status_code=413, detail=f"Batch needs {nbytes} bytes; at most {e.limit} can be processed at once")
+    return nbytes
+
+async def read_upload(upload: UploadFile, limit: int) -> bytes:
+    try:
+        return await read_limited(upload, limit)
+    except UploadTooLarge as e:
+        upload_rejections.inc("too_large")
+        raise HTTPException(status_code=413, detail=f"{upload.filename} is larger than {e.limit} bytes")
+
 # --- UPDATED: No longer needs Form(...) for experience ---
 @api_router.post("/upload-resume")
-async def upload_resume(file: UploadFile = File(...), experience: Optional[str] = Form(None)):
+async def upload_resume(response: Response, file: UploadFile = File(...), experience: Optional[str] = Form(None)):
     """Parse resume and analyze career paths"""
+    timer = StageTimer(stage_seconds, "upload_resume")
+    uploads_in_flight.inc()
     try:
-        file_bytes = await file.read()
+        if not is_ready():
+            raise HTTPException(status_code=503, detail="Skill model is still loading, please retry shortly")
         
-        if file.filename.endswith('.pdf'):
-            text = extract_text_from_pdf(file_bytes)
-        elif file.filename.endswith('.docx'):
-            text = extract_text_from_docx(file_bytes)
-        else:
+        if not file.filename.endswith(SUPPORTED_EXTENSIONS):
             raise HTTPException(status_code=400, detail="Unsupported file type. Please upload PDF or DOCX")
         
+        ensure_fresh_ontology()
+        # A parse slot covers the memory-heavy part: the file's bytes and their extraction
+        async with admitted_upload():
+            with timer.stage("read"):
+                file_bytes = await read_upload(file, UPLOAD_MAX_BYTES)
+            snap = snapshot # One consistent ontology for the whole request
+            
+            # Same file under the same ontology -> reuse the earlier extraction
+            with timer.stage("cache_lookup"):
+                digest = content_key(file_bytes)
+                cached = await analysis_cache.get(digest)
+            if cached is not None:
+                text, user_skills = cached['text'], cached['user_skills']
+            else:
+                # Parsing and NLP run in the extraction pool, not on the event loop
+                text, user_skills, timings = await extraction_pool.analyze(
+                    file.filename, file_bytes, partial(analyze_resume_bytes, snap),
+                    delta_key=snap.fingerprint, delta_terms=snap.delta_terms
+                )
+                for stage, seconds in timings.items():
+                    timer.add(stage, seconds)
+                with timer.stage("cache_store"):
+                    await analysis_cache.put(digest, text, user_skills, version=snap.fingerprint)
+        
         if not text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from file")
         
-        user_skills = extract_skills_from_text(text)
-        
         if not user_skills:
             raise HTTPException(status_code=400, detail="No recognizable skills found in resume")
         
-        # --- UPDATED: Filter logic uses in-memory ontology ---
-        job_roles_to_analyze = ontology['job_roles']
-        if experience:
-            job_roles_to_analyze = [
-                role for role in ontology['job_roles']
-                if role.get('experience_level') == experience
-            ]
+        with timer.stage("score"):
+            career_matches = rank_career_matches(snap, user_skills, experience)
+            analysis_doc = new_analysis_doc(file.filename, user_skills, career_matches)
         
-        career_matches = []
-        for job_role in job_roles_to_analyze:
-            match_data = calculate_weighted_match(user_skills, job_role)
-            career_matches.append(match_data)
-        
-        career_matches.sort(key=lambda x: x['match_score'], reverse=True)
-        
-        analysis_doc = {
-            "id": str(uuid.uuid4()),
-            "filename": file.filename,
-            "user_skills": user_skills,
-            "career_matches": career_matches[:10],
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        
-        await db[ANALYSIS_COLLECTION].insert_one(analysis_doc)
+        with timer.stage("persist"):
+            await analysis_writer.put(analysis_doc) # Written in the background, batched with other uploads
+            candidate_index.add(analysis_doc['id'], analysis_doc['skill_bits'])
         
+        timer.finish()
+        response.headers["Server-Timing"] = timer.server_timing()
         return {
             "success": True,
             "user_skills": user_skills,
-            "career_matches": career_matches[:10],
+            "career_matches": career_matches,
             "analysis_id": analysis_doc['id']
         }
         
@@ -252,11 +493,261 @@ async def upload_resume(file: UploadFile = File(...), experience: Optional[str]
     except Exception as e:
         logging.error(f"Error analyzing resume: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error processing resume: {str(e)}")
+    finally:
+        uploads_in_flight.dec()
+        timer.finish() # Failed uploads are timed too
+
+async def read_batch_upload(files: List[UploadFile]) -> List[tuple]:
+    """(filename, bytes) for every uploaded resume; zips are expanded"""
+    resumes = []
+    for upload in files:
+        if upload.filename.endswith('.zip'):
+            file_bytes = await read_upload(upload, UPLOAD_BATCH_MAX_BYTES)
+            expanded = sum(len(resume_bytes) for _, resume_bytes in resumes)
+            try:
+                resumes.extend(expand_zip(
+                    file_bytes,
+                    max_files=BATCH_UPLOAD_MAX_FILES - len(resumes),
+                    max_total_bytes=BATCH_UPLOAD_MAX_EXPANDED_BYTES - expanded # The cap covers the whole batch
+                ))
+            except (ValueError, zipfile.BadZipFile) as e:
+                raise HTTPException(status_code=400, detail=f"{upload.filename}: {e}")
+        elif upload.filename.endswith(SUPPORTED_EXTENSIONS):
+            resumes.append((upload.filename, await read_upload(upload, BATCH_UPLOAD_MAX_FILE_BYTES)))
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported file type: {upload.filename}. Please upload PDF, DOCX or ZIP")
+        if len(resumes) > BATCH_UPLOAD_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"At most {BATCH_UPLOAD_MAX_FILES} resumes per batch")
+    if not resumes:
+        raise HTTPException(status_code=400, detail="No PDF or DOCX resumes found in upload")
+    return resumes
+
+async def analyze_batch(snap: OntologySnapshot, resumes: List[tuple], experience: Optional[str]):
+    """
+    Yields one NDJSON line per resume as soon as it is scored. Text
+    extraction runs concurrently in the extraction pool; whatever has been
+    extracted by the time the event loop looks goes through nlp.pipe
+    together, and each such group goes to the analysis writer at once.
+    """
+    started = time.perf_counter()
+    counts = {"succeeded": 0, "failed": 0, "cached": 0}
+    uploads_in_flight.inc()
+
+    async def prepare(filename: str, file_bytes: bytes) -> Dict:
+        entry = {"filename": filename, "digest": content_key(file_bytes), "text": "", "user_skills": [], "cached": False}
+        try:
+            cached = await analysis_cache.get(entry["digest"])
+            if cached is not None:
+                entry.update(text=cached['text'], user_skills=cached['user_skills'], cached=True)
+            else:
+                # The batch was admitted as a whole, so its files queue for slots instead of failing
+                async with admitted_upload(reject=False):
+                    entry["text"] = await extraction_pool.extract(filename, file_bytes)
+        except Exception as e:
+            logging.error(f"Error analyzing resume {filename}: {str(e)}")
+            entry["error"] = f"Error processing resume: {str(e)}"
+        return entry
+
+    def line(result: Dict) -> bytes:
+        return (json.dumps(result) + "\n").encode('utf-8')
+
+    pending = {asyncio.create_task(prepare(filename, file_bytes)) for filename, file_bytes in resumes}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            ready = [task.result() for task in done]
+
+            # One nlp.pipe pass over every freshly extracted text in this group
+            to_match = [entry for entry in ready if not entry["cached"] and "error" not in entry and entry["text"].strip()]
+            if to_match:
+                matched = await asyncio.to_thread(extract_skills_from_texts, [entry["text"] for entry in to_match], snap)
+                for entry, user_skills in zip(to_match, matched):
+                    entry["user_skills"] = user_skills
+                    await analysis_cache.put(entry["digest"], entry["text"], user_skills, version=snap.fingerprint)
+
+            results, analysis_docs = [], []
+            for entry in ready:
+                filename, text, user_skills = entry["filename"], entry["text"], entry["user_skills"]
+                counts["cached"] += entry["cached"]
+                if "error" in entry:
+                    results.append({"filename": filename, "success": False, "error": entry["error"]})
+                elif not text.strip():
+                    results.append({"filename": filename, "success": False, "error": "Could not extract text from file"})
+                elif not user_skills:
+                    results.append({"filename": filename, "success": False, "error": "No recognizable skills found in resume"})
+                else:
+                    analysis_doc = new_analysis_doc(filename, user_skills, rank_career_matches(snap, user_skills, experience))
+                    analysis_docs.append(analysis_doc)
+                    results.append({
+                        "filename": filename,
+                        "success": True,
+                        "user_skills": user_skills,
+                        "career_matches": analysis_doc['career_matches'],
+                        "analysis_id": analysis_doc['id']
+                    })
+
+            if analysis_docs:
+                await analysis_writer.put_many(analysis_docs)
+                for analysis_doc in analysis_docs:
+                    candidate_index.add(analysis_doc['id'], analysis_doc['skill_bits'])
+            for result in results:
+                counts["succeeded" if result["success"] else "failed"] += 1
+                yield line(result)
+    finally:
+        uploads_in_flight.dec()
+        for task in pending:
+            task.cancel() # Client went away
+
+    yield line({"done": True, "files": len(resumes), **counts, "seconds": round(time.perf_counter() - started, 3)})
+
+@api_router.post("/upload-resumes")
+async def upload_resumes(files: List[UploadFile] = File(...), experience: Optional[str] = Form(None)):
+    """
+    Analyze many resumes (several PDF/DOCX files and/or zip archives) in one
+    call. Results stream back as NDJSON, one line per resume in completion
+    order, followed by a summary line.
+    """
+    if not is_ready():
+        raise HTTPException(status_code=503, detail="Skill model is still loading, please retry shortly")
+    
+    # The body is spooled to temporary files by now; memory is only used from read_batch_upload on
+    reserved = await reserve_batch_bytes(files)
+    try:
+        resumes = await read_batch_upload(files)
+    except BaseException:
+        batch_budget.release(reserved)
+        raise
+    ensure_fresh_ontology()
+    snap = snapshot # One consistent ontology for the whole batch
+    # The response releases the reservation, even if the client leaves before the generator starts
+    return BudgetedStreamingResponse(
+        analyze_batch(snap, resumes, experience), batch_budget, reserved, media_type="application/x-ndjson"
+    )
+
+@api_router.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once the spaCy model and skill matcher are warm"""
+    body = {
+        "ready": is_ready(),
+        "model_loaded": nlp is not None,
+        "matcher_ready": snapshot.is_ready,
+        "matcher": snapshot.matcher_info,
+        "error": warmup_error
+    }
+    if not body["ready"]:
+        return JSONResponse(status_code=503, content=body)
+    return body
+
+@api_router.get("/diagnostics")
+async def get_diagnostics():
+    """Runtime stats for this worker"""
+    return {
+        "worker_pid": os.getpid(),
+        "memory": process_memory(),
+        "ontology": snapshot.stats(),
+        "ontology_sync": ontology_sync.stats(),
+        "ontology_load": ontology_load_stats,
+        "analysis_cache": analysis_cache.stats(),
+        "ontology_responses": ontology_responses.stats(),
+        "analysis_writer": analysis_writer.stats(),
+        "update_jobs": update_jobs.stats(),
+        "extraction_pool": extraction_pool.stats(),
+        "uploads": upload_gate.stats(),
+        "batch_uploads": batch_budget.stats(),
+        "candidate_index": candidate_index.stats()
+    }
 
 @api_router.get("/ontology")
-async def get_ontology():
-    """Get current in-memory ontology"""
-    return ontology # Returns the global variable populated from DB
+async def get_ontology(
+    request: Request,
+    fields: str = Query("full", description="'full' or 'names' (skill names and role titles only)"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, description="Page size for skills and job roles")
+):
+    """
+    Get current in-memory ontology. The body is serialized (and compressed)
+    once per snapshot and view; clients revalidate with If-None-Match.
+    """
+    if fields not in ONTOLOGY_FIELDS:
+        raise HTTPException(status_code=400, detail=f"fields must be one of {', '.join(ONTOLOGY_FIELDS)}")
+    ensure_fresh_ontology()
+    snap = snapshot
+    key = (fields, offset, limit)
+    view = ontology_responses.get(snap, key)
+    if view is None:
+        view = await asyncio.to_thread(render_view, snap.ontology, key)
+        ontology_responses.put(snap, key, view)
+    
+    encoding = pick_encoding(request.headers.get('accept-encoding'))
+    headers = {"Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get('if-none-match'), view.etag):
+        ontology_responses.counters["not_modified"] += 1
+        headers["ETag"] = view.etag_for(encoding)
+        return Response(status_code=304, headers=headers)
+    
+    if encoding is not None and encoding not in view.encoded:
+        await asyncio.to_thread(view.encode, encoding) # Compressed once, then reused
+    body, headers["ETag"] = view.encode(encoding)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+CANDIDATE_SEARCH_MAX = 100
+
+@api_router.get("/candidates")
+async def search_candidates(
+    role: str = Query(..., description="Job role title"),
+    limit: int = Query(20, ge=1, le=CANDIDATE_SEARCH_MAX),
+    min_score: float = Query(0.0, ge=0.0, le=100.0)
+):
+    """Stored resume analyses that best fit a job role, best first"""
+    ensure_fresh_ontology()
+    snap = snapshot
+    job_role = next((r for r in snap.job_roles if r['title'].lower() == role.lower()), None)
+    if job_role is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job role: {role}")
+    # Large indexes take tens of milliseconds to score; keep that off the event loop
+    candidates = await asyncio.to_thread(candidate_index.search, job_role, limit, min_score)
+    return {
+        "role": job_role['title'],
+        "searched": len(candidate_index),
+        "loading": candidate_index.loading,
+        "candidates": candidates
+    }
+
+CAREER_NEIGHBORS_MAX = ROLE_GRAPH_NEIGHBORS
+
+def ready_role_graph() -> RoleGraph:
+    ensure_fresh_ontology()
+    graph = snapshot.role_graph
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Ontology is still loading, please retry shortly")
+    return graph
+
+@api_router.get("/career-paths/nearest")
+async def nearest_roles(
+    role: str = Query(..., description="Job role title"),
+    limit: int = Query(5, ge=1, le=CAREER_NEIGHBORS_MAX)
+):
+    """The roles closest to ``role``, with the skill weight each one adds"""
+    graph = ready_role_graph()
+    try:
+        role_idx = graph.role_id(role)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown job role: {role}")
+    return {"role": graph.job_roles[role_idx]['title'], "nearest": graph.nearest(role, limit)}
+
+@api_router.get("/career-paths/path")
+async def career_path(
+    from_role: str = Query(..., description="Current job role title"),
+    to_role: str = Query(..., description="Target job role title")
+):
+    """Cheapest sequence of role moves from one role to another"""
+    graph = ready_role_graph()
+    try:
+        return graph.path(from_role, to_role)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=f"Unknown job role: {e.args[0]}")
 
 # Admin Login (No change)
 @api_router.post("/admin/login")
@@ -267,27 +758,69 @@ async def admin_login(request: AdminLoginRequest):
     else:
         raise HTTPException(status_code=401, detail="Invalid password")
 
-# --- UPDATED: get_pending_updates (Simpler) ---
+# --- Pending updates listing: keyset pagination on (discovered_at, id) ---
+PENDING_PAGE_MAX = 1000
+PENDING_SORT = [("discovered_at", 1), ("id", 1)] # Served by the status(_type)_discovered indexes
+PENDING_SUMMARY_PROJECTION = {
+    "_id": 0, "id": 1, "type": 1, "status": 1, "discovered_at": 1,
+    "discovery_reason": 1, "confidence": 1, "data.name": 1, "data.title": 1
+}
+
+def encode_pending_cursor(doc: Dict) -> str:
+    raw = json.dumps([doc.get('discovered_at'), doc['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_pending_cursor(cursor: str) -> tuple:
+    try:
+        discovered_at, update_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return discovered_at, update_id
+
+def pending_updates_filter(update_type: Optional[str] = None, cursor: Optional[str] = None) -> Dict:
+    query = {"status": "pending"}
+    if update_type:
+        query["type"] = update_type
+    if cursor:
+        discovered_at, update_id = decode_pending_cursor(cursor)
+        query["$or"] = [
+            {"discovered_at": {"$gt": discovered_at}},
+            {"discovered_at": discovered_at, "id": {"$gt": update_id}}
+        ]
+    return query
+
 @api_router.get("/admin/pending-updates")
-async def get_pending_updates():
-    """Get ALL pending ontology updates for admin review"""
+async def get_pending_updates(
+    update_type: Optional[str] = Query(None, alias="type", description="skill, role or review_obsolete"),
+    limit: int = Query(PENDING_PAGE_MAX, ge=1, le=PENDING_PAGE_MAX),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    fields: str = Query("full", description="'full' or 'summary' (names/titles only, for list views)")
+):
+    """Pending ontology updates for admin review, oldest first, one page at a time"""
+    if fields not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="fields must be 'full' or 'summary'")
+    projection = PENDING_SUMMARY_PROJECTION if fields == "summary" else {"_id": 0} # Exclude the MongoDB _id
     pending = await db[PENDING_COLLECTION].find(
-        {"status": "pending"},
-        {"_id": 0}  # Exclude the MongoDB _id
-    ).to_list(1000)
+        pending_updates_filter(update_type, cursor), projection
+    ).sort(PENDING_SORT).limit(limit + 1).to_list(limit + 1)
     
+    has_more = len(pending) > limit
+    pending = pending[:limit]
     return {
-        "pending_updates": pending # Return a single list
+        "pending_updates": pending,
+        "next_cursor": encode_pending_cursor(pending[-1]) if has_more else None
     }
 
 # --- UPDATED: review_update (Writes to DB, not file) ---
 @api_router.post("/admin/review")
-async def review_update(review: ReviewDecision):
+async def review_update(review: ReviewDecision, response: Response):
     """Approve or reject a pending update and update ontology in DB"""
+    timer = StageTimer(stage_seconds, "review_update")
     try:
-        pending = await db[PENDING_COLLECTION].find_one(
-            {"id": review.update_id, "status": "pending"}
-        )
+        with timer.stage("lookup"):
+            pending = await db[PENDING_COLLECTION].find_one(
+                {"id": review.update_id, "status": "pending"}
+            )
         
         if not pending:
             raise HTTPException(status_code=404, detail="Pending update not found")
@@ -306,34 +839,48 @@ async def review_update(review: ReviewDecision):
                     "last_seen_in_market": datetime.now(timezone.utc).strftime("%Y-%m-%d")
                 }
                 # Add to MongoDB
-                await db[SKILLS_COLLECTION].replace_one(
-                    {"_id": skill_name}, 
-                    skill_data_to_insert, 
-                    upsert=True
-                )
+                with timer.stage("write"):
+                    await db[SKILLS_COLLECTION].replace_one(
+                        {"_id": skill_name}, 
+                        skill_data_to_insert, 
+                        upsert=True
+                    )
                 print(f"Admin approved skill: {skill_name}")
+                # Add to the live matcher (delta only, no full reload)
+                skill_data_to_insert.pop("_id")
+                with timer.stage("apply_delta"):
+                    await apply_skill_delta(skill_name, skill_data_to_insert)
                 
             elif pending['type'] == 'role':
-                # Add to MongoDB
-                await db[JOBS_COLLECTION].insert_one(data_to_add)
+                # Add to MongoDB (insert_one adds an _id, so keep our copy clean)
+                with timer.stage("write"):
+                    await db[JOBS_COLLECTION].insert_one(dict(data_to_add))
                 print(f"Admin approved role: {data_to_add['title']}")
+                # Append to the live scoring engine (delta only, no full reload)
+                with timer.stage("apply_delta"):
+                    await apply_role_delta(data_to_add)
             
-            # 3. Reload ontology and matcher from DB
-            await load_ontology_from_db()
-            print(f"Ontology reloaded from DB. Skill matcher updated.")
+            if pending['type'] in ('skill', 'role'):
+                # Tell the other workers
+                with timer.stage("version_bump"):
+                    db_version = await ontology_sync.record_local_change()
+                print(f"Ontology updated in place (version {snapshot.version}, db version {db_version}).")
         
         # 4. Update status in DB
-        await db[PENDING_COLLECTION].update_one(
-            {"id": review.update_id},
-            {
-                "$set": {
-                    "status": review.decision,
-                    "reviewed_at": datetime.now(timezone.utc).isoformat(),
-                    "reviewed_by": review.reviewer_name
+        with timer.stage("status_update"):
+            await db[PENDING_COLLECTION].update_one(
+                {"id": review.update_id},
+                {
+                    "$set": {
+                        "status": review.decision,
+                        "reviewed_at": datetime.now(timezone.utc).isoformat(),
+                        "reviewed_by": review.reviewer_name
+                    }
                 }
-            }
-        )
+            )
         
+        timer.finish()
+        response.headers["Server-Timing"] = timer.server_timing()
         return {
             "success": True,
             "message": f"Update {review.decision}ed successfully and ontology has been updated."
@@ -342,28 +889,78 @@ async def review_update(review: ReviewDecision):
     except Exception as e:
         logging.error(f"Error reviewing update: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        timer.finish()
 
-# Trigger Updater (No change)
-@api_router.post("/trigger-ontology-update")
+# Trigger Updater: runs ontology_updater.py as a background job
+@api_router.post("/trigger-ontology-update", status_code=202)
 async def trigger_ontology_update():
+    """Start the weekly updater and return its job id at once"""
     try:
-        result = subprocess.run(
-            ['python', str(ROOT_DIR / 'ontology_updater.py')],
-            capture_output=True,
-            text=True
-        )
-        return {
-            "success": True,
-            "message": "Ontology update triggered",
-            "output": result.stdout
-        }
+        job = await update_jobs.start()
+    except JobAlreadyRunning as e:
+        return JSONResponse(status_code=409, content={
+            "success": False,
+            "message": "An ontology update is already running",
+            "job_id": e.job_id
+        })
     except Exception as e:
         logging.error(f"Error triggering update: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "success": True,
+        "message": "Ontology update triggered",
+        "job_id": job.id,
+        "status_url": f"/api/ontology-update-jobs/{job.id}"
+    }
+
+@api_router.get("/ontology-update-jobs/{job_id}")
+async def get_ontology_update_job(job_id: str, since: int = Query(0, ge=0, description="Only log lines from this line number on")):
+    """Status, duration and log output of an update job"""
+    job = await update_jobs.get(job_id, since)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Update job not found")
+    return job
+
+@api_router.get("/ontology-update-jobs/{job_id}/log")
+async def stream_ontology_update_log(job_id: str, since: int = Query(0, ge=0)):
+    """Follow an update job's output as plain text until it finishes"""
+    job = update_jobs.jobs.get(job_id)
+    if job is None:
+        recorded = await update_jobs.get(job_id, since)
+        if recorded is None:
+            raise HTTPException(status_code=404, detail="Update job not found")
+        # Started by another worker: return what it recorded
+        return Response(content="".join(line + "\n" for line in recorded["log"]), media_type="text/plain")
+    return StreamingResponse((line + "\n" async for line in job.follow(since)), media_type="text/plain")
+
+# Prometheus scrape target (outside /api, where scrapers look by default)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
 
 # Include router
 app.include_router(api_router)
 
+UPLOAD_BODY_LIMITS = {"/api/upload-resume": UPLOAD_MAX_BYTES, "/api/upload-resumes": UPLOAD_BATCH_MAX_BYTES}
+
+@app.middleware("http")
+async def reject_uploads_early(request: Request, call_next):
+    """Turn away oversized or over-capacity uploads before their body is read"""
+    limit = UPLOAD_BODY_LIMITS.get(request.url.path)
+    if limit is not None and request.method == "POST":
+        if declared_too_large(request.headers.get("content-length"), limit):
+            upload_rejections.inc("too_large")
+            return JSONResponse(status_code=413, content={"detail": f"Upload is larger than {limit} bytes"})
+        try:
+            upload_gate.check()
+            if request.url.path == "/api/upload-resumes":
+                batch_budget.check()
+        except Overloaded as e:
+            upload_rejections.inc(e.reason)
+            return JSONResponse(status_code=e.status_code, content={"detail": str(e)}, headers={"Retry-After": str(e.retry_after)})
+    return await call_next(request)
+
 # CORS Middleware (No change)
 app.add_middleware(
     CORSMiddleware,
@@ -382,4 +979,8 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await ontology_sync.stop()
+    await update_jobs.shutdown()
+    await analysis_writer.close() # Flush queued analyses before the client goes away
+    extraction_pool.shutdown()
     client.close()
\ No newline at end of file
@@ -0,0 +1,221 @@
+"""
+Bounded-memory discovery of skill candidates in job postings.
+
+While postings are matched (job_postings.py), every 1-3 word n-gram that
+no current skill pattern covers, in a sentence that does mention a known
+skill, is counted once per posting. Requiring a known skill nearby keeps
+boilerplate ("competitive salary and benefits") out of the counts, since
+new tools tend to be listed next to established ones. Exact counts
+would grow with the corpus, so they go into a count-min sketch: a fixed
+depth x width table whose estimates never undercount. A heavy-hitters
+set of at most 2 * SKILL_DISCOVERY_TOP_K n-grams tracks the candidates.
+
+Each worker counts its chunk exactly (bounded by the chunk size) and
+returns that Counter, which only holds the n-grams the chunk used, instead
+of a full sketch table. The parent adds it to the one sketch and offers the
+chunk's top-k to the global heavy hitters. Hashing is blake2b, not hash(),
+so estimates do not depend on the process's hash seed.
+"""
+import hashlib
+import heapq
+import math
+import os
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SKILL_SKETCH_WIDTH = int(os.environ.get('SKILL_SKETCH_WIDTH', 2 ** 18))
+SKILL_SKETCH_DEPTH = int(os.environ.get('SKILL_SKETCH_DEPTH', 4))
+SKILL_DISCOVERY_TOP_K = int(os.environ.get('SKILL_DISCOVERY_TOP_K', 200))
+SKILL_DISCOVERY_MAX_NGRAM = int(os.environ.get('SKILL_DISCOVERY_MAX_NGRAM', 3))
+SKILL_DISCOVERY_MIN_SHARE = float(os.environ.get('SKILL_DISCOVERY_MIN_SHARE', 0.01))  # Of all postings
+SKILL_DISCOVERY_MIN_POSTINGS = int(os.environ.get('SKILL_DISCOVERY_MIN_POSTINGS', 20))
+SKILL_DISCOVERY_MAX_CANDIDATES = int(os.environ.get('SKILL_DISCOVERY_MAX_CANDIDATES', 10))  # Per run
+FULL_CONFIDENCE_SHARE = 0.1  # A term in 10% of postings gets confidence 1.0
+
+# Words every posting uses; no candidate starts or ends with one
+GENERIC_POSTING_TERMS = frozenset("""
+ability apply benefits candidate candidates company competitive culture customer customers daily degree develop
+development environment equal excellent experience familiarity frameworks hands knowledge opportunity position
+preferred proficiency required requirements responsibilities role salary senior junior skills solutions strong
+support team teams technologies tools understanding work working year years
+""".split())
+LIST_SEPARATORS = frozenset(["and", "or", "&", "/"])  # "htmx and tailwind" is two candidates, not one
+
+
+class CountMinSketch:
+    def __init__(self, width: int = SKILL_SKETCH_WIDTH, depth: int = SKILL_SKETCH_DEPTH, table: Optional[np.ndarray] = None):
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else np.zeros((depth, width), dtype=np.uint32)
+
+    def _indexes(self, items: Sequence[str]) -> np.ndarray:
+        """depth x len(items) cell indexes, by double hashing one 64-bit digest"""
+        digests = np.array(
+            [int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little') for item in items],
+            dtype=np.uint64,
+        )
+        h1 = digests & np.uint64(0xFFFFFFFF)
+        h2 = (digests >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((h1[None, :] + rows * h2[None, :]) % np.uint64(self.width)).astype(np.int64)
+
+    def add_counts(self, counts: Dict[str, int]) -> None:
+        if not counts:
+            return
+        items = list(counts)
+        indexes = self._indexes(items)
+        values = np.fromiter((counts[item] for item in items), dtype=np.uint32, count=len(items))
+        for row in range(self.depth):
+            np.add.at(self.table[row], indexes[row], values)
+
+    def estimate_many(self, items: Sequence[str]) -> np.ndarray:
+        if not items:
+            return np.zeros(0, dtype=np.uint32)
+        indexes = self._indexes(items)
+        return self.table[np.arange(self.depth)[:, None], indexes].min(axis=0)
+
+    @property
+    def total(self) -> int:
+        """Sum of every count added (each row holds all of them)"""
+        return int(self.table[0].sum(dtype=np.uint64))
+
+    def error_bound(self) -> float:
+        """Overcount bound e/width * total, holding with probability 1 - e^-depth"""
+        return math.e / self.width * self.total
+
+
+class HeavyHitters:
+    """The (at most) k items with the largest estimates, pruned lazily at 2k"""
+
+    def __init__(self, k: int = SKILL_DISCOVERY_TOP_K):
+        self.k = k
+        self.estimates: Dict[str, int] = {}
+
+    def offer(self, items: Sequence[str], estimates: Iterable[int]) -> None:
+        for item, estimate in zip(items, estimates):
+            self.estimates[item] = max(int(estimate), self.estimates.get(item, 0))
+        if len(self.estimates) > 2 * self.k:
+            self.estimates = dict(heapq.nlargest(self.k, self.estimates.items(), key=lambda entry: entry[1]))
+
+    def top(self) -> List[Tuple[str, int]]:
+        return heapq.nlargest(self.k, self.estimates.items(), key=lambda entry: entry[1])
+
+
+def _is_word(token) -> bool:
+    # Keeps "c++", "node.js" and "k8s" style tokens, drops punctuation and numbers
+    return not (token.is_punct or token.is_space or token.like_num or token.like_url or token.like_email) \
+        and any(ch.isalpha() for ch in token.text)
+
+
+SENTENCE_BREAKS = frozenset(".;:!?")
+
+
+def _sentences(doc) -> Iterator[Tuple[int, int]]:
+    """(start, end) token ranges split at sentence punctuation and line breaks"""
+    start = 0
+    for token in doc:
+        if token.text in SENTENCE_BREAKS or (token.is_space and "\n" in token.text):
+            if token.i > start:
+                yield start, token.i
+            start = token.i + 1
+    if start < len(doc):
+        yield start, len(doc)
+
+
+def _is_boundary_word(token) -> bool:
+    return not token.is_stop and token.text not in GENERIC_POSTING_TERMS
+
+
+def _ngrams(run: List, max_n: int) -> Iterator[str]:
+    for size in range(1, max_n + 1):
+        for start in range(len(run) - size + 1):
+            words = run[start:start + size]
+            if len(words[0].text) < 2 or not (_is_boundary_word(words[0]) and _is_boundary_word(words[-1])):
+                continue
+            yield " ".join(word.text for word in words)
+
+
+def candidate_ngrams(doc, matches, max_n: int = SKILL_DISCOVERY_MAX_NGRAM) -> Iterator[str]:
+    """
+    1..max_n word n-grams of ``doc`` that no skill match covers, taken from
+    sentences with at least one match. N-grams never span punctuation, a
+    match or a list separator, and never start or end with a stop word or
+    a generic posting term.
+    """
+    if not matches:
+        return
+    covered = set()
+    for _, start, end in matches:
+        covered.update(range(start, end))
+    for start, end in _sentences(doc):
+        if covered.isdisjoint(range(start, end)):
+            continue
+        run = []
+        for i in range(start, end):
+            token = doc[i]
+            if i not in covered and token.text not in LIST_SEPARATORS and _is_word(token):
+                run.append(token)
+            else:
+                yield from _ngrams(run, max_n)
+                run = []
+        yield from _ngrams(run, max_n)
+
+
+class SkillDiscovery:
+    """Global sketch + heavy hitters over a whole corpus"""
+
+    def __init__(self, width: int = SKILL_SKETCH_WIDTH, depth: int = SKILL_SKETCH_DEPTH, k: int = SKILL_DISCOVERY_TOP_K):
+        self.sketch = CountMinSketch(width, depth)
+        self.heavy = HeavyHitters(k)
+
+    def merge_chunk(self, ngram_counts: Counter) -> None:
+        """Adds one chunk's exact n-gram counts and offers its top-k as candidates"""
+        self.sketch.add_counts(ngram_counts)
+        local_top = [ngram for ngram, _ in heapq.nlargest(self.heavy.k, ngram_counts.items(), key=lambda entry: entry[1])]
+        self.heavy.offer(local_top, self.sketch.estimate_many(local_top))
+
+    def memory_bytes(self) -> int:
+        return self.sketch.table.nbytes
+
+    def candidates(
+        self,
+        postings: int,
+        min_share: float = SKILL_DISCOVERY_MIN_SHARE,
+        min_postings: int = SKILL_DISCOVERY_MIN_POSTINGS,
+        limit: Optional[int] = SKILL_DISCOVERY_MAX_CANDIDATES,
+    ) -> List[Dict]:
+        """
+        Candidates seen in at least max(min_postings, min_share * postings)
+        postings, best first. Estimates are re-read from the final sketch,
+        and confidence uses the sketch's lower bound (estimate - error), so
+        a term close to the noise floor never scores high. An n-gram inside
+        a longer candidate with nearly the same count is dropped in favour
+        of the longer one ("spark" vs "apache spark").
+        """
+        if not postings:
+            return []
+        names = [name for name, _ in self.heavy.top()]
+        estimates = dict(zip(names, (int(e) for e in self.sketch.estimate_many(names))))
+        threshold = max(min_postings, min_share * postings)
+        error = self.sketch.error_bound()
+        ranked = sorted((name for name in names if estimates[name] >= threshold), key=lambda name: (-estimates[name], name))
+
+        kept = [
+            name for name in ranked
+            if not any(f" {name} " in f" {longer} " and estimates[longer] >= 0.8 * estimates[name]
+                       for longer in ranked if len(longer) > len(name))
+        ]
+
+        results = []
+        for name in kept[:limit]:
+            lower_bound = max(0.0, estimates[name] - error)
+            share = estimates[name] / postings
+            results.append({
+                "name": name,
+                "estimated_postings": estimates[name],
+                "share": round(share, 4),
+                "confidence": round(min(1.0, lower_bound / postings / FULL_CONFIDENCE_SHARE), 2),
+            })
+        return results
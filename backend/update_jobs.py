@@ -0,0 +1,205 @@
+"""
+Runs ontology_updater.py as a tracked background job.
+
+The updater runs in its own process (asyncio subprocess, so the event loop
+never blocks on it); its output is captured line by line for the status and
+log endpoints. A lease document in Mongo makes sure only one update runs at
+a time across every worker, and jobs are recorded in Mongo so any worker can
+report on them.
+"""
+import asyncio
+import logging
+import os
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import AsyncIterator, Dict, List, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+UPDATE_JOB_TIMEOUT_SECONDS = float(os.environ.get('UPDATE_JOB_TIMEOUT_SECONDS', 1800))
+UPDATE_JOB_MAX_LOG_LINES = int(os.environ.get('UPDATE_JOB_MAX_LOG_LINES', 5000))
+UPDATE_JOBS_COLLECTION = "ontology_update_jobs"
+LOCK_DOC_ID = "ontology_update_lock"  # Lives in the ontology_meta collection
+RECENT_JOBS_KEPT = 20
+
+logger = logging.getLogger(__name__)
+
+
+class JobAlreadyRunning(Exception):
+    def __init__(self, job_id: Optional[str]):
+        super().__init__(f"Ontology update {job_id} is already running")
+        self.job_id = job_id
+
+
+class UpdateJob:
+    def __init__(self, job_id: str, command: List[str]):
+        self.id = job_id
+        self.command = command
+        self.status = "running"  # running -> succeeded | failed
+        self.returncode: Optional[int] = None
+        self.error: Optional[str] = None
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.lines: List[str] = []
+        self.dropped_lines = 0  # Oldest lines discarded past UPDATE_JOB_MAX_LOG_LINES
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status != "running"
+
+    @property
+    def line_count(self) -> int:
+        return self.dropped_lines + len(self.lines)
+
+    def append(self, line: str) -> None:
+        self.lines.append(line)
+        if len(self.lines) > UPDATE_JOB_MAX_LOG_LINES:
+            del self.lines[0]
+            self.dropped_lines += 1
+        self._notify()
+
+    def finish(self, status: str, returncode: Optional[int] = None, error: Optional[str] = None) -> None:
+        self.status = status
+        self.returncode = returncode
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+        self._notify()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def lines_since(self, since: int) -> List[str]:
+        """Log lines from absolute line number ``since`` on"""
+        return self.lines[max(0, since - self.dropped_lines):]
+
+    async def follow(self, since: int = 0) -> AsyncIterator[str]:
+        """Yield log lines as they are written, until the job finishes"""
+        while True:
+            changed = self._changed
+            for line in self.lines_since(since):
+                yield line
+            since = self.line_count
+            if self.done:
+                return
+            await changed.wait()
+
+    def to_dict(self, since: int = 0) -> Dict:
+        finished = self.finished_at or datetime.now(timezone.utc)
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "returncode": self.returncode,
+            "error": self.error,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "duration_seconds": round((finished - self.started_at).total_seconds(), 3),
+            "line_count": self.line_count,
+            "log": self.lines_since(since),
+        }
+
+
+class UpdateJobRunner:
+    def __init__(self, jobs_collection, meta_collection, script: Path, timeout: float = UPDATE_JOB_TIMEOUT_SECONDS):
+        self.jobs_collection = jobs_collection
+        self.meta_collection = meta_collection
+        self.script = script
+        self.timeout = timeout
+        self.jobs: Dict[str, UpdateJob] = {}  # Recent jobs started by this worker
+        self._tasks = set()
+
+    async def _acquire_lease(self, job_id: str) -> None:
+        now = datetime.now(timezone.utc)
+        try:
+            await self.meta_collection.find_one_and_update(
+                {"_id": LOCK_DOC_ID, "$or": [{"job_id": None}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"job_id": job_id, "pid": os.getpid(), "expires_at": now + timedelta(seconds=self.timeout + 60)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The lock document exists and is held: the upsert tried to insert a second one
+            holder = await self.meta_collection.find_one({"_id": LOCK_DOC_ID}, {"job_id": 1})
+            raise JobAlreadyRunning(holder.get("job_id") if holder else None)
+
+    async def _release_lease(self, job_id: str) -> None:
+        await self.meta_collection.update_one({"_id": LOCK_DOC_ID, "job_id": job_id}, {"$set": {"job_id": None}})
+
+    async def start(self) -> UpdateJob:
+        """Start an update and return at once; raises JobAlreadyRunning if one is in progress anywhere"""
+        job_id = str(uuid.uuid4())
+        await self._acquire_lease(job_id)
+        job = UpdateJob(job_id, [sys.executable, "-u", str(self.script)])
+        self.jobs[job_id] = job
+        for old_id in list(self.jobs)[:-RECENT_JOBS_KEPT]:
+            if self.jobs[old_id].done:
+                del self.jobs[old_id]
+        await self._save(job)
+
+        task = asyncio.create_task(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, job: UpdateJob) -> None:
+        process = None
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *job.command,
+                cwd=str(self.script.parent),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                env={**os.environ, "PYTHONIOENCODING": "utf-8"},
+            )
+            await asyncio.wait_for(self._pump(job, process), self.timeout)
+            returncode = await process.wait()
+            job.finish("succeeded" if returncode == 0 else "failed", returncode)
+        except asyncio.TimeoutError:
+            process.kill()
+            job.finish("failed", await process.wait(), f"Timed out after {self.timeout}s")
+        except asyncio.CancelledError:
+            if process is not None and process.returncode is None:
+                process.kill()
+            job.finish("failed", error="Interrupted by server shutdown")
+            raise
+        except Exception as e:
+            logger.error(f"Ontology update job {job.id} failed: {e}")
+            job.finish("failed", error=str(e))
+        finally:
+            try:
+                await self._save(job)
+                await self._release_lease(job.id)
+            except Exception as e:
+                logger.error(f"Could not record ontology update job {job.id}: {e}")
+            logger.info(f"Ontology update job {job.id} {job.status} in {job.to_dict()['duration_seconds']}s")
+
+    async def _pump(self, job: UpdateJob, process) -> None:
+        async for raw in process.stdout:
+            job.append(raw.decode('utf-8', errors='replace').rstrip('\n'))
+
+    async def _save(self, job: UpdateJob) -> None:
+        doc = job.to_dict()
+        doc["log"] = job.lines[-200:]  # Enough for other workers to show how it ended
+        await self.jobs_collection.replace_one({"_id": job.id}, doc, upsert=True)
+
+    async def get(self, job_id: str, since: int = 0) -> Optional[Dict]:
+        """Live state if this worker runs the job, else the last recorded state"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_dict(since)
+        doc = await self.jobs_collection.find_one({"_id": job_id}, {"_id": 0})
+        if doc is not None and since:
+            doc["log"] = doc["log"][max(0, since - (doc["line_count"] - len(doc["log"]))):]
+        return doc
+
+    def stats(self) -> Dict:
+        running = [job.id for job in self.jobs.values() if not job.done]
+        return {"running": running, "recent": len(self.jobs)}
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,235 @@
+"""
+Size limits and admission control for resume uploads.
+
+Starlette spools multipart file parts larger than 1 MB to a temporary
+file, so an upload does not sit in memory while the request body
+arrives. Three checks keep the rest bounded:
+- requests whose Content-Length is already over the limit are rejected
+  with 413 before the body is read;
+- read_limited() copies an upload into memory in UPLOAD_READ_CHUNK_BYTES
+  chunks and stops as soon as it passes the limit (chunked requests have
+  no Content-Length);
+- an AdmissionGate lets at most UPLOAD_CONCURRENCY uploads read and parse
+  at once, so peak memory is about UPLOAD_CONCURRENCY * UPLOAD_MAX_BYTES.
+
+Callers beyond that wait for a slot, but only up to UPLOAD_MAX_WAITING of
+them and for at most UPLOAD_QUEUE_TIMEOUT seconds. Past either limit they
+get Overloaded: 429 when the queue is full, 503 when the wait timed out.
+Both carry a Retry-After estimated from how long slots are being held.
+
+Batch uploads hold every file (and every expanded zip member) in memory
+until their results have streamed, so they are bounded by bytes instead: a
+ByteBudget of UPLOAD_BUFFER_BYTES per worker, reserved from the sizes the
+multipart parser already knows before any file is read into memory. The
+streamed response gives them back (BudgetedStreamingResponse), also when
+the client disconnects before the body starts and the generator never runs.
+"""
+import asyncio
+import math
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from starlette.responses import StreamingResponse
+
+from extraction import BATCH_UPLOAD_MAX_FILE_BYTES
+
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', BATCH_UPLOAD_MAX_FILE_BYTES))
+UPLOAD_BATCH_MAX_BYTES = int(os.environ.get('UPLOAD_BATCH_MAX_BYTES', 200 * 1024 * 1024))  # Whole request body
+UPLOAD_READ_CHUNK_BYTES = int(os.environ.get('UPLOAD_READ_CHUNK_BYTES', 64 * 1024))
+UPLOAD_CONCURRENCY = int(os.environ.get('UPLOAD_CONCURRENCY', max(2, os.cpu_count() or 2)))
+UPLOAD_MAX_WAITING = int(os.environ.get('UPLOAD_MAX_WAITING', 16))
+UPLOAD_QUEUE_TIMEOUT = float(os.environ.get('UPLOAD_QUEUE_TIMEOUT', 10))
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # Boundaries, part headers and small form fields
+UPLOAD_BUFFER_BYTES = int(os.environ.get('UPLOAD_BUFFER_BYTES', 2 * UPLOAD_BATCH_MAX_BYTES))  # Batch bytes per worker
+HOLD_SECONDS_SMOOTHING = 0.2  # Weight of the newest slot hold time in the moving average
+
+
+class UploadTooLarge(Exception):
+    def __init__(self, limit: int):
+        super().__init__(f"Upload is larger than {limit} bytes")
+        self.limit = limit
+
+
+class Overloaded(Exception):
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(f"Server is busy ({reason}), retry in {retry_after}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def declared_too_large(content_length: Optional[str], limit: int) -> bool:
+    """True when a multipart body's Content-Length cannot fit a file of ``limit`` bytes"""
+    try:
+        return content_length is not None and int(content_length) > limit + MULTIPART_OVERHEAD_BYTES
+    except ValueError:
+        return False
+
+
+async def read_limited(upload, limit: int = UPLOAD_MAX_BYTES, chunk_size: int = UPLOAD_READ_CHUNK_BYTES) -> bytes:
+    """The upload's bytes, raising UploadTooLarge as soon as more than ``limit`` arrive"""
+    chunks, size = [], 0
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            return b"".join(chunks)
+        size += len(chunk)
+        if size > limit:
+            raise UploadTooLarge(limit)
+        chunks.append(chunk)
+
+
+class AdmissionGate:
+    def __init__(
+        self,
+        capacity: int = UPLOAD_CONCURRENCY,
+        max_waiting: int = UPLOAD_MAX_WAITING,
+        timeout: float = UPLOAD_QUEUE_TIMEOUT,
+    ):
+        self.capacity = capacity
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(capacity)
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+        self.hold_seconds = 1.0  # Moving average of how long a slot is held
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has probably drained"""
+        return max(1, math.ceil(self.hold_seconds * (self.waiting + 1) / self.capacity))
+
+    def check(self) -> None:
+        """Raise Overloaded(429) if a new caller would find the queue full"""
+        if self.in_use >= self.capacity and self.waiting >= self.max_waiting:
+            self.rejected["queue_full"] += 1
+            raise Overloaded(429, "queue_full", self.retry_after())
+
+    @asynccontextmanager
+    async def slot(self, reject: bool = True):
+        """
+        Hold one of the ``capacity`` slots. With reject=False the caller
+        waits however long it takes (used for the files of a batch that was
+        already admitted).
+        """
+        if reject:
+            self.check()
+        self.waiting += 1
+        try:
+            if reject:
+                await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+            else:
+                await self._semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.rejected["timeout"] += 1
+            raise Overloaded(503, "timeout", self.retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.in_use += 1
+        self.admitted += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        started = asyncio.get_running_loop().time()
+        try:
+            yield
+        finally:
+            held = asyncio.get_running_loop().time() - started
+            self.hold_seconds += HOLD_SECONDS_SMOOTHING * (held - self.hold_seconds)
+            self.in_use -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "capacity": self.capacity,
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "peak_in_use": self.peak_in_use,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_hold_seconds": round(self.hold_seconds, 3),
+        }
+
+
+class ByteBudget:
+    """
+    Bytes of batch uploads one worker may hold in memory at once. Callers
+    reserve what they are about to read and release it when done; while the
+    budget is spent they wait, with the same queue limit and timeout as
+    AdmissionGate.
+    """
+
+    def __init__(
+        self,
+        capacity: int = UPLOAD_BUFFER_BYTES,
+        max_waiting: int = UPLOAD_MAX_WAITING,
+        timeout: float = UPLOAD_QUEUE_TIMEOUT,
+    ):
+        self.capacity = capacity
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.in_use = 0
+        self.waiting = 0
+        self.peak_in_use = 0
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0, "too_large": 0}
+        self._released = asyncio.Event()
+
+    def check(self, nbytes: int = 1) -> None:
+        """Raise Overloaded(429) if ``nbytes`` do not fit now and the queue is full"""
+        if self.in_use + nbytes > self.capacity and self.waiting >= self.max_waiting:
+            self.rejected["queue_full"] += 1
+            raise Overloaded(429, "queue_full", max(1, math.ceil(self.timeout)))
+
+    async def reserve(self, nbytes: int) -> None:
+        """Wait until ``nbytes`` fit; UploadTooLarge if they never can"""
+        if nbytes > self.capacity:
+            self.rejected["too_large"] += 1
+            raise UploadTooLarge(self.capacity)
+        self.check(nbytes)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        self.waiting += 1
+        try:
+            while self.in_use + nbytes > self.capacity:
+                self._released.clear()
+                await asyncio.wait_for(self._released.wait(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            self.rejected["timeout"] += 1
+            raise Overloaded(503, "timeout", max(1, math.ceil(self.timeout)))
+        finally:
+            self.waiting -= 1
+        self.in_use += nbytes
+        self.admitted += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def release(self, nbytes: int) -> None:
+        self.in_use -= nbytes
+        self._released.set()
+
+    def stats(self) -> Dict:
+        return {
+            "capacity_bytes": self.capacity,
+            "in_use_bytes": self.in_use,
+            "peak_in_use_bytes": self.peak_in_use,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
+
+
+class BudgetedStreamingResponse(StreamingResponse):
+    """A StreamingResponse that releases ``nbytes`` of ``budget`` once it has been sent or abandoned"""
+
+    def __init__(self, content, budget: ByteBudget, nbytes: int, **kwargs):
+        super().__init__(content, **kwargs)
+        self.budget = budget
+        self.nbytes = nbytes
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.budget.release(self.nbytes)
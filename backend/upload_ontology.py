@@ -4,6 +4,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from dotenv import load_dotenv
 from pathlib import Path
+from ontology_sync import META_COLLECTION, bump_ontology_version
 
 # --- IMPORTANT: SET UP YOUR .env FILE ---
 # Make sure your backend/.env file contains the
@@ -103,6 +104,10 @@ async def migrate_ontology():
         client.close()
         return
 
+    # --- 3. Tell running servers to reload ---
+    version = await bump_ontology_version(db[META_COLLECTION])
+    print(f"✓ Bumped ontology version to {version}.")
+
     print("\n--- ✅ MIGRATION COMPLETE ---")
     print("Your ontology is now in MongoDB Atlas.")
     client.close()
@@ -0,0 +1,196 @@
+"""
+Write-behind batching for documents nobody reads back right away.
+
+Requests hand their documents to a bounded in-process queue and return; a
+background task writes them with insert_many once WRITE_BEHIND_BATCH_SIZE
+documents are waiting or WRITE_BEHIND_FLUSH_SECONDS after the first one
+arrived, whichever comes first. When the queue is full the overflow policy
+decides what happens:
+- "block": the request waits for room (backpressure);
+- "sync":  the request writes its documents itself;
+- "drop":  the documents are discarded and counted.
+close() writes everything still queued; call it on shutdown.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+WRITE_BEHIND_BATCH_SIZE = int(os.environ.get('WRITE_BEHIND_BATCH_SIZE', 100))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.environ.get('WRITE_BEHIND_FLUSH_SECONDS', 0.25))
+WRITE_BEHIND_MAX_QUEUE = int(os.environ.get('WRITE_BEHIND_MAX_QUEUE', 5000))
+WRITE_BEHIND_OVERFLOW = os.environ.get('WRITE_BEHIND_OVERFLOW', 'block')  # "block", "sync" or "drop"
+WRITE_BEHIND_RETRIES = int(os.environ.get('WRITE_BEHIND_RETRIES', 3))
+OVERFLOW_POLICIES = ("block", "sync", "drop")
+DUPLICATE_KEY_ERROR = 11000  # Already written, e.g. by an attempt whose reply was lost
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindQueue:
+    def __init__(
+        self,
+        collection,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_seconds: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_queue: int = WRITE_BEHIND_MAX_QUEUE,
+        overflow: str = WRITE_BEHIND_OVERFLOW,
+        retries: int = WRITE_BEHIND_RETRIES,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown WRITE_BEHIND_OVERFLOW: {overflow}")
+        self.collection = collection
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.retries = retries
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.peak_depth = 0
+        self.counters = {"enqueued": 0, "written": 0, "sync_writes": 0, "dropped": 0, "failed": 0, "flushes": 0}
+        self.flush_seconds_total = 0.0
+        self.max_flush_seconds = 0.0
+        self.last_flush_seconds = 0.0
+        self.max_queue_delay = 0.0  # Longest a document waited before its flush started
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, doc: Dict) -> None:
+        await self.put_many([doc])
+
+    async def put_many(self, docs: List[Dict]) -> None:
+        if self._task is None or self._task.done():
+            await self._write_now(docs)  # Not started (or already closed): plain synchronous write
+            return
+
+        enqueued_at = time.perf_counter()
+        for index, doc in enumerate(docs):
+            item = (enqueued_at, doc)
+            if self.overflow == "block":
+                await self._queue.put(item)
+            else:
+                try:
+                    self._queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    rest = docs[index:]
+                    if self.overflow == "sync":
+                        await self._write_now(rest)
+                    else:
+                        self.counters["dropped"] += len(rest)
+                        logger.warning(f"Write-behind queue full, dropped {len(rest)} document(s)")
+                    break
+            self.counters["enqueued"] += 1
+            self.peak_depth = max(self.peak_depth, self._queue.qsize())
+
+    async def _write_now(self, docs: List[Dict]) -> None:
+        await self.collection.insert_many(docs, ordered=False)
+        self.counters["sync_writes"] += len(docs)
+
+    async def _flush(self, batch: List) -> None:
+        started = time.perf_counter()
+        self.max_queue_delay = max(self.max_queue_delay, started - batch[0][0])
+        docs = [doc for _, doc in batch]
+        for attempt in range(self.retries + 1):
+            try:
+                await self.collection.insert_many(docs, ordered=False)
+                self.counters["written"] += len(docs)
+                break
+            except BulkWriteError as e:
+                # Unordered: everything but the write errors went in. Retry only
+                # the documents that failed for a reason other than a duplicate key.
+                failed = [
+                    error["index"] for error in e.details.get("writeErrors", [])
+                    if error.get("code") != DUPLICATE_KEY_ERROR
+                ]
+                self.counters["written"] += len(docs) - len(failed)
+                docs = [docs[index] for index in failed]
+                if not docs:
+                    break
+                error = e
+            except Exception as e:
+                error = e
+            if attempt == self.retries:
+                self.counters["failed"] += len(docs)
+                logger.error(f"Write-behind flush of {len(docs)} document(s) failed, giving up: {error}")
+            else:
+                logger.warning(f"Write-behind flush of {len(docs)} document(s) failed (attempt {attempt + 1}): {error}")
+                await asyncio.sleep(min(2 ** attempt * 0.1, 2.0))
+
+        elapsed = time.perf_counter() - started
+        self.counters["flushes"] += 1
+        self.flush_seconds_total += elapsed
+        self.last_flush_seconds = elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Drain whatever arrived behind the stop marker
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start:start + self.batch_size])
+
+    async def close(self) -> None:
+        """Write everything still queued, then stop the writer"""
+        if self._task is None:
+            return
+        if not self._task.done():
+            await self._queue.put(_STOP)
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    def stats(self) -> Dict:
+        flushes = self.counters["flushes"]
+        return {
+            **self.counters,
+            "overflow": self.overflow,
+            "depth": self.depth,
+            "max_queue": self.max_queue,
+            "peak_depth": self.peak_depth,
+            "avg_flush_seconds": round(self.flush_seconds_total / flushes, 4) if flushes else 0.0,
+            "last_flush_seconds": round(self.last_flush_seconds, 4),
+            "max_flush_seconds": round(self.max_flush_seconds, 4),
+            "max_queue_delay_seconds": round(self.max_queue_delay, 4),
+        }
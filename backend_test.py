@@ -101,13 +101,30 @@ class NextStepAITester:
         )
 
     def test_trigger_ontology_update(self):
-        """Test triggering ontology update"""
-        return self.run_test(
+        """Test triggering ontology update (runs in the background; 202 with a job id)"""
+        success, response = self.run_test(
             "Trigger Ontology Update",
             "POST",
             "trigger-ontology-update",
+            202
+        )
+        job_id = response.get('job_id') if isinstance(response, dict) else None
+        if not success or not job_id:
+            if success:
+                print("❌ Failed - No job_id in the response")
+            return False, response
+
+        success, job = self.run_test(
+            "Ontology Update Job Status",
+            "GET",
+            f"ontology-update-jobs/{job_id}",
             200
         )
+        if success and (job.get('job_id') != job_id or job.get('status') not in ("running", "succeeded", "failed")):
+            print(f"❌ Failed - Unexpected job: {job.get('job_id')} with status {job.get('status')}")
+            self.tests_passed -= 1
+            success = False
+        return success, job
 
     def test_resume_upload_no_file(self):
         """Test resume upload without file"""
@@ -82,11 +82,26 @@ const AdminDashboard = () => {
     try {
       const response = await axios.post(`${API}/trigger-ontology-update`);
       toast.success("Ontology update triggered");
-      // Give the backend a moment to run before fetching
-      setTimeout(fetchPendingUpdates, 2000);
+      // The update runs as a background job; wait for it before fetching
+      const jobId = response.data.job_id;
+      let job = { status: "running" };
+      while (job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        job = (await axios.get(`${API}/ontology-update-jobs/${jobId}?since=${job.line_count || 0}`)).data;
+      }
+      if (job.status === "succeeded") {
+        toast.success("Ontology update finished");
+      } else {
+        toast.error(`Ontology update failed${job.error ? `: ${job.error}` : ""}`);
+      }
+      fetchPendingUpdates();
     } catch (error) {
       console.error("Error triggering update:", error);
-      toast.error("Failed to trigger update");
+      if (error.response?.status === 409) {
+        toast.error("An ontology update is already running");
+      } else {
+        toast.error("Failed to trigger update");
+      }
     }
     setLoading(false);
   };
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# The backend is run from its own folder (uvicorn server:app), so its modules
+# import each other as top-level names.
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'nextstep_test')
+os.environ.setdefault('MATCHER_CACHE_DIR', tempfile.mkdtemp(prefix='matcher_cache-'))
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from analysis_cache import AnalysisCache, content_key
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = AnalysisCache(max_entries=2)
+    cache.invalidate("v1")
+    run(cache.put("a", "text a", ["Python"]))
+    run(cache.put("b", "text b", ["SQL"]))
+    assert run(cache.get("a"))["user_skills"] == ["Python"]  # a is now most recent
+    run(cache.put("c", "text c", ["Git"]))
+
+    assert run(cache.get("b")) is None
+    assert run(cache.get("c"))["text"] == "text c"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["evictions"], stats["entries"]) == (2, 1, 1, 2)
+
+
+def test_char_budget_bounds_memory():
+    cache = AnalysisCache(max_entries=100, max_chars=10)
+    cache.invalidate("v1")
+    run(cache.put("a", "x" * 6, []))
+    run(cache.put("b", "y" * 6, []))
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["chars"] == 6
+
+
+def test_invalidate_and_stale_put():
+    cache = AnalysisCache()
+    cache.invalidate("v1")
+    run(cache.put("a", "text", ["Python"]))
+    cache.invalidate("v1")  # Same skills fingerprint (e.g. a role was added): entries stay
+    assert run(cache.get("a"))["text"] == "text"
+    cache.invalidate("v2")
+    assert run(cache.get("a")) is None
+
+    run(cache.put("a", "text", ["Python"], version="v1"))  # computed before the reload
+    assert run(cache.get("a")) is None
+
+
+def test_mongo_second_tier():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["test"]["resume_analysis_cache"]
+    digest = content_key(b"%PDF resume bytes")
+
+    writer = AnalysisCache(collection=collection)
+    writer.invalidate("v1")
+    run(writer.put(digest, "text", ["Python"]))
+
+    reader = AnalysisCache(collection=collection)  # e.g. another worker
+    reader.invalidate("v1")
+    assert run(reader.get(digest))["user_skills"] == ["Python"]
+    assert run(reader.get(digest))["text"] == "text"
+    assert (reader.stats()["mongo_hits"], reader.stats()["memory_hits"]) == (1, 1)
+
+    reader.invalidate("v2")
+    assert run(reader.get(digest)) is None
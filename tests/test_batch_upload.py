@@ -0,0 +1,40 @@
+import asyncio
+import io
+
+from starlette.datastructures import UploadFile
+
+import server
+
+
+def test_reservation_is_released_when_the_client_leaves_before_the_body(monkeypatch):
+    async def read_batch_upload(files):
+        return [(upload.filename, upload.file.read()) for upload in files]
+
+    monkeypatch.setattr(server, "is_ready", lambda: True)
+    monkeypatch.setattr(server, "ensure_fresh_ontology", lambda: None)
+    monkeypatch.setattr(server, "read_batch_upload", read_batch_upload)
+    started = []
+
+    async def never_started(*args):
+        started.append(True)
+        yield b""
+
+    monkeypatch.setattr(server, "analyze_batch", never_started)
+
+    async def scenario():
+        data = b"%PDF resume"
+        upload = UploadFile(io.BytesIO(data), size=len(data), filename="resume.pdf")
+        response = await server.upload_resumes(files=[upload], experience=None)
+        assert server.batch_budget.in_use == len(data)
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            await asyncio.sleep(3600)  # The client is gone; nothing is ever delivered
+
+        await response({"type": "http", "asgi": {"spec_version": "2.3"}}, receive, send)
+        assert started == []  # The generator never ran, so its finally could not release anything
+        assert server.batch_budget.in_use == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+import random
+
+import pytest
+
+from candidate_index import CandidateIndex, SkillIds
+from scoring_engine import ScoringEngine
+
+SKILLS = [f"skill{n}" for n in range(100)]  # Two uint64 words per analysis
+ROLE = {
+    "title": "Data Engineer",
+    "skill_weights": [
+        {"skill": "skill3", "weight": 1.0, "is_core": True},
+        {"skill": "skill70", "weight": 1.0, "is_core": True},
+        {"skill": "skill12", "weight": 0.5},
+        {"skill": "skill99", "weight": 0.8},
+        {"skill": "Unknown", "weight": 0.6},
+    ],
+}
+
+
+def skill_ids(names=SKILLS) -> SkillIds:
+    ids = SkillIds()
+    ids._set(list(names))
+    return ids
+
+
+def test_search_ranks_like_the_scoring_engine():
+    rng = random.Random(3)
+    ids = skill_ids()
+    index = CandidateIndex(ids, capacity=4)  # Grows several times
+    analyses = {f"a{n}": rng.sample(SKILLS, rng.randint(0, 30)) for n in range(500)}
+    for analysis_id, skills in analyses.items():
+        index.add(analysis_id, ids.encode(skills))
+
+    engine = ScoringEngine([ROLE])
+    expected = {analysis_id: round(float(engine.score(skills)["match_score"][0]), 1) for analysis_id, skills in analyses.items()}
+    results = index.search(ROLE, limit=25)
+
+    assert len(results) == 25
+    assert all(result["match_score"] == expected[result["analysis_id"]] for result in results)
+    scores = [result["match_score"] for result in results]
+    assert scores == sorted(scores, reverse=True)
+    assert scores[0] == max(expected.values())
+    assert index.search(ROLE, limit=5, min_score=scores[0]) == []
+    assert index.search({"title": "Empty", "skill_weights": [{"skill": "Unknown"}]}) == []
+
+
+def test_ties_prefer_newer_analyses_and_new_skills_widen_rows():
+    ids = skill_ids(SKILLS[:10])
+    index = CandidateIndex(ids)
+    index.add("old", ids.encode(["skill3"]))
+    index.add("new", ids.encode(["skill3"]))
+    ids._set(SKILLS)  # skill70 and skill99 get ids beyond the first word
+    index.add("wide", ids.encode(["skill3", "skill70", "skill99"]))
+
+    assert [r["analysis_id"] for r in index.search(ROLE, limit=2)] == ["wide", "new"]
+    assert index.search(ROLE)[0]["matched_skills"] == 3
+    assert index.stats()["words_per_analysis"] == 2
+
+
+def test_skill_ids_are_shared_and_stable():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient()["test"]["ontology_meta"]
+    analyses = mongomock_motor.AsyncMongoMockClient()["test"]["resume_analyses"]
+
+    async def scenario():
+        first, second = SkillIds(), SkillIds()
+        await first.sync(collection, ["Python", "SQL"])
+        await second.sync(collection, ["Docker", "SQL"])
+        await first.sync(collection, ["Docker"])
+        assert first.names == second.names == ["Python", "SQL", "Docker"]
+
+        await analyses.insert_many([
+            {"id": "a1", "skill_bits": first.encode(["Docker"])},
+            {"id": "a2", "user_skills": ["Python", "Docker"]},  # Saved before skill_bits existed
+            {"id": "a3", "user_skills": ["SQL"]},
+        ])
+        index = CandidateIndex(first)
+        index.add("a3", first.encode(["SQL"]))  # Arrived live while loading
+        await index.load(analyses)
+        role = {"title": "Ops", "skill_weights": [{"skill": "Docker", "weight": 1.0, "is_core": True}]}
+        return index, [r["analysis_id"] for r in index.search(role)]
+
+    index, found = asyncio.run(scenario())
+    assert found == ["a2", "a1"]
+    assert len(index) == 3 and not index.loading
+    assert index.load_stats == {"loaded": 2, "encoded_from_skills": 1}
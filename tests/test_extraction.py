@@ -0,0 +1,46 @@
+import io
+import zipfile
+
+import pytest
+
+from extraction import expand_zip
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+def test_expand_zip_keeps_only_resumes():
+    archive = make_zip({
+        "batch/a.pdf": b"pdf",
+        "batch/b.docx": b"docx",
+        "batch/notes.txt": b"skip",
+        "__MACOSX/batch/._a.pdf": b"skip",
+    })
+    assert expand_zip(archive) == [("batch/a.pdf", b"pdf"), ("batch/b.docx", b"docx")]
+
+
+def test_expand_zip_enforces_limits():
+    archive = make_zip({"a.pdf": b"x" * 10, "b.pdf": b"y"})
+    with pytest.raises(ValueError):
+        expand_zip(archive, max_files=1)
+    with pytest.raises(ValueError):
+        expand_zip(archive, max_file_bytes=5)
+
+
+def test_expand_zip_caps_total_decompressed_bytes():
+    # 40 x 1 MB of zeros deflates to a few kB: a small zip bomb
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for n in range(40):
+            archive.writestr(f"r{n}.pdf", b"\0" * 1024 * 1024)
+    bomb = buffer.getvalue()
+    assert len(bomb) < 100 * 1024
+
+    with pytest.raises(ValueError, match="expands to more than"):
+        expand_zip(bomb, max_total_bytes=8 * 1024 * 1024)
+    assert len(expand_zip(bomb, max_total_bytes=64 * 1024 * 1024)) == 40
@@ -0,0 +1,64 @@
+import spacy
+
+import fuzzy_matcher
+from extraction import build_skill_matcher, match_skills, skill_terms
+from fuzzy_matcher import FuzzyMatcher, FuzzySkillIndex, osa_distance
+from ontology_state import OntologySnapshot
+
+SKILLS = {
+    "Python": {"aliases": ["py"]},
+    "PostgreSQL": {"aliases": ["postgres"]},
+    "Node.js": {"aliases": ["nodejs"]},
+    "Kubernetes": {"aliases": ["k8s"]},
+    "React": {},
+}
+
+
+def found(nlp, matcher, text):
+    return sorted(match_skills(nlp, matcher, text, mode="tokenizer"))
+
+
+def test_variants_are_matched_after_exact_patterns():
+    nlp = spacy.blank("en")
+    terms = skill_terms(SKILLS)
+    matcher = FuzzyMatcher(build_skill_matcher(nlp, terms), FuzzySkillIndex(terms))
+
+    assert found(nlp, matcher, "Pyhton, postgre sql and Node JS") == ["Node.js", "PostgreSQL", "Python"]
+    assert found(nlp, matcher, "ran kubernetse clusters, p0stgresql tooling") == ["Kubernetes", "PostgreSQL"]
+    assert found(nlp, matcher, "react") == ["React"]
+    # Short words get no edit budget; a fuzzy hit must keep the first letter
+    assert found(nlp, matcher, "we reach out to people, ython") == []
+    assert len(matcher) == len(matcher.exact)
+
+
+def test_common_words_near_a_skill_are_not_matched():
+    nlp = spacy.blank("en")
+    terms = skill_terms({**SKILLS, "Docker": {}, "Scala": {}, "Rust": {}})
+    matcher = FuzzyMatcher(build_skill_matcher(nlp, terms), FuzzySkillIndex(terms))
+
+    assert found(nlp, matcher, "filed the docket, docked the boat, at scale, a rest api, rusty") == []
+    # Under FUZZY_MIN_LENGTH only adjacent swaps are typos
+    assert found(nlp, matcher, "dokcer and pytohn") == ["Docker", "Python"]
+
+
+def test_edit_budget_is_configurable(monkeypatch):
+    monkeypatch.setattr(fuzzy_matcher, "FUZZY_MAX_EDIT_DISTANCE", 0)
+    nlp = spacy.blank("en")
+    terms = skill_terms(SKILLS)
+    matcher = FuzzyMatcher(build_skill_matcher(nlp, terms), FuzzySkillIndex(terms, max_distance=0))
+    assert found(nlp, matcher, "pyhton and postgre sql") == ["PostgreSQL"]  # Joined lookups stay exact
+
+    assert osa_distance("pyhton", "python", 2) == 1
+    assert osa_distance("kubernetse", "kubernetes", 2) == 1
+    assert osa_distance("javascript", "java", 2) == 3
+
+
+def test_snapshot_deltas_extend_the_fuzzy_index():
+    nlp = spacy.blank("en")
+    base = OntologySnapshot.build(1, nlp, dict(SKILLS), [])
+    grown = base.with_skill(nlp, "Terraform", {"aliases": []})
+
+    assert found(nlp, base.matcher, "terrafrom") == []
+    assert found(nlp, grown.matcher, "terrafrom and pyhton") == ["Python", "Terraform"]
+    assert grown.base_fuzzy is base.base_fuzzy
+    assert base.stats()["fuzzy"] == fuzzy_matcher.fuzzy_signature()
@@ -0,0 +1,69 @@
+import csv
+import gzip
+import json
+
+import pytest
+import spacy
+
+from extraction import skill_terms
+from job_postings import count_skill_mentions, iter_postings
+
+POSTINGS = [
+    {"title": "Backend Engineer", "description": "Python and SQL, python again. Docker a plus."},
+    {"title": "Data Analyst", "skills": ["SQL", "Excel"]},
+    {"title": "", "description": ""},
+    {"title": "Frontend Developer", "description": "React, JS"},
+]
+SKILLS = {"Python": {}, "SQL": {"aliases": ["postgres"]}, "Docker": {}, "React": {"aliases": ["react.js"]}, "Go": {}}
+
+
+def write_jsonl(path, opener=open):
+    with opener(path, "wt", encoding="utf-8") as f:
+        for posting in POSTINGS:
+            f.write(json.dumps(posting) + "\n")
+        f.write("{not json\n\n")
+    return path
+
+
+def write_csv(path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["title", "description"])
+        writer.writeheader()
+        for posting in POSTINGS:
+            writer.writerow({"title": posting["title"], "description": posting.get("description", "")})
+    return path
+
+
+@pytest.mark.parametrize("name", ["postings.jsonl", "postings.jsonl.gz", "postings.csv"])
+def test_iter_postings_reads_every_format(tmp_path, name):
+    path = tmp_path / name
+    if name.endswith(".csv"):
+        write_csv(path)
+    else:
+        write_jsonl(path, gzip.open if name.endswith(".gz") else open)
+
+    counts = {}
+    texts = list(iter_postings(path, counts))
+    assert texts[0] == "Backend Engineer\nPython and SQL, python again. Docker a plus."
+    assert len(texts) == 3
+    assert counts["skipped"] == (1 if name.endswith(".csv") else 2)  # Empty posting (+ the bad JSON line)
+
+
+def test_iter_postings_rejects_unknown_formats(tmp_path):
+    path = tmp_path / "postings.xml"
+    path.write_text("<postings/>")
+    with pytest.raises(ValueError):
+        list(iter_postings(path))
+
+
+def test_mentions_are_counted_once_per_posting(tmp_path):
+    path = write_jsonl(tmp_path / "postings.jsonl")
+    progress = []
+    mentions, stats = count_skill_mentions(
+        path, skill_terms(SKILLS), workers=1, chunk_size=2, nlp=spacy.blank("en"), progress=progress.append
+    )
+    assert mentions == {"Python": 1, "SQL": 2, "Docker": 1, "React": 1}
+    assert stats["postings"] == 3
+    assert stats["chunks"] == 2
+    assert stats["skipped"] == 2
+    assert stats["postings_per_second"] > 0
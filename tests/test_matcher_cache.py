@@ -0,0 +1,50 @@
+import spacy
+
+from extraction import _skills_in_doc, build_skill_matcher
+from matcher_cache import load_skill_matcher
+
+TERMS = [
+    ("Python", ["python", "py", "python3"]),
+    ("Node.js", ["node.js", "nodejs"]),
+    ("Machine Learning", ["machine learning", "ml"]),
+]
+TEXT = "built ml models in python3 and services with nodejs"
+
+
+def skills(nlp, matcher, text=TEXT):
+    return sorted(_skills_in_doc(nlp, matcher, nlp.make_doc(text)))
+
+
+def test_second_load_comes_from_cache(tmp_path):
+    nlp = spacy.blank("en")
+    matcher, info = load_skill_matcher(nlp, TERMS, cache_dir=tmp_path)
+    assert info["source"] == "built"
+    assert info["patterns"] == 7
+
+    cached_matcher, cached_info = load_skill_matcher(spacy.blank("en"), TERMS, cache_dir=tmp_path)
+    assert cached_info["source"] == "cache"
+    assert cached_info["fingerprint"] == info["fingerprint"]
+    assert skills(nlp, matcher) == skills(nlp, cached_matcher) == ["Machine Learning", "Node.js", "Python"]
+    assert skills(nlp, cached_matcher) == skills(nlp, build_skill_matcher(nlp, TERMS))
+
+
+def test_changed_terms_rebuild_and_replace_cache(tmp_path):
+    nlp = spacy.blank("en")
+    _, first = load_skill_matcher(nlp, TERMS, cache_dir=tmp_path)
+    changed = TERMS + [("Docker", ["docker"])]
+    matcher, second = load_skill_matcher(nlp, changed, cache_dir=tmp_path)
+
+    assert second["source"] == "built"
+    assert second["fingerprint"] != first["fingerprint"]
+    assert len(list(tmp_path.iterdir())) == 1
+    assert "Docker" in skills(nlp, matcher, "shipped it with docker")
+
+
+def test_corrupt_cache_is_rebuilt(tmp_path):
+    nlp = spacy.blank("en")
+    load_skill_matcher(nlp, TERMS, cache_dir=tmp_path)
+    for path in tmp_path.iterdir():
+        path.write_bytes(b"not msgpack")
+    matcher, info = load_skill_matcher(nlp, TERMS, cache_dir=tmp_path)
+    assert info["source"] == "built"
+    assert skills(nlp, matcher) == ["Machine Learning", "Node.js", "Python"]
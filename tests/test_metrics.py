@@ -0,0 +1,48 @@
+from metrics import Counter, Gauge, Histogram, Registry, StageTimer
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("op_seconds", "Op latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "parse")
+
+    lines = histogram.render()
+    assert lines[:2] == ["# HELP op_seconds Op latency", "# TYPE op_seconds histogram"]
+    assert 'op_seconds_bucket{stage="parse",le="0.1"} 2' in lines  # le is inclusive
+    assert 'op_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+    assert 'op_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+    assert 'op_seconds_sum{stage="parse"} 3.65' in lines
+    assert 'op_seconds_count{stage="parse"} 4' in lines
+
+
+def test_registry_renders_gauges_and_escapes_labels():
+    registry = Registry()
+    size = [3]
+    registry.register(Gauge("items", "Items", lambda: size[0]))
+    counter = registry.register(Counter("events_total", "Events", ("kind",)))
+    counter.inc('say "hi"\n')
+    size[0] = 5
+
+    text = registry.render()
+    assert "items 5\n" in text
+    assert 'events_total{kind="say \\"hi\\"\\n"} 1\n' in text
+    assert text.endswith("\n")
+
+
+def test_stage_timer_observes_each_stage_once():
+    histogram = Histogram("stage_seconds", "Stages", ("operation", "stage"))
+    timer = StageTimer(histogram, "upload")
+    with timer.stage("read"):
+        pass
+    timer.add("parse", 0.02)
+    timer.add("parse", 0.01)
+    timer.finish()
+    timer.finish()  # The error path calls it again
+
+    assert set(timer.stages) == {"read", "parse", "total"}
+    assert abs(timer.stages["parse"] - 0.03) < 1e-9
+    assert histogram._series[("upload", "parse")][2] == 1
+    assert histogram._series[("upload", "total")][2] == 1
+    header = timer.server_timing()
+    assert header.startswith("read;dur=")
+    assert "parse;dur=30.00" in header
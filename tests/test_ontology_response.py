@@ -0,0 +1,47 @@
+import gzip
+import json
+from types import SimpleNamespace
+
+from ontology_response import OntologyResponseCache, etag_matches, pick_encoding, render_view
+
+ONTOLOGY = {
+    "skills": {"Python": {"aliases": ["py"]}, "SQL": {"aliases": []}, "Docker": {"aliases": []}},
+    "job_roles": [{"title": "Data Analyst"}, {"title": "Backend Dev"}],
+}
+
+
+def test_views_and_pagination():
+    full = render_view(ONTOLOGY, ("full", 0, None))
+    assert json.loads(full.body) == ONTOLOGY
+
+    names = json.loads(render_view(ONTOLOGY, ("names", 1, 1)).body)
+    assert names["skills"] == ["SQL"]
+    assert names["job_roles"] == ["Backend Dev"]
+    assert names["page"] == {"offset": 1, "limit": 1, "total_skills": 3, "total_job_roles": 2}
+
+
+def test_compression_and_etags():
+    view = render_view(ONTOLOGY, ("full", 0, None))
+    body, etag = view.encode("gzip")
+    assert gzip.decompress(body) == view.body
+    assert view.encode("gzip")[0] is body  # Compressed once
+    assert etag_matches(etag, view.etag)
+    assert etag_matches(f'W/"{view.etag}", "other"', view.etag)
+    assert not etag_matches('"other"', view.etag)
+    assert pick_encoding("gzip;q=0, deflate") is None
+    assert pick_encoding("deflate, gzip") == "gzip"
+
+
+def test_cache_is_per_snapshot():
+    cache = OntologyResponseCache()
+    old, new = SimpleNamespace(), SimpleNamespace()
+    key = ("full", 0, None)
+
+    assert cache.get(old, key) is None
+    view = render_view(ONTOLOGY, key)
+    cache.put(old, key, view)
+    assert cache.get(old, key) is view
+
+    assert cache.get(new, key) is None
+    cache.put(old, key, view)  # Late render of the replaced snapshot is dropped
+    assert cache.get(new, key) is None
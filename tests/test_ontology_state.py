@@ -0,0 +1,68 @@
+import spacy
+
+import ontology_state
+from extraction import match_skills
+from ontology_state import OntologySnapshot
+
+SKILLS = {
+    "Python": {"aliases": ["py"]},
+    "SQL": {"aliases": ["mysql"]},
+}
+ROLES = [
+    {"title": "Data Analyst", "skill_weights": [{"skill": "SQL", "weight": 1.0, "is_core": True}]},
+]
+
+
+def found(nlp, snap, text):
+    return sorted(match_skills(nlp, snap.matcher, text, mode="tokenizer"))
+
+
+def test_skill_delta_leaves_base_and_old_snapshot_untouched():
+    nlp = spacy.blank("en")
+    base = OntologySnapshot.build(1, nlp, dict(SKILLS), list(ROLES))
+    grown = base.with_skill(nlp, "Terraform", {"aliases": ["iac"]})
+
+    text = "python, mysql and iac"
+    assert found(nlp, base, text) == ["Python", "SQL"]
+    assert found(nlp, grown, text) == ["Python", "SQL", "Terraform"]
+    assert grown.base_matcher is base.base_matcher
+    assert grown.version == 2
+    assert "Terraform" not in base.skills
+    assert grown.fingerprint != base.fingerprint
+
+
+def test_role_delta_appends_to_engine():
+    nlp = spacy.blank("en")
+    base = OntologySnapshot.build(1, nlp, dict(SKILLS), list(ROLES))
+    grown = base.with_role({"title": "Backend Dev", "skill_weights": [{"skill": "Python", "weight": 1.0}]})
+
+    assert [r["title"] for r in grown.job_roles] == ["Data Analyst", "Backend Dev"]
+    assert grown.engine.rank(["Python"], limit=1) == [1]
+    assert base.engine.num_roles == 1
+    assert grown.matcher is base.matcher
+    assert grown.fingerprint == base.fingerprint
+
+
+def test_delta_is_compacted_into_base(monkeypatch):
+    monkeypatch.setattr(ontology_state, "ONTOLOGY_DELTA_COMPACT_AT", 3)
+    nlp = spacy.blank("en")
+    snap = OntologySnapshot.build(1, nlp, dict(SKILLS), list(ROLES))
+    first_base = snap.base_matcher
+    for name in ("Docker", "Git"):
+        snap = snap.with_skill(nlp, name, {"aliases": []})
+    assert snap.base_matcher is first_base and len(snap.delta_terms) == 2
+
+    snap = snap.with_skill(nlp, "Linux", {"aliases": ["ubuntu"]})
+    assert snap.base_matcher is not first_base
+    assert snap.delta_terms == []
+    assert found(nlp, snap, "docker, git, ubuntu, py") == ["Docker", "Git", "Linux", "Python"]
+
+
+def test_role_graph_follows_role_changes_only():
+    nlp = spacy.blank("en")
+    base = OntologySnapshot.build(1, nlp, dict(SKILLS), list(ROLES))
+    with_skill = base.with_skill(nlp, "Terraform", {"aliases": ["iac"]})
+    with_role = base.with_role({"title": "Backend Dev", "skill_weights": [{"skill": "SQL", "weight": 1.0}]})
+
+    assert with_skill.role_graph is base.role_graph
+    assert [n["title"] for n in with_role.role_graph.nearest("Backend Dev")] == ["Data Analyst"]
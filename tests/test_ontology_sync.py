@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from ontology_sync import OntologyVersionSync, bump_ontology_version
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def meta_collection():
+    return mongomock_motor.AsyncMongoMockClient()["test"]["ontology_meta"]
+
+
+def test_worker_goes_stale_when_another_worker_bumps():
+    async def scenario():
+        collection = meta_collection()
+        worker_a = OntologyVersionSync(collection, mode="poll")
+        worker_b = OntologyVersionSync(collection, mode="poll")
+        for worker in (worker_a, worker_b):
+            worker.mark_loaded(await worker.read_version())
+        assert worker_a.loaded_version == 0
+
+        version = await worker_a.record_local_change()
+        assert version == 1
+        assert not worker_a.stale  # It applied the change itself
+        assert not await worker_a.check()
+        assert await worker_b.check()
+
+        worker_b.mark_loaded(await worker_b.read_version())
+        assert not worker_b.stale
+        assert worker_b.stats()["loaded_version"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_change_forces_reload():
+    async def scenario():
+        collection = meta_collection()
+        worker = OntologyVersionSync(collection, mode="poll")
+        worker.mark_loaded(await worker.read_version())
+        await bump_ontology_version(collection)  # e.g. upload_ontology.py or another worker
+        await worker.record_local_change()
+        assert worker.stale
+        assert worker.latest_version == 2
+
+    asyncio.run(scenario())
+
+
+def test_background_task_falls_back_to_polling():
+    async def scenario():
+        collection = meta_collection()
+        worker = OntologyVersionSync(collection, interval=0.01, mode="auto")
+        worker.mark_loaded(0)
+        worker.start()
+        await bump_ontology_version(collection)
+        for _ in range(100):
+            if worker.stale:
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+        assert worker.mode == "poll"  # The stand-in has no change streams
+        assert worker.stale
+
+    asyncio.run(scenario())
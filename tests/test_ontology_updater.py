@@ -0,0 +1,176 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ontology_sync import META_COLLECTION, read_ontology_version
+from ontology_updater import SKILLS_COLLECTION, OntologyUpdater, ensure_pending_update_indexes
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+ONTOLOGY = {
+    "skills": {"Python": {}, "Angular": {}, "jQuery": {}},
+    "job_roles": [{"title": "Data Analyst"}],
+}
+DISCOVERIES = {
+    "new_skills": [{"name": "GraphQL"}, {"name": "Terraform"}, {"name": "Python"}],
+    "new_roles": [{"title": "Junior Data Scientist"}, {"title": "Data Analyst"}],
+}
+STALE_SKILLS = {
+    "Angular": {"mention_frequency": 10, "last_seen_in_market": "2000-01-01"},
+    "jQuery": {"mention_frequency": 10},
+    "Python": {"mention_frequency": 5000},
+}
+
+
+async def seed_skills(db, skills):
+    await db[SKILLS_COLLECTION].insert_many([dict(data, _id=name) for name, data in skills.items()])
+
+
+def make_updater():
+    updater = OntologyUpdater()
+    updater.client = mongomock_motor.AsyncMongoMockClient()
+    updater.db = updater.client["test"]
+    updater.current_ontology = ONTOLOGY
+    return updater
+
+
+async def one_run(updater):
+    await updater.store_pending_updates(DISCOVERIES)
+    await updater.check_for_obsolete_skills()
+    await updater.write_pending_updates()
+
+
+def test_one_query_per_type_and_one_bulk_write():
+    async def scenario():
+        updater = make_updater()
+        await seed_skills(updater.db, STALE_SKILLS)
+        await ensure_pending_update_indexes(updater.db.pending_ontology_updates)
+        await one_run(updater)
+
+        assert updater.stats["candidates"] == 7
+        assert updater.stats["queries"] == 4  # Three existence checks + the obsolete-skill aggregation
+        assert updater.stats["bulk_writes"] == 1
+        assert updater.stats["inserted"] == 5  # GraphQL, Terraform, one role, two obsolete flags
+
+        docs = await updater.db.pending_ontology_updates.find({}, {"_id": 0}).to_list(None)
+        flagged = {doc["data"]["name"]: doc["discovery_reason"] for doc in docs if doc["type"] == "review_obsolete"}
+        assert set(flagged) == {"Angular", "jQuery"}
+        assert flagged["Angular"].startswith("Mention frequency")  # First reason wins
+
+        # A second run finds everything already pending
+        rerun = make_updater()
+        rerun.db = updater.db
+        await one_run(rerun)
+        assert rerun.stats["bulk_writes"] == 0
+        assert await updater.db.pending_ontology_updates.count_documents({}) == 5
+
+    asyncio.run(scenario())
+
+
+def test_unique_indexes_absorb_racing_runs():
+    async def scenario():
+        first, second = make_updater(), make_updater()
+        second.db = first.db
+        await ensure_pending_update_indexes(first.db.pending_ontology_updates)
+
+        # Both check before either writes
+        await first.store_pending_updates(DISCOVERIES)
+        await second.store_pending_updates(DISCOVERIES)
+        await first.write_pending_updates()
+        await second.write_pending_updates()
+
+        assert second.stats["duplicates"] == 3
+        assert await first.db.pending_ontology_updates.count_documents({}) == 3
+
+    asyncio.run(scenario())
+
+
+def test_frequencies_are_updated_in_mongo():
+    async def scenario():
+        updater = make_updater()
+        recent = (datetime.now(timezone.utc) - timedelta(days=30)).strftime("%Y-%m-%d")
+        await seed_skills(updater.db, {
+            "Python": {"mention_frequency": 1000, "last_seen_in_market": "2000-01-01"},
+            "SQL": {},
+            "Angular": {"mention_frequency": 5, "last_seen_in_market": recent},
+            "Perl": {"mention_frequency": 500, "last_seen_in_market": "2000-01-01"},
+            "Cobol": {},
+        })
+        updater.current_ontology = await updater.load_ontology()
+        assert updater.current_ontology["skills"] == {"Python", "SQL", "Angular", "Perl", "Cobol"}
+
+        await updater.update_skill_frequencies({"Python": 100, "SQL": 50})
+        skills = {doc["_id"]: doc async for doc in updater.db[SKILLS_COLLECTION].find()}
+        today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        assert skills["Python"]["mention_frequency"] == 1100
+        assert skills["Python"]["last_seen_in_market"] == today
+        assert skills["SQL"]["mention_frequency"] == 950  # Seen default + mentions
+        assert skills["Angular"]["mention_frequency"] == 0  # Never below 0
+        assert skills["Perl"]["mention_frequency"] == 490
+        assert skills["Cobol"]["mention_frequency"] == 90  # Unseen default - depreciation
+        assert updater.stats["skills_depreciated"] == 3
+
+        await updater.check_for_obsolete_skills()
+        flagged = {op._doc["data"]["name"]: op._doc["discovery_reason"] for op in updater.pending_ops}
+        assert set(flagged) == {"Angular", "Cobol", "Perl"}
+        assert flagged["Angular"].startswith("Mention frequency (0)")
+        assert flagged["Perl"].startswith("Not seen in market for")
+        assert flagged["Cobol"].startswith("Mention frequency (90)")
+
+    asyncio.run(scenario())
+
+
+def test_weekly_run_bumps_the_ontology_version(monkeypatch):
+    async def scenario():
+        updater = make_updater()
+        await seed_skills(updater.db, {"Python": {"mention_frequency": 1000}})
+        monkeypatch.setattr(updater.client, "close", lambda: None)
+        await updater.run_weekly_update()
+        assert await read_ontology_version(updater.db[META_COLLECTION]) == 1
+        assert (await updater.db[SKILLS_COLLECTION].find_one({"_id": "Python"}))["mention_frequency"] > 1000
+
+    asyncio.run(scenario())
+
+
+def test_corpus_run_skips_the_simulated_discoveries(monkeypatch, tmp_path):
+    async def ingest(path):
+        return {"Python": 40}, [{"name": "htmx", "type": "Technology", "aliases": []}]
+
+    async def simulated(current_ontology):
+        raise AssertionError("simulated scraping ran next to a real corpus")
+
+    async def scenario():
+        updater = make_updater()
+        updater.postings_path = tmp_path / "postings.jsonl"
+        await seed_skills(updater.db, {"Python": {"mention_frequency": 1000}})
+        monkeypatch.setattr(updater.client, "close", lambda: None)
+        monkeypatch.setattr(updater, "ingest_job_postings", ingest)
+        monkeypatch.setattr(updater, "simulate_job_market_scraping", simulated)
+        await updater.run_weekly_update()
+
+        pending = await updater.db.pending_ontology_updates.find({"type": {"$in": ["skill", "role"]}}).to_list(None)
+        assert [(doc["type"], doc["data"]["name"]) for doc in pending] == [("skill", "htmx")]
+
+    asyncio.run(scenario())
+
+
+def test_discovered_skills_skip_names_already_proposed():
+    from collections import Counter
+
+    from skill_sketch import SkillDiscovery
+
+    async def scenario():
+        updater = make_updater()
+        await updater.db.pending_ontology_updates.insert_one(
+            {"id": "old", "type": "skill", "status": "rejected", "data": {"name": "synergy"}}
+        )
+        discovery = SkillDiscovery(width=256, depth=4, k=10)
+        discovery.merge_chunk(Counter({"synergy": 90, "htmx": 40, "deno": 2}))
+
+        new_skills = await updater.discovered_skills(discovery, postings=100)
+        assert [skill["name"] for skill in new_skills] == ["htmx"]
+        assert new_skills[0]["confidence"] > 0
+        assert set(new_skills[0]) >= {"type", "aliases", "learning_resources", "discovery_reason"}  # What approval reads
+
+    asyncio.run(scenario())
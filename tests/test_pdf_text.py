@@ -0,0 +1,51 @@
+import os
+
+import fitz
+
+from pdf_text import extract_pdf, shutdown_page_pool
+
+
+def make_pdf(pages):
+    doc = fitz.open()
+    for text in pages:
+        doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def test_reads_every_page_under_the_caps():
+    text, info = extract_pdf(make_pdf(["python", "docker", "sql"]))
+    assert [line for line in text.split("\n") if line] == ["python", "docker", "sql"]
+    assert info["pages"] == info["pages_read"] == 3
+    assert not info["truncated"]
+
+
+def test_stops_at_page_and_char_caps():
+    pdf = make_pdf([f"page {i}" for i in range(10)])
+
+    text, info = extract_pdf(pdf, max_pages=2)
+    assert "page 1" in text and "page 2" not in text
+    assert info["pages_read"] == 2 and info["truncated"]
+
+    text, info = extract_pdf(pdf, max_chars=10)
+    assert len(text) == 10
+    assert info["pages_read"] < 10 and info["truncated"]
+
+
+def test_parallel_pages_match_the_serial_read():
+    pdf = make_pdf([f"page {i}" for i in range(5)])
+    serial, serial_info = extract_pdf(pdf)
+    try:
+        text, info = extract_pdf(pdf, parallel_min_pages=2, parallel_workers=2)
+    finally:
+        shutdown_page_pool()
+    assert text == serial
+    assert info["pages_read"] == serial_info["pages_read"] == 5 and not info["truncated"]
+
+
+def test_process_workers_report_peak_rss_per_pdf():
+    from extraction_pool import _extract_in_worker
+
+    text, info = _extract_in_worker("resume.pdf", make_pdf(["python"]))
+    assert "python" in text
+    if os.path.exists("/proc/self/clear_refs"):  # Linux
+        assert info["peak_rss_kb"] > 0
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import pytest
+
+import server
+from db_indexes import COLLECTION_INDEXES, ensure_indexes
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def pending_docs():
+    docs = []
+    for n in range(7):
+        docs.append({
+            "id": f"u{n}",
+            "type": "skill" if n % 2 else "role",
+            "status": "rejected" if n == 3 else "pending",
+            "discovered_at": f"2025-01-0{n // 2 + 1}T00:00:00",  # Pairs share a timestamp
+            "data": {"name": f"S{n}"} if n % 2 else {"title": f"R{n}"},
+        })
+    return docs
+
+
+def test_keyset_pages_cover_every_pending_update_once(monkeypatch):
+    async def scenario():
+        monkeypatch.setattr(server, "db", mongomock_motor.AsyncMongoMockClient()["test"])
+        await server.db[server.PENDING_COLLECTION].insert_many(pending_docs())
+
+        seen, cursor = [], None
+        while True:
+            page = await server.get_pending_updates(update_type=None, limit=2, cursor=cursor, fields="full")
+            seen += [doc["id"] for doc in page["pending_updates"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert seen == ["u0", "u1", "u2", "u4", "u5", "u6"]
+
+        skills = await server.get_pending_updates(update_type="skill", limit=10, cursor=None, fields="summary")
+        assert [doc["id"] for doc in skills["pending_updates"]] == ["u1", "u5"]
+        assert skills["pending_updates"][0]["data"] == {"name": "S1"}
+        assert skills["next_cursor"] is None
+
+    asyncio.run(scenario())
+
+
+def winning_stages(plan):
+    stages = [plan["stage"]]
+    for child in plan.get("inputStages", []) + ([plan["inputStage"]] if "inputStage" in plan else []):
+        stages += winning_stages(child)
+    return stages
+
+
+@pytest.mark.skipif(not os.environ.get("MONGO_TEST_URL"), reason="explain plans need a real MongoDB (set MONGO_TEST_URL)")
+def test_queries_use_the_bootstrapped_indexes():
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    async def scenario():
+        client = AsyncIOMotorClient(os.environ["MONGO_TEST_URL"])
+        db = client["nextstep_index_test"]
+        try:
+            await db[server.PENDING_COLLECTION].insert_many(pending_docs())
+            result = await ensure_indexes(db)
+            assert result["failed"] == []
+            pending = db[server.PENDING_COLLECTION]
+
+            cursor = server.encode_pending_cursor({"discovered_at": "2025-01-01T00:00:00", "id": "u0"})
+            for update_type, index_name in ((None, "status_discovered"), ("skill", "status_type_discovered")):
+                plan = await pending.find(server.pending_updates_filter(update_type, cursor)).sort(server.PENDING_SORT).limit(3).explain()
+                winning = plan["queryPlanner"]["winningPlan"]
+                assert "COLLSCAN" not in winning_stages(winning)
+                assert "SORT" not in winning_stages(winning)  # The index provides the order
+                assert index_name in str(winning)
+
+            plan = await pending.find({"id": "u1", "status": "pending"}).explain()
+            assert "id_unique" in str(plan["queryPlanner"]["winningPlan"])
+            assert {index["name"] for index in COLLECTION_INDEXES[server.PENDING_COLLECTION]} <= set(await pending.index_information())
+        finally:
+            await client.drop_database("nextstep_index_test")
+            client.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+import server
+from ontology_state import OntologySnapshot
+from prefork import process_memory
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/smaps_rollup"), reason="needs Linux /proc")
+def test_process_memory_splits_resident_bytes():
+    memory = process_memory()
+
+    assert memory["rss_bytes"] > 0
+    assert memory["private_bytes"] + memory["shared_bytes"] == memory["rss_bytes"]
+    assert memory["private_bytes"] <= memory["pss_bytes"] <= memory["rss_bytes"]
+
+
+def test_process_memory_is_empty_for_missing_process():
+    assert process_memory(pid=-1) == {}
+
+
+def test_preloaded_snapshot_is_adopted_once_and_only_if_current(monkeypatch):
+    snap = OntologySnapshot.empty()
+
+    monkeypatch.setattr(server, "preloaded", (3, snap))
+    assert server.take_preloaded(3) is snap
+    assert server.take_preloaded(3) is None
+
+    monkeypatch.setattr(server, "preloaded", (3, snap))
+    assert server.take_preloaded(4) is None  # The DB changed after the master read it
+    assert server.preloaded is None
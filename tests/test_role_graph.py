@@ -0,0 +1,96 @@
+import pytest
+
+from role_graph import RoleGraph
+from scoring_engine import ScoringEngine
+
+
+def role(title, *skills):
+    return {"title": title, "skill_weights": [{"skill": s, "weight": 1.0, "is_core": False} for s in skills]}
+
+
+ROLES = [
+    role("Analyst", "SQL", "Excel"),
+    role("Data Scientist", "SQL", "Python", "Statistics"),
+    role("ML Engineer", "Python", "Statistics", "PyTorch", "Docker"),
+    role("Designer", "Figma"),
+]
+
+
+def graph(**kwargs):
+    return RoleGraph(ScoringEngine(ROLES), **kwargs)
+
+
+def test_nearest_orders_by_covered_share_then_cost():
+    nearest = graph().nearest("data scientist")
+
+    assert nearest == [
+        {"title": "Analyst", "similarity": 50.0, "missing_weight": 1.0},
+        {"title": "ML Engineer", "similarity": 50.0, "missing_weight": 2.0},
+    ]
+    assert graph().nearest("Designer") == []
+
+
+def test_path_goes_through_stepping_stones():
+    result = graph(min_similarity=0.3).path("Analyst", "ML Engineer")
+
+    assert result["path"] == ["Analyst", "Data Scientist", "ML Engineer"]
+    assert [step["missing_skills"] for step in result["steps"]] == [["Python", "Statistics"], ["PyTorch", "Docker"]]
+    assert result["total_missing_weight"] == result["direct_missing_weight"] == 4.0
+    assert result["direct"] is False
+
+
+def test_path_can_cost_less_than_the_direct_move():
+    roles = [
+        {"title": "A", "skill_weights": [{"skill": "y", "weight": 1.0}]},
+        {"title": "B", "skill_weights": [{"skill": "y", "weight": 1.0}, {"skill": "x", "weight": 0.1}]},
+        {"title": "C", "skill_weights": [{"skill": "y", "weight": 1.0}, {"skill": "x", "weight": 1.0}]},
+    ]
+    result = RoleGraph(ScoringEngine(roles), min_similarity=0.3).path("A", "C")
+
+    # x is charged once, at B's weight; C weighting it higher costs nothing more
+    assert result["path"] == ["A", "B", "C"]
+    assert [step["missing_weight"] for step in result["steps"]] == [0.1, 0.0]
+    assert result["total_missing_weight"] == 0.1
+    assert result["direct_missing_weight"] == 1.0
+
+
+def test_unreachable_role_falls_back_to_direct_move():
+    result = graph().path("Analyst", "Designer")
+
+    assert result["path"] == ["Analyst", "Designer"]
+    assert result["steps"][0]["missing_skills"] == ["Figma"]
+    assert result["direct"] is True
+
+
+def test_unknown_role_raises_key_error():
+    with pytest.raises(KeyError):
+        graph().path("Analyst", "Astronaut")
+
+
+def shared_skill_roles(count, start=0):
+    """Every role lists Communication; neighbours share one of a few other skills"""
+    return [
+        role(f"Role {n}", "Communication", f"Skill {n % 7}", f"Skill {n % 5 + 7}", f"Own {n}")
+        for n in range(start, start + count)
+    ]
+
+
+def test_common_skill_still_counts_towards_similarity():
+    graph = RoleGraph(ScoringEngine(shared_skill_roles(40)), max_skill_roles=10)
+
+    assert graph.stats()["common_skills"] == 1
+    best = graph.nearest("Role 0", limit=1)[0]
+    assert best == {"title": "Role 35", "similarity": 75.0, "missing_weight": 1.0}  # Communication + 2 shared skills
+
+
+@pytest.mark.parametrize("max_skill_roles", [10, 1000])
+def test_extended_matches_a_full_rebuild(max_skill_roles):
+    engine = ScoringEngine(shared_skill_roles(40))
+    grown_engine = engine.extended(shared_skill_roles(3, start=40))
+
+    extended = RoleGraph(engine, max_skill_roles=max_skill_roles).extended(grown_engine)
+    rebuilt = RoleGraph(grown_engine, max_skill_roles=max_skill_roles)
+
+    for attr in ("indptr", "neighbors", "similarity", "cost"):
+        assert (getattr(extended, attr) == getattr(rebuilt, attr)).all()
+    assert extended.nearest("role 42") == rebuilt.nearest("Role 42")
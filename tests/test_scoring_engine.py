@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from scoring_engine import ScoringEngine
+
+
+@pytest.fixture(scope="module")
+def server():
+    import server
+    return server
+
+
+def make_catalog(num_roles, num_skills, seed=7):
+    rng = random.Random(seed)
+    skills = [f"Skill {i}" for i in range(num_skills)]
+    roles = []
+    for i in range(num_roles):
+        skill_weights = []
+        for skill in rng.sample(skills, rng.randint(0, 8)):
+            entry = {"skill": skill}
+            if rng.random() < 0.9:
+                entry["weight"] = rng.choice([0.3, 0.5, 0.7, 0.8, 1.0, 1])
+            if rng.random() < 0.8:
+                entry["is_core"] = rng.random() < 0.5
+            skill_weights.append(entry)
+        if skill_weights and rng.random() < 0.1:
+            skill_weights.append(dict(skill_weights[0]))  # duplicate entry
+        roles.append({
+            "title": f"Role {i}",
+            "experience_level": rng.choice(["entry", "mid", "senior"]),
+            "skill_weights": skill_weights,
+        })
+    return skills, roles
+
+
+def test_scores_match_python_loop(server):
+    skills, roles = make_catalog(300, 40)
+    engine = ScoringEngine(roles)
+    user_skills = skills[:12]
+
+    scores = engine.score(user_skills)
+    for idx, role in enumerate(roles):
+        expected = server.calculate_weighted_match(user_skills, role, {})
+        assert round(scores["match_score"][idx], 1) == expected["match_score"]
+        assert round(scores["core_match_score"][idx], 1) == expected["core_match_score"]
+        assert round(scores["total_match_score"][idx], 1) == expected["total_match_score"]
+
+
+@pytest.mark.parametrize("experience", [None, "entry", "senior", "unknown"])
+def test_rank_matches_full_sort(server, experience):
+    skills, roles = make_catalog(500, 30, seed=11)
+    engine = ScoringEngine(roles)
+    user_skills = skills[::3]
+
+    filtered = [r for r in roles if not experience or r.get("experience_level") == experience]
+    expected = [server.calculate_weighted_match(user_skills, r, {}) for r in filtered]
+    expected.sort(key=lambda x: x["match_score"], reverse=True)
+
+    ranked = [
+        server.calculate_weighted_match(user_skills, roles[i], {})
+        for i in engine.rank(user_skills, experience=experience, limit=10)
+    ]
+    assert ranked == expected[:10]
+
+
+def test_rank_empty_catalog():
+    assert ScoringEngine([]).rank(["Python"]) == []
+
+
+def test_extended_engine_equals_full_rebuild():
+    skills, roles = make_catalog(120, 30, seed=3)
+    full = ScoringEngine(roles)
+    base = ScoringEngine(roles[:100])
+    grown = base.extended(roles[100:110]).extended(roles[110:])
+
+    assert base.num_roles == 100  # the original engine is untouched
+    assert grown.job_roles == roles
+    for user_skills in (skills[:5], skills[10:25], ["Unknown"]):
+        for key, values in full.score(user_skills).items():
+            assert (grown.score(user_skills)[key] == values).all()
+        for experience in (None, "entry", "mid"):
+            assert grown.rank(user_skills, experience) == full.rank(user_skills, experience)
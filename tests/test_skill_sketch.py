@@ -0,0 +1,84 @@
+import json
+import random
+from collections import Counter
+
+import numpy as np
+import spacy
+
+from extraction import build_skill_matcher, skill_terms
+from job_postings import count_skill_mentions
+from skill_sketch import CountMinSketch, HeavyHitters, SkillDiscovery, candidate_ngrams
+
+SKILLS = {"Python": {}, "Docker": {}, "SQL": {}}
+
+
+def test_count_min_sketch_never_undercounts_and_adds_up_by_chunk():
+    rng = random.Random(0)
+    exact = Counter(f"term {rng.randint(0, 5000)}" for _ in range(20000))
+    items = list(exact)
+    halves = Counter(dict(list(exact.items())[::2])), Counter(dict(list(exact.items())[1::2]))
+
+    whole, chunked = CountMinSketch(width=512, depth=4), CountMinSketch(width=512, depth=4)
+    whole.add_counts(exact)
+    for half in halves:  # Like one Counter per chunk
+        chunked.add_counts(half)
+
+    estimates = whole.estimate_many(items)
+    assert np.array_equal(estimates, chunked.estimate_many(items))
+    assert all(estimate >= exact[item] for item, estimate in zip(items, estimates))
+    assert whole.total == sum(exact.values())
+    overcounts = estimates - np.array([exact[item] for item in items])
+    assert np.mean(overcounts <= whole.error_bound()) > 0.95
+
+
+def test_heavy_hitters_stay_bounded():
+    heavy = HeavyHitters(k=3)
+    for n in range(100):
+        heavy.offer([f"t{n}"], [n])
+        assert len(heavy.estimates) <= 6
+    assert heavy.top() == [("t99", 99), ("t98", 98), ("t97", 97)]
+
+
+def test_candidate_ngrams_skip_known_skills_and_boilerplate():
+    nlp = spacy.blank("en")
+    matcher = build_skill_matcher(nlp, skill_terms(SKILLS))
+    doc = nlp("we offer a competitive salary. python, htmx and tailwind css for the web ui; docker")
+    ngrams = set(candidate_ngrams(doc, matcher(doc)))
+    assert {"htmx", "tailwind", "tailwind css", "css", "web ui"} <= ngrams
+    assert not any("python" in ngram or "docker" in ngram for ngram in ngrams)  # Matched spans are excluded
+    assert not any("salary" in ngram for ngram in ngrams)  # No known skill in that sentence
+    assert not any(" and " in ngram for ngram in ngrams)
+    assert set(candidate_ngrams(nlp("htmx everywhere"), [])) == set()
+
+
+def test_discovery_proposes_terms_above_the_threshold(tmp_path):
+    rng = random.Random(1)
+    path = tmp_path / "postings.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(400):
+            text = "Python and SQL for reporting."
+            if rng.random() < 0.25:
+                text += " Docker, Apache Spark required."
+            if n < 6:
+                text += " SQL with Fortran."  # Below the threshold
+            f.write(json.dumps({"description": text}) + "\n")
+
+    discovery = SkillDiscovery(width=4096, depth=4, k=20)
+    mentions, stats = count_skill_mentions(path, skill_terms(SKILLS), workers=1, chunk_size=64,
+                                           nlp=spacy.blank("en"), discovery=discovery)
+    assert stats["chunks"] == 7
+    assert mentions["Python"] == 400
+
+    candidates = discovery.candidates(stats["postings"], min_share=0.05, min_postings=10)
+    names = [candidate["name"] for candidate in candidates]
+    assert names[0] == "reporting"
+    assert "apache spark" in names
+    assert "spark" not in names and "apache" not in names  # Folded into the longer candidate
+    assert "fortran" not in names
+    spark = candidates[names.index("apache spark")]
+    assert 0 < spark["confidence"] <= 1.0
+    assert abs(spark["share"] - mentions["Docker"] / 400) < 0.01
+
+    small = SkillDiscovery(width=64, depth=2, k=1)
+    small.merge_chunk(Counter({"a": 3, "b": 1}))
+    assert list(small.heavy.estimates) == ["a"] and small.sketch.total == 4
@@ -0,0 +1,76 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from update_jobs import JobAlreadyRunning, UpdateJobRunner
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def make_runner(tmp_path, body):
+    script = tmp_path / "fake_updater.py"
+    script.write_text(body)
+    db = mongomock_motor.AsyncMongoMockClient()["test"]
+    return UpdateJobRunner(db["ontology_update_jobs"], db["ontology_meta"], script)
+
+
+def test_job_runs_in_background_and_streams_its_log(tmp_path):
+    async def scenario():
+        runner = make_runner(tmp_path, "import time\nfor i in range(3):\n    print('step', i)\n    time.sleep(0.05)\n")
+        job = await runner.start()
+        assert job.status == "running"
+
+        with pytest.raises(JobAlreadyRunning) as already:
+            await runner.start()
+        assert already.value.job_id == job.id
+
+        followed = [line async for line in job.follow()]
+        assert followed == ["step 0", "step 1", "step 2"]
+        while runner._tasks:
+            await asyncio.sleep(0.01)
+
+        status = await runner.get(job.id, since=2)
+        assert status["status"] == "succeeded" and status["returncode"] == 0
+        assert status["log"] == ["step 2"]
+
+        # The lease is released, and the saved record is what other workers see
+        assert (await runner.start()).id != job.id
+        runner.jobs.clear()
+        assert (await runner.get(job.id))["status"] == "succeeded"
+        await runner.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_failed_job_is_reported(tmp_path):
+    async def scenario():
+        runner = make_runner(tmp_path, "raise SystemExit(3)\n")
+        job = await runner.start()
+        await asyncio.gather(*runner._tasks)
+        assert job.status == "failed" and job.returncode == 3
+
+    asyncio.run(scenario())
+
+
+def test_failed_weekly_update_fails_the_job(tmp_path):
+    backend_dir = Path(__file__).resolve().parent.parent / "backend"
+    body = (
+        f"import asyncio, sys\n"
+        f"sys.path.insert(0, {str(backend_dir)!r})\n"
+        f"from ontology_updater import OntologyUpdater\n"
+        f"async def unavailable():\n"
+        f"    raise RuntimeError('ontology unavailable')\n"
+        f"updater = OntologyUpdater(postings_path=None)\n"
+        f"updater.load_ontology = unavailable\n"
+        f"asyncio.run(updater.run_weekly_update())\n"
+    )
+
+    async def scenario():
+        runner = make_runner(tmp_path, body)
+        job = await runner.start()
+        await asyncio.gather(*runner._tasks)
+        assert job.status == "failed" and job.returncode == 1
+        assert "✗ Error during update: ontology unavailable" in job.lines
+
+    asyncio.run(scenario())
@@ -0,0 +1,92 @@
+import asyncio
+import io
+
+import pytest
+
+from upload_limits import AdmissionGate, ByteBudget, Overloaded, UploadTooLarge, declared_too_large, read_limited
+
+
+class FakeUpload:
+    def __init__(self, data: bytes):
+        self.file = io.BytesIO(data)
+        self.reads = 0
+
+    async def read(self, size: int = -1) -> bytes:
+        self.reads += 1
+        return self.file.read(size)
+
+
+def test_read_limited_stops_at_the_limit():
+    upload = FakeUpload(b"x" * 10_000)
+    assert asyncio.run(read_limited(upload, limit=10_000, chunk_size=4096)) == b"x" * 10_000
+
+    upload = FakeUpload(b"x" * 1_000_000)
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(read_limited(upload, limit=10_000, chunk_size=4096))
+    assert upload.reads == 3  # Gave up after the chunk that crossed the limit
+
+    assert declared_too_large(str(100 * 1024 * 1024), limit=10 * 1024 * 1024)
+    assert not declared_too_large("10485900", limit=10 * 1024 * 1024)  # Multipart framing is allowed for
+    assert not declared_too_large(None, limit=1) and not declared_too_large("junk", limit=1)
+
+
+def test_gate_rejects_when_queue_is_full_or_wait_times_out():
+    async def scenario():
+        gate = AdmissionGate(capacity=1, max_waiting=1, timeout=0.05)
+        release = asyncio.Event()
+
+        async def hold(reject=True):
+            async with gate.slot(reject=reject):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        assert gate.in_use == 1
+
+        # One caller may wait; the next is turned away, and the waiter times out
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded) as queue_full:
+            async with gate.slot():
+                pass
+        assert queue_full.value.status_code == 429 and queue_full.value.retry_after >= 1
+        with pytest.raises(Overloaded) as timed_out:
+            await waiter
+        assert timed_out.value.status_code == 503
+
+        # Batch files queue without a timeout
+        patient = asyncio.create_task(hold(reject=False))
+        await asyncio.sleep(0.1)
+        assert not patient.done() and gate.waiting == 1
+        release.set()
+        await asyncio.wait_for(asyncio.gather(holder, patient), 1)
+        return gate.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["rejected"] == {"queue_full": 1, "timeout": 1}
+    assert stats["admitted"] == 2 and stats["peak_in_use"] == 1 and stats["waiting"] == 0 and stats["in_use"] == 0
+
+
+def test_byte_budget_bounds_bytes_held_across_requests():
+    async def scenario():
+        budget = ByteBudget(capacity=100, max_waiting=1, timeout=0.05)
+        with pytest.raises(UploadTooLarge):
+            await budget.reserve(101)  # Could never fit
+
+        await budget.reserve(60)
+        waiter = asyncio.create_task(budget.reserve(50))
+        await asyncio.sleep(0.01)
+        assert not waiter.done() and budget.waiting == 1
+        with pytest.raises(Overloaded) as queue_full:
+            await budget.reserve(50)
+        assert queue_full.value.status_code == 429
+
+        budget.release(60)  # The waiting batch fits now
+        await waiter
+        assert budget.in_use == 50
+        with pytest.raises(Overloaded) as timed_out:
+            await budget.reserve(60)
+        assert timed_out.value.status_code == 503
+        assert budget.stats()["peak_in_use_bytes"] == 60
+
+    asyncio.run(scenario())
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from write_behind import WriteBehindQueue
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+
+def analyses_collection():
+    return mongomock_motor.AsyncMongoMockClient()["test"]["resume_analyses"]
+
+
+def test_batches_by_size_and_flushes_on_close():
+    async def scenario():
+        collection = analyses_collection()
+        writer = WriteBehindQueue(collection, batch_size=5, flush_seconds=60)
+        writer.start()
+        await writer.put_many([{"n": n} for n in range(12)])
+        await asyncio.sleep(0.05)
+        assert await collection.count_documents({}) == 10  # Two full batches; two docs wait for the timer
+
+        await writer.close()
+        assert await collection.count_documents({}) == 12
+        assert writer.counters["written"] == 12
+        assert writer.counters["flushes"] == 3
+
+    asyncio.run(scenario())
+
+
+def test_overflow_policies():
+    async def scenario():
+        collection = analyses_collection()
+        dropping = WriteBehindQueue(collection, max_queue=2, flush_seconds=60, overflow="drop")
+        syncing = WriteBehindQueue(collection, max_queue=2, flush_seconds=60, overflow="sync")
+        for writer in (dropping, syncing):
+            writer.start()
+            await writer.put_many([{"n": n} for n in range(5)])  # The writer task has not run yet
+
+        assert dropping.counters["dropped"] == 3
+        assert syncing.counters["sync_writes"] == 3
+        for writer in (dropping, syncing):
+            await writer.close()
+        assert await collection.count_documents({}) == 7
+
+    asyncio.run(scenario())
+
+
+class PartiallyFailingCollection:
+    """Rejects docs 1 (duplicate key) and 2 (transient error) of the first insert"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append([doc["n"] for doc in docs])
+        if len(self.calls) == 1:
+            raise BulkWriteError({
+                "nInserted": len(docs) - 2,
+                "writeErrors": [
+                    {"index": 1, "code": 11000, "errmsg": "E11000 duplicate key error"},
+                    {"index": 2, "code": 91, "errmsg": "shutdown in progress"},
+                ],
+            })
+
+
+def test_partial_failure_retries_only_the_failed_documents():
+    async def scenario():
+        collection = PartiallyFailingCollection()
+        writer = WriteBehindQueue(collection, batch_size=5, flush_seconds=60)
+        writer.start()
+        await writer.put_many([{"n": n} for n in range(5)])
+        await writer.close()
+
+        assert collection.calls == [[0, 1, 2, 3, 4], [2]]
+        assert writer.counters["written"] == 5 and writer.counters["failed"] == 0
+
+    asyncio.run(scenario())